@@ -0,0 +1,5 @@
+""" One Poker: the game engine, its AI seats and tools. The Tk GUI (one_poker.gui) is imported only by games with a window """
+from .engine import (
+    CARDS, EVENTS, HIGH, MAX_PLAYERS, MIN_PLAYERS, VALUES, BettingState, Card, CardCounter, CardTracker, Deck, Game,
+    GameResult, Heuristic, Player, RandomPlay, RoundResult, Utility,
+)
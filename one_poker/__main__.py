@@ -0,0 +1,98 @@
+""" Command line: python -m one_poker {gui,headless,tournament,benchmark,replay,stats,exploit,learn,cache} ... """
+from argparse import ArgumentParser
+
+from .engine import Game
+from .tournament import STRATEGIES
+
+
+""" Seat argument to Game: False for a human, else a new instance of the named strategy """
+def seat(name):
+    if name == 'human':
+        return False
+    elif name in STRATEGIES:
+        return STRATEGIES[name]()
+    raise ValueError(f'Unknown seat: {name} (human or one of {", ".join(STRATEGIES)})')
+
+
+def gui(args):
+    seats = [seat(name) for name in args.seats]
+    game = Game(*seats, seed=args.seed, pace=args.pace)
+    # Spectators of an AI-only table do not have to press continue
+    game.auto_continue = all(seats)
+    if args.advice:
+        from .advisor import Advisor
+        game.advisor = Advisor(workers=args.advice_workers)
+    game.run()
+
+
+def headless(args):
+    if 'human' in args.seats:
+        raise ValueError('A headless game has no one to ask for a human seat; see server.py')
+    wins = {}
+    for index in range(args.games):
+        result = Game(*[seat(name) for name in args.seats], headless=True,
+                      seed=None if args.seed is None else args.seed + index).run()
+        wins[result.winner] = wins.get(result.winner, 0) + 1
+        print(f'Game {index + 1}: {result}')
+    if args.games > 1:
+        print(', '.join(f'{winner or "Tie"}: {count}' for (winner, count) in sorted(wins.items(), key=str)))
+
+
+def main(argv=None):
+    parser = ArgumentParser(prog='python -m one_poker', description='Play One Poker, or run its tools')
+    modes = parser.add_subparsers(dest='mode', required=True)
+
+    window = modes.add_parser('gui', help='play in the Tk window, or watch an AI-only table')
+    window.add_argument('seats', nargs='*', default=['human', 'heuristic'], help='human or a strategy, for every seat')
+    window.add_argument('--seed', type=int, default=None)
+    window.add_argument('--pace', type=float, default=1, help='seconds between rounds')
+    window.add_argument('--advice', action='store_true', help="show the estimated chips of each of a human seat's picks")
+    window.add_argument('--advice-workers', type=int, default=2, help='processes estimating them')
+
+    quiet = modes.add_parser('headless', help='play AI games without a window')
+    quiet.add_argument('seats', nargs='*', default=['heuristic', 'heuristic'], help='a strategy for every seat')
+    quiet.add_argument('--games', type=int, default=1)
+    quiet.add_argument('--seed', type=int, default=None, help='seed of the first game; the next ones count up')
+
+    # These pass their arguments on to the tool's own command line
+    modes.add_parser('tournament', help='AI round-robin or Swiss tournament (tournament.py)', add_help=False)
+    modes.add_parser('benchmark', help='engine benchmarks (benchmark.py)', add_help=False)
+    modes.add_parser('replay', help='replay a recorded game up to a round (replay.py)', add_help=False)
+    modes.add_parser('stats', help='streaming statistics over AI games (stats.py)', add_help=False)
+    modes.add_parser('exploit', help='best-response value against a policy (exploit.py)', add_help=False)
+    modes.add_parser('learn', help='train an AI by self-play in the vectorized environment (learn.py)', add_help=False)
+    modes.add_parser('cache', help='build, list or clear the precomputed table cache (cache.py)', add_help=False)
+
+    args, rest = parser.parse_known_args(argv)
+    if args.mode == 'tournament':
+        from .tournament import main as tool
+        return tool(rest, f'{parser.prog} tournament')
+    elif args.mode == 'benchmark':
+        from .benchmark import main as tool
+        return tool(rest, f'{parser.prog} benchmark')
+    elif args.mode == 'replay':
+        from .replay import main as tool
+        return tool(rest, f'{parser.prog} replay')
+    elif args.mode == 'stats':
+        from .stats import main as tool
+        return tool(rest, f'{parser.prog} stats')
+    elif args.mode == 'exploit':
+        from .exploit import main as tool
+        return tool(rest, f'{parser.prog} exploit')
+    elif args.mode == 'learn':
+        from .learn import main as tool
+        return tool(rest, f'{parser.prog} learn')
+    elif args.mode == 'cache':
+        from .cache import main as tool
+        return tool(rest, f'{parser.prog} cache')
+    elif rest:
+        parser.error(f'unrecognized arguments: {" ".join(rest)}')
+
+    try:
+        {'gui': gui, 'headless': headless}[args.mode](args)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+""" Background estimates of each legal pick's chips for the human seat of a GUI game, refined as rollouts come in """
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError
+from math import sqrt
+from multiprocessing import get_context
+from random import Random
+import threading
+import time
+
+from .mcts import determinize, rollout_action
+from .state import OVER, from_game, step
+
+
+# Number of the hint the Advisor is refining, shared with the pool workers (set by share)
+_current = None
+
+
+def share(current):
+    global _current
+    _current = current
+
+
+"""
+A batch of rollouts of every legal action from the seat's information set; runs inside the pool workers. Each
+rollout deals the hidden cards again (mcts.determinize) and plays the round out with the default policy; its result
+is the chips the seat ends the round with, less its balance and pot now. Returns {action: (count, total, squares)},
+empty for a batch of a hint cancelled since it was queued.
+"""
+def rollouts(task):
+    state, seat, seed, count, hint = task
+    if _current is not None and _current.value != hint:
+        return {}
+    rng = Random(seed)
+    stack = state.balances[seat] + state.bets[seat]
+    results = {}
+    for action in state.legal_actions():
+        total = squares = 0.0
+        for _ in range(count):
+            world = step(determinize(state, seat, rng), action)
+            while world.phase != OVER and world.round == state.round:
+                world = step(world, rollout_action(world, rng))
+            chips = world.balances[seat] - stack
+            total += chips
+            squares += chips * chips
+        results[action] = (count, total, squares)
+    return results
+
+
+class Estimate():
+    """ Running mean and standard error of one action's chips """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+
+    def add(self, count, total, squares):
+        self.count += count
+        self.total += total
+        self.squares += squares
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def error(self):
+        if self.count < 2:
+            return float('inf')
+        variance = (self.squares - self.total * self.total / self.count) / (self.count - 1)
+        return sqrt(max(variance, 0) / self.count)
+
+
+class Advisor():
+    """
+    Hints for a human seat: while it waits for a pick, a background thread keeps batches of rollouts running in a
+    pool of workers processes and posts the estimates to the GUI as they narrow, through the game's update queue
+    (GUI.render applies them on the Tk thread). A raise is by the minimum, as the AIs raise. Refining stops once
+    every estimate is within precision chips (at z standard errors), after budget seconds, or as soon as the human
+    clicks a pick; batches of a cancelled hint that no worker has started are dropped. The pool is spawned, not forked, since the GUI runs a Tk
+    thread, and is started in the background on the first hint.
+    """
+    def __init__(self, workers=2, batch=16, budget=10.0, precision=0.1, z=1.96, seed=None):
+        self.workers = workers
+        self.batch = batch
+        self.budget = budget
+        self.precision = precision
+        self.z = z
+        self.rng = Random(seed)
+        self.pool = None
+        self.context = get_context('spawn')
+        self.current = self.context.Value('Q', 0, lock=False)
+        # lock orders posting against cancelling; the slow start of the pool only holds starting
+        self.lock = threading.Lock()
+        self.starting = threading.Lock()
+        self.cancelled = threading.Event()
+        self.cancelled.set()
+        self.thread = None
+        # Batches submitted for the current hint, under lock
+        self.pending = deque()
+
+    """ Begin refining hints for the player's pick; called by the game thread before it waits for the click """
+    def start(self, game, player):
+        self.cancel(game)
+        state = from_game(game)
+        if len(state.legal_actions()) < 2:
+            return
+        with self.lock:
+            self.cancelled = threading.Event()
+            self.post(game, 'Estimating...', self.cancelled)
+            hint = self.current.value
+        seat = game.players.index(player)
+        self.thread = threading.Thread(target=self.refine, args=(game, state, seat, hint, self.cancelled), daemon=True)
+        self.thread.start()
+
+    """ Stop refining and clear the hints; called when the human clicks a pick """
+    def cancel(self, game):
+        with self.lock:
+            if not self.cancelled.is_set():
+                self.cancelled.set()
+                game.configure('Label_Advice', text='')
+                self.drop()
+
+    """
+    Drop the batches of the current hint that no worker has started: the ones still in the executor are cancelled,
+    and the ones already passed on to the workers return at once. Called under lock.
+    """
+    def drop(self):
+        self.current.value += 1
+        for future in self.pending:
+            future.cancel()
+
+    """ Show text, unless the hints it belongs to were cancelled meanwhile """
+    def post(self, game, text, cancelled):
+        if not cancelled.is_set():
+            game.configure('Label_Advice', text=text)
+
+    def refine(self, game, state, seat, hint, cancelled):
+        with self.starting:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers, mp_context=self.context, initializer=share,
+                                                initargs=(self.current,))
+        estimates = {action: Estimate() for action in state.legal_actions()}
+        deadline = time.perf_counter() + self.budget
+        pending = deque()
+        with self.lock:
+            self.pending = pending
+
+        try:
+            while time.perf_counter() < deadline:
+                # Keep every worker busy with the next batch while the last one is merged
+                with self.lock:
+                    if cancelled.is_set():
+                        break
+                    while len(pending) < 2 * self.workers:
+                        task = (state, seat, self.rng.getrandbits(64), self.batch, hint)
+                        pending.append(self.pool.submit(rollouts, task))
+                try:
+                    results = pending[0].result(timeout=1)
+                except (TimeoutError, CancelledError):
+                    continue
+                with self.lock:
+                    pending.popleft()
+                for (action, statistics) in results.items():
+                    estimates[action].add(*statistics)
+
+                settled = all(self.z * estimate.error <= self.precision for estimate in estimates.values())
+                with self.lock:
+                    self.post(game, self.describe(estimates, settled), cancelled)
+                if settled:
+                    break
+        finally:
+            # A settled or timed-out hint leaves no batches behind to hold up the next one
+            with self.lock:
+                if self.current.value == hint:
+                    self.drop()
+
+    """ One line per action: the estimated chips and the margin of error, best first """
+    def describe(self, estimates, settled):
+        lines = []
+        for (action, estimate) in sorted(estimates.items(), key=lambda item: -item[1].mean):
+            lines.append(f'{action.capitalize():<7}{estimate.mean:+6.2f} ±{min(self.z * estimate.error, 9.99):4.2f}')
+        count = min(estimate.count for estimate in estimates.values())
+        lines.append(f'EV, {count} rollouts{"" if settled else "..."}')
+        return '\n'.join(lines)
+
+    def close(self):
+        self.cancelled.set()
+        if self.thread is not None:
+            self.thread.join()
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,213 @@
+""" NumPy batch simulator; plays N independent AI-vs-AI games in lockstep """
+import numpy as np
+
+from .cache import lookup
+from .policy import BEHIND, BROKE, EVEN, POLICY, SHORT, threshold_table
+
+
+# Positions and actions, as small ints
+ADVANTAGE, NEUTRAL, DISADVANTAGE = 0, 1, 2
+CHECK, CALL, RAISE, FOLD, ALL_IN = 0, 1, 2, 3, 4
+ACTIONS = ('check', 'call', 'raise', 'fold', 'all in')
+
+
+class BatchUtility():
+    """
+    Vectorized CardTracker.win_probability against one opponent; counts is (n, 15) unseen copies indexed by card
+    value, without the reference card, and reference is (n,)
+    """
+    def success_calc(counts, reference):
+        rows = np.arange(len(reference))
+        below = np.cumsum(counts, axis=1) - counts                 # copies of every value below the index
+        high = reference > 7
+        population = np.where(high, counts[:, 8:15].sum(axis=1), counts[:, 2:8].sum(axis=1))
+        bigger_than = below[rows, reference] - np.where(high, below[:, 8], 0)
+
+        # The Ace also loses to a 2, so 2s join the High population; a 2 only beats the Aces
+        population = population + np.where(reference == 14, counts[:, 2], 0) + np.where(reference == 2, counts[:, 14], 0)
+        bigger_than = np.where(reference == 2, counts[:, 14], bigger_than)
+        return np.divide(bigger_than, population, out=np.zeros(len(reference)), where=population > 0)
+
+    """ Vectorized Utility.kelly_criterion """
+    def kelly_criterion(success_probability, odds):
+        return success_probability - ((1 - success_probability) / odds)
+
+
+class BatchGame():
+    def __init__(self, n, wager=1, balance=10, subdecks=3, split=2, seed=None):
+        self.n = n
+        self.wager = wager
+        self.rng = np.random.default_rng(seed)
+        games = np.arange(n)
+        self.games = games
+
+        # Every game keeps a random 1/split of the shuffled deck, and draws from an index
+        values = np.repeat(np.arange(2, 15, dtype=np.int8), 4 * subdecks)
+        self.size = len(values) // split
+        self.deck = self.rng.permuted(np.tile(values, (n, 1)), axis=1)[:, :self.size]
+        self.top = np.zeros(n, dtype=np.intp)
+        # Unseen copies of every value in each game's shoe (see engine.CardTracker)
+        self.unseen = np.zeros((n, 15), dtype=np.int64)
+        self.unseen[:, 2:] = 4 * subdecks
+
+        # Per seat state; a card value of 0 is an empty hand slot
+        self.hands = np.zeros((n, 2, 2), dtype=np.int8)
+        self.balances = np.full((n, 2), balance, dtype=np.int64)
+        self.pots = np.zeros((n, 2), dtype=np.int64)
+        self.high = np.zeros((n, 2), dtype=np.int8)
+        self.positions = np.zeros((n, 2), dtype=np.int8)
+        self.cards = np.zeros((n, 2), dtype=np.int8)
+        self.folded = np.zeros((n, 2), dtype=bool)
+
+        # The Heuristic's compiled policy (policy.py), with its Kelly thresholds for every stake the chips allow,
+        # read from the table cache when it has them
+        self.policy = np.array(POLICY, dtype=np.int8)
+        self.chips = 2 * balance
+        self.thresholds = lookup('thresholds', balance=balance)
+        if self.thresholds is None:
+            self.thresholds = np.array(threshold_table(self.chips))
+
+        # Seat that acts first in each game, the round winner (-1 for a tie) and the game outcome
+        self.first = self.rng.integers(0, 2, n)
+        self.round_winner = np.full(n, -1)
+        self.active = np.ones(n, dtype=bool)
+        self.winner = np.full(n, -1)
+        self.rounds = np.zeros(n, dtype=np.int64)
+
+    """ Draw until 2 cards in hand, in player order """
+    def draw_phase(self, games):
+        for turn in (0, 1):
+            seats = self.first[games] ^ turn
+            for slot in (0, 1):
+                empty = self.hands[games, seats, slot] == 0
+                drawing, seat = games[empty], seats[empty]
+                self.hands[drawing, seat, slot] = self.deck[drawing, self.top[drawing]]
+                self.top[drawing] += 1
+
+    """ Generate each player's high-low card count and position """
+    def card_ranking(self, games):
+        self.high[games] = (self.hands[games] > 7).sum(axis=2)
+        high = self.high[games]
+        opponent = high[:, ::-1]
+        self.positions[games] = np.select(
+            [(high == 2) & (opponent == 0), (high == 0) & (opponent >= 1)],
+            [ADVANTAGE, DISADVANTAGE],
+            NEUTRAL,
+        )
+
+    """ Place the lower card in Advantage or Disadvantage, the higher one when Neutral """
+    def decision_phase(self, games):
+        hands = self.hands[games]
+        slot = np.where(self.positions[games] == NEUTRAL, hands.argmax(axis=2), hands.argmin(axis=2))
+        rows = np.arange(len(games))[:, None]
+        seats = np.array([[0, 1]])
+        self.cards[games] = hands[rows, seats, slot]
+        hands[rows, seats, slot] = 0
+        self.hands[games] = hands
+
+    """ The ai_pick decision tree, for the acting seat of every game in games """
+    def ai_pick(self, games, seats):
+        own, opponent = self.pots[games, seats], self.pots[games, 1 - seats]
+        balance = self.balances[games, seats]
+        position = self.positions[games, seats]
+
+        # The player's own placed and kept cards are seen by them, though not by the table
+        rows = np.arange(len(games))
+        counts = self.unseen[games]
+        counts[rows, self.cards[games, seats]] -= 1
+        counts[rows, self.hands[games, seats].max(axis=1)] -= 1
+        success_probability = BatchUtility.success_calc(counts, self.cards[games, seats])
+        stack = balance + own
+        highest = np.maximum(own, opponent)
+
+        random_factor = self.rng.integers(0, 78, len(games)) / 100
+        confident = success_probability > random_factor
+
+        # Level or behind, the Kelly bet covers a raise to highest + 1; short, only a certain win covers the all in
+        stands = np.select([balance == 0, balance <= opponent - own, own == opponent], [BROKE, SHORT, EVEN], BEHIND)
+        # A wager bigger than a balance can leave it negative; such stakes read the table's edges
+        need, bank = np.clip(highest + 1, 0, self.chips + 1), np.clip(stack, 0, self.chips)
+        limit = np.where(stands == SHORT, 1.0, self.thresholds[need, bank])
+        kelly = success_probability >= limit
+        return self.policy[position, stands, kelly.astype(np.intp), confident.astype(np.intp)]
+
+    """ Regular Poker betting rules, applied to every game at once """
+    def betting_phase(self, games):
+        self.round_winner[games] = -1
+        self.folded[games] = False
+        self.pots[games] = self.wager
+        self.balances[games] -= self.wager
+
+        betting = games
+        while len(betting):
+            for turn in (0, 1):
+                # A fold ends the pass, as the other player is the only one left
+                acting = betting[~self.folded[betting].any(axis=1)]
+                seats = self.first[acting] ^ turn
+                pick = self.ai_pick(acting, seats)
+
+                highest = self.pots[acting].max(axis=1)
+                amount = np.select(
+                    [pick == CALL, pick == RAISE, pick == ALL_IN],
+                    [highest - self.pots[acting, seats], highest - self.pots[acting, seats] + 1, self.balances[acting, seats]],
+                    0,
+                )
+                self.pots[acting, seats] += amount
+                self.balances[acting, seats] -= amount
+                self.folded[acting, seats] = pick == FOLD
+
+            # Keep betting while a player who can still bet is below the highest pot
+            pots, balances = self.pots[betting], self.balances[betting]
+            behind = (pots != pots.max(axis=1, keepdims=True)) & (balances > 0) & ~self.folded[betting]
+            betting = betting[behind.any(axis=1) & ~self.folded[betting].any(axis=1)]
+
+        folded = self.folded[games]
+        self.round_winner[games] = np.where(folded[:, 0], 1, np.where(folded[:, 1], 0, -1))
+
+    """ All players reveal their cards; Winner is decided and goes first next round """
+    def showdown_phase(self, games):
+        games = games[self.round_winner[games] == -1]
+        first, second = self.cards[games, 0], self.cards[games, 1]
+        aces_lose = ((first == 14) & (second == 2)) | ((second == 14) & (first == 2))
+        first_wins = (first > second) ^ aces_lose
+        self.round_winner[games] = np.where(first == second, -1, np.where(first_wins, 0, 1))
+
+    """ Reallocate the bets; the winner takes the smaller pot from the loser, and the rest of the bigger pot is returned """
+    def payout_phase(self, games):
+        winner = self.round_winner[games]
+        self.balances[games] += self.pots[games]
+        won, seats = games[winner != -1], winner[winner != -1]
+        contested = self.pots[won].min(axis=1)
+        self.balances[won, seats] += contested
+        self.balances[won, 1 - seats] -= contested
+        self.first[won] = seats
+        self.pots[games] = 0
+
+    """ End games with a bankrupt player or an empty pile; the board cards are no longer unseen """
+    def player_elimination(self, games):
+        broke = (self.balances[games] == 0)
+        over = broke.any(axis=1) | (self.top[games] >= self.size)
+        self.winner[games] = np.where(broke[:, 0], 1, np.where(broke[:, 1], 0, -1))
+        self.active[games[over]] = False
+
+        for seat in (0, 1):
+            self.unseen[games, self.cards[games, seat]] -= 1
+
+    """ Play one round in every unfinished game """
+    def play_round(self):
+        games = self.games[self.active]
+        self.rounds[games] += 1
+        self.draw_phase(games)
+        self.card_ranking(games)
+        self.decision_phase(games)
+        self.betting_phase(games)
+        self.showdown_phase(games)
+        self.payout_phase(games)
+        self.player_elimination(games)
+        return games
+
+    """ Main loop; returns the winning seat of every game (-1 for a tie) """
+    def run(self):
+        while self.active.any():
+            self.play_round()
+        return self.winner
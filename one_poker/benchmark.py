@@ -0,0 +1,231 @@
+""" Benchmarks of the engine's hot paths and of full headless games, with JSON results and baseline comparison """
+from argparse import ArgumentParser
+import gc
+import json
+from multiprocessing import get_context
+import os
+import platform
+from random import Random
+import statistics
+import sys
+import time
+
+from .engine import BettingState, CardTracker, Deck, Game, Heuristic, Player, Utility
+
+
+# Every case draws its inputs from Random(SEED), so runs time identical work
+SEED = 20240601
+
+
+""" A headless AI-vs-AI game, dealt and placed up to the betting phase """
+def dealt_game(rng):
+    game = Game(Heuristic(), Heuristic(), headless=True, seed=rng.getrandbits(64))
+    game.update_round()
+    game.draw_phase()
+    game.card_ranking()
+    for _ in game.decision_phase():
+        pass
+    return game
+
+
+def deck_setup(rng):
+    return (Random(rng.getrandbits(64)),)
+
+
+def deck_run(rng):
+    Deck(rng=rng)
+
+
+def draw_setup(rng):
+    return Player(ai=True), Deck(rng=rng)
+
+
+def draw_run(player, deck):
+    player.draw(deck)
+
+
+def ranking_setup(rng):
+    game = Game(Heuristic(), Heuristic(), headless=True, seed=rng.getrandbits(64))
+    game.draw_phase()
+    return (game,)
+
+
+def ranking_run(game):
+    game.card_ranking()
+
+
+""" A tracker part way through a game, just after a card was seen, as the Heuristic finds it when it picks """
+def win_probability_setup(rng):
+    tracker = CardTracker({value: rng.randint(2, 12) for value in range(2, 15)})
+    tracker.remove(rng.randint(2, 14))
+    return tracker, rng.randint(2, 14), (rng.randint(2, 14),)
+
+
+def win_probability_run(tracker, reference, held):
+    tracker.win_probability(reference, held)
+
+
+def kelly_setup(rng):
+    return rng.random(), rng.uniform(0.25, 4)
+
+
+def kelly_run(success_probability, odds):
+    Utility.kelly_criterion(success_probability, odds)
+
+
+def pick_setup(rng):
+    game = dealt_game(rng)
+    game.Board.bets = {player: game.wager for player in game.Board.bets}
+    game.betting = BettingState(game.Board.bets, game.player_order)
+    player = game.player_order[0]
+    return player, game
+
+
+def pick_run(player, game):
+    player.ai.pick(player, game)
+
+
+def betting_setup(rng):
+    return (dealt_game(rng),)
+
+
+def betting_run(game):
+    for _ in game.betting_phase():
+        pass
+
+
+def game_setup(rng):
+    return (rng.getrandbits(64),)
+
+
+def game_run(seed):
+    Game(Heuristic(), Heuristic(), headless=True, seed=seed).run()
+
+
+""" Played in a freshly spawned worker: the first hand of a game; returns whether Tk was imported on the way """
+def first_hand(seed):
+    game = Game(Heuristic(), Heuristic(), headless=True, seed=seed)
+    next(game.play())
+    return 'tkinter' in sys.modules
+
+
+def spawn_setup(rng):
+    return (rng.getrandbits(64),)
+
+
+""" Spawn a pool worker, as tournaments and evaluations do where fork is unavailable, and wait for its first hand """
+def spawn_run(seed):
+    with get_context('spawn').Pool(1) as pool:
+        if pool.apply(first_hand, (seed,)):
+            raise RuntimeError('A headless worker imported Tk')
+
+
+# name: (setup building one call's arguments, the timed call, calls per sample)
+CASES = {
+    'deck': (deck_setup, deck_run, 200),
+    'player_draw': (draw_setup, draw_run, 5000),
+    'card_ranking': (ranking_setup, ranking_run, 2000),
+    'win_probability': (win_probability_setup, win_probability_run, 20000),
+    'kelly_criterion': (kelly_setup, kelly_run, 50000),
+    'ai_pick': (pick_setup, pick_run, 2000),
+    'betting_phase': (betting_setup, betting_run, 1000),
+    'game': (game_setup, game_run, 50),
+    'spawn_first_hand': (spawn_setup, spawn_run, 3),
+}
+
+
+""" Time a case; arguments are built before the clock starts and the collector is off while it runs """
+def measure(setup, run, number, repeat):
+    samples = []
+    for _ in range(repeat):
+        rng = Random(SEED)
+        calls = [setup(rng) for _ in range(number)]
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for arguments in calls:
+                run(*arguments)
+            samples.append((time.perf_counter() - start) / number)
+        finally:
+            gc.enable()
+    return {
+        'calls': number,
+        'repeat': repeat,
+        'min_us': min(samples) * 1e6,
+        'median_us': statistics.median(samples) * 1e6,
+        'stdev_us': statistics.stdev(samples) * 1e6 if len(samples) > 1 else 0,
+        'per_second': 1 / statistics.median(samples),
+    }
+
+
+""" What the numbers depend on; comparisons across different environments are flagged """
+def environment():
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run(names, repeat=7, scale=1.0, report=print):
+    results = {}
+    for name in names:
+        setup, call, number = CASES[name]
+        results[name] = measure(setup, call, max(1, int(number * scale)), repeat)
+        report(f'{name:<16} {results[name]["median_us"]:>12.3f} us  {results[name]["per_second"]:>14,.0f} /s')
+    return {'seed': SEED, 'environment': environment(), 'results': results}
+
+
+""" Median ratios against a baseline run; a ratio above 1 + threshold is a regression """
+def compare(current, baseline, threshold=0.1):
+    regressions = []
+    rows = []
+    for (name, result) in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        ratio = result['median_us'] / baseline['results'][name]['median_us']
+        rows.append((name, baseline['results'][name]['median_us'], result['median_us'], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Benchmark the One Poker engine')
+    parser.add_argument('cases', nargs='*', help=f'cases to run (default: all of {", ".join(CASES)})')
+    parser.add_argument('--repeat', type=int, default=7, help='samples per case; the median is reported')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for the calls per sample')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='compare with the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown that counts as a regression')
+    parser.add_argument('--cpu', type=int, default=None, help='pin the process to this CPU')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f'unknown cases: {", ".join(unknown)}')
+
+    if args.cpu is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {args.cpu})
+
+    current = run(args.cases or list(CASES), args.repeat, args.scale)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(current, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if baseline['environment'] != current['environment']:
+            print('The baseline was recorded in a different environment', file=sys.stderr)
+        rows, regressions = compare(current, baseline, args.threshold)
+        print(f'\n{"Case":<16} {"Baseline us":>12} {"Current us":>12} {"Ratio":>7}')
+        for (name, before, after, ratio) in rows:
+            print(f'{name:<16} {before:>12.3f} {after:>12.3f} {ratio:>7.2f}{"  REGRESSION" if name in regressions else ""}')
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+""" Versioned on-disk cache of precomputed tables, shared read-only between processes through mmap """
+from argparse import ArgumentParser
+import atexit
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+
+# Bump when a builder changes what it computes; tables of other versions are never read
+VERSION = 1
+
+# Directory of the default cache; set it (or call configure) before starting pools, and the workers inherit it
+ENVIRONMENT = 'ONE_POKER_CACHE'
+
+# A build lock older than this (seconds) belongs to a builder that died, whatever process holds it
+STALE = 3600
+
+# Build locks this process holds; a build cut short by the end of the process still releases its lock
+_held = set()
+
+
+def _release(lock):
+    if lock in _held:
+        _held.discard(lock)
+        try:
+            os.remove(lock)
+        except FileNotFoundError:
+            pass
+
+
+@atexit.register
+def _release_all():
+    for lock in list(_held):
+        _release(lock)
+
+
+"""
+CardTracker.win_probability for every (beaten, population, opponents) a deck of subdecks can produce: a band holds
+at most 8 values of 4 * subdecks copies, counting the 2s against an Ace. Splitting the deck does not change it.
+"""
+def probability_table(subdecks):
+    from .engine import MAX_PLAYERS, all_beaten
+    size = 8 * 4 * subdecks + 1
+    table = np.zeros((size, size, MAX_PLAYERS))
+    for population in range(size):
+        for beaten in range(population + 1):
+            for opponents in range(MAX_PLAYERS):
+                table[beaten, population, opponents] = all_beaten(beaten, population, opponents)
+    return table
+
+
+""" The batch engine's Kelly thresholds (policy.threshold_table) for the chips of two balances """
+def threshold_table(balance):
+    from .policy import threshold_table
+    return np.array(threshold_table(2 * balance))
+
+
+""" A solved strategy table (Solver.table), with the solver's command-line defaults """
+def strategy_table(balance, wager):
+    from .solver import Solver
+    return Solver(balance, wager).solve()
+
+
+# Builder of every table, and the parameters that key it
+BUILDERS = {
+    'probability': (probability_table, ('subdecks',)),
+    'thresholds': (threshold_table, ('balance',)),
+    'strategy': (strategy_table, ('balance', 'wager')),
+}
+
+
+class TableCache():
+    """
+    Tables as .npy files named by table, version and key, opened with mmap_mode='r': every process reading a table
+    maps the same pages of the page cache instead of holding its own copy. A table is written to a temporary file
+    and renamed into place, so readers only ever see whole tables. A lock file lets one process build each missing
+    table, and another process takes the lock over once that process has ended; get() starts that build on a
+    background thread and returns None meanwhile, for the caller to compute what it needs on the fly.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.tables = {}
+        self.building = set()
+        self.lock = threading.Lock()
+
+    def path(self, name, **key):
+        function, fields = BUILDERS[name]
+        if set(key) != set(fields):
+            raise ValueError(f'The {name} table is keyed by {", ".join(fields)}')
+        parameters = '-'.join(f'{field}{key[field]}' for field in fields)
+        return os.path.join(self.directory, f'{name}-v{VERSION}-{parameters}.npy')
+
+    """ The table, mapped read-only, or None if it is not built yet """
+    def open(self, name, **key):
+        path = self.path(name, **key)
+        table = self.tables.get(path)
+        if table is None and os.path.exists(path):
+            table = self.tables[path] = np.load(path, mmap_mode='r')
+        return table
+
+    """ The table if it is built; otherwise start building it in the background and return None """
+    def get(self, name, **key):
+        table = self.open(name, **key)
+        if table is None:
+            self.build_in_background(name, **key)
+        return table
+
+    """ Build the table now, unless another process is building it, and return it (None in that case) """
+    def build(self, name, **key):
+        path = self.path(name, **key)
+        if not self.claim(path):
+            return self.open(name, **key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            # Another builder may have finished between our check and our claim; a dead one leaves its file behind
+            if not os.path.exists(path):
+                for leftover in glob.glob(f'{glob.escape(path)}.*.tmp'):
+                    os.remove(leftover)
+                function, _ = BUILDERS[name]
+                table = function(**key)
+                with open(temporary, 'wb') as file:
+                    np.save(file, table)
+                os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            _release(f'{path}.lock')
+        return self.open(name, **key)
+
+    def build_in_background(self, name, **key):
+        path = self.path(name, **key)
+        with self.lock:
+            if path in self.building:
+                return
+            self.building.add(path)
+        threading.Thread(target=self.build_once, args=(name,), kwargs=key, daemon=True).start()
+
+    """
+    A background build: the table can be built again once it is over, whether it succeeded or failed. A failure
+    is raised on, for the thread's excepthook to report.
+    """
+    def build_once(self, name, **key):
+        try:
+            self.build(name, **key)
+        finally:
+            with self.lock:
+                self.building.discard(self.path(name, **key))
+
+    """ Take the build lock of a table, holding the process id; a lock left behind by a dead builder is taken over """
+    def claim(self, path):
+        lock = f'{path}.lock'
+        for _ in range(2):
+            try:
+                descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self.abandoned(lock):
+                    return False
+                try:
+                    os.remove(lock)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(descriptor, 'w') as file:
+                file.write(str(os.getpid()))
+            _held.add(lock)
+            return True
+        return False
+
+    """
+    Whether the builder holding a lock is gone: its process has ended, or the lock is older than STALE. Processes
+    are only checked on POSIX, and a lock whose process id is not written yet is still held.
+    """
+    @staticmethod
+    def abandoned(lock):
+        try:
+            with open(lock) as file:
+                owner = file.read()
+            age = time.time() - os.path.getmtime(lock)
+        except FileNotFoundError:
+            return True
+        if age >= STALE:
+            return True
+        if os.name != 'posix' or not owner.isdigit():
+            return False
+        try:
+            os.kill(int(owner), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    """ (file name, size in bytes, whether it is of this version) of every table in the directory """
+    def entries(self):
+        for file in sorted(os.listdir(self.directory)):
+            if file.endswith('.npy'):
+                yield file, os.path.getsize(os.path.join(self.directory, file)), f'-v{VERSION}-' in file
+
+    """ Remove the tables of other versions, or all of them """
+    def clear(self, everything=False):
+        removed = []
+        for (file, _, current) in self.entries():
+            if everything or not current:
+                os.remove(os.path.join(self.directory, file))
+                removed.append(file)
+        self.tables.clear()
+        return removed
+
+
+_default = None
+
+
+""" The cache in the directory named by the environment, if any """
+def default():
+    global _default
+    directory = os.environ.get(ENVIRONMENT)
+    if not directory:
+        return None
+    if _default is None or _default.directory != directory:
+        _default = TableCache(directory)
+    return _default
+
+
+""" Use a cache directory in this process and in the processes it starts """
+def configure(directory):
+    os.environ[ENVIRONMENT] = directory
+    return default()
+
+
+""" The table from the default cache, or None when there is no cache or the table is still being built """
+def lookup(name, **key):
+    cache = default()
+    return cache.get(name, **key) if cache else None
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Build, list or clear the cache of precomputed tables')
+    parser.add_argument('action', choices=('build', 'list', 'clear'))
+    parser.add_argument('--directory', default=os.environ.get(ENVIRONMENT), help=f'cache directory (default: ${ENVIRONMENT})')
+    parser.add_argument('--tables', nargs='*', choices=tuple(BUILDERS), default=list(BUILDERS))
+    parser.add_argument('--subdecks', type=int, nargs='*', default=[3])
+    parser.add_argument('--balance', type=int, default=10)
+    parser.add_argument('--wager', type=int, default=1)
+    parser.add_argument('--all', action='store_true', help='clear the tables of this version too')
+    args = parser.parse_args(argv)
+    if not args.directory:
+        parser.error(f'no cache directory: pass --directory or set {ENVIRONMENT}')
+
+    cache = TableCache(args.directory)
+    if args.action == 'build':
+        keys = {
+            'probability': [{'subdecks': subdecks} for subdecks in args.subdecks],
+            'thresholds': [{'balance': args.balance}],
+            'strategy': [{'balance': args.balance, 'wager': args.wager}],
+        }
+        for name in args.tables:
+            for key in keys[name]:
+                started = time.perf_counter()
+                table = cache.build(name, **key)
+                path = os.path.basename(cache.path(name, **key))
+                if table is None:
+                    print(f'{path}: being built by another process')
+                else:
+                    print(f'{path}: {table.nbytes / 2 ** 20:.1f} MiB in {time.perf_counter() - started:.1f} s')
+    elif args.action == 'list':
+        for (file, size, current) in cache.entries():
+            print(f'{file:<48} {size / 2 ** 20:8.1f} MiB{"" if current else "  (old version)"}')
+    else:
+        for file in cache.clear(args.all):
+            print(f'Removed {file}')
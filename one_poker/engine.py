@@ -0,0 +1,894 @@
+from functools import lru_cache, partial
+from math import comb
+import os
+from queue import Queue, SimpleQueue
+from random import Random
+import threading
+import time
+
+from .policy import compiled_pick
+
+
+class Card():
+    """ Display form of a card; the engine itself works on compact card codes """
+    value_letters = {11: 'J', 12: 'Q', 13: 'K', 14: 'A'}
+    suits = ["♥", "♠", "♦", "♣"]
+    
+    def __init__(self, suit, value):
+        self.suit = suit
+        self.letter = self.value_letters[value] if value in self.value_letters else None
+        self.value = value
+        self.ranking = 'High' if self.value > 7 else 'Low'
+        self.name = self.suit + (self.letter or str(self.value))
+    
+    def __repr__(self):
+        return self.name
+
+    """ Compact code of a card: suit index * 13 + value - 2 """
+    @classmethod
+    def encode(cls, suit, value):
+        return cls.suits.index(suit) * 13 + value - 2
+
+
+# Lookup tables from a card code (0-51) to its value, High flag and display Card
+VALUES = bytes(code % 13 + 2 for code in range(52))
+HIGH = bytes(value > 7 for value in VALUES)
+CARDS = tuple(Card(suit, value) for suit in Card.suits for value in range(2, 15))
+
+
+""" A card of value is in the reference card's band; the Ace's band takes in the 2s, and the 2's band the Aces """
+def contests(reference, value):
+    if (reference, value) in ((14, 2), (2, 14)):
+        return True
+    return (reference > 7) == (value > 7)
+
+
+""" The reference card beats a card of value; an Ace loses to a 2 """
+def beats(reference, value):
+    if reference == 14:
+        return 7 < value < 14
+    elif reference == 2:
+        return value == 14
+    return contests(reference, value) and value < reference
+
+
+# CONTESTS[reference][value] and BEATS[reference][value] as lookup tables over card values 0-14
+CONTESTS = tuple(bytes(contests(reference, value) for value in range(15)) for reference in range(15))
+BEATS = tuple(bytes(beats(reference, value) for value in range(15)) for reference in range(15))
+
+
+# Lines kept in the GUI action log; the full record is the hand history (history.py)
+LOG_LIMIT = 500
+
+# Seats per table
+MIN_PLAYERS, MAX_PLAYERS = 2, 9
+
+# Events a Game can be subscribed to (Game.subscribe); callbacks get the game and the event's arguments
+EVENTS = ('on_round_start', 'on_action', 'on_showdown', 'on_round_end', 'on_game_end')
+
+
+# Probability tables of the table cache by subdecks, mapped once per process (cache.probability_table)
+PROBABILITIES = {}
+
+
+"""
+The cached probability table of a deck, or None. The cache (and NumPy with it) is only imported when its directory
+is set, in the environment variable cache.ENVIRONMENT names, so headless games and the GUI start without it.
+"""
+def probabilities(subdecks):
+    table = PROBABILITIES.get(subdecks)
+    if table is None and os.environ.get('ONE_POKER_CACHE'):
+        from .cache import lookup
+        table = lookup('probability', subdecks=subdecks)
+        if table is not None:
+            PROBABILITIES[subdecks] = table
+    return table
+
+
+class Deck():
+    def __init__(self, subdecks=3, split=2, rng=None):
+        self.cards = bytearray(code for code in range(52) for _ in range(subdecks))
+        self.split = int(len(self.cards) / split)
+
+        # Shuffle only the kept part: a partial Fisher-Yates over the first self.split positions
+        randrange = rng.randrange if rng else Random().randrange
+        for index in range(self.split):
+            swap = randrange(index, len(self.cards))
+            self.cards[index], self.cards[swap] = self.cards[swap], self.cards[index]
+        del self.cards[self.split:]
+        self.top = 0
+        self.tracker = CardTracker({value: 4 * subdecks for value in range(2, 15)})
+        self.tracker.probabilities = probabilities(subdecks)
+
+    """ Take the next card code from the pile """
+    def draw(self):
+        card = self.cards[self.top]
+        self.top += 1
+        return card
+
+    """ Number of cards left to draw """
+    def __len__(self):
+        return len(self.cards) - self.top
+
+
+class CardCounter(dict):
+    """ Card counts by value, with running High and Low band sums and a cached win probability table """
+    def __init__(self, counts):
+        super().__init__(counts)
+        self.rebuild()
+
+    """ Recompute the band sums from scratch """
+    def rebuild(self):
+        # below[value]: copies of the values under it within its own band (2-7 or 8-14)
+        self.below = {}
+        self.population = {'High': 0, 'Low': 0}
+        for value in sorted(self):
+            band = 'High' if value > 7 else 'Low'
+            self.below[value] = self.population[band]
+            self.population[band] += self[value]
+        self.table = None
+
+    def __setitem__(self, value, copies):
+        super().__setitem__(value, copies)
+        self.rebuild()
+
+    """ Take one copy of a value away, if any are left; only the bounded band above it is touched """
+    def remove(self, value):
+        if not self[value]:
+            return
+        super().__setitem__(value, self[value] - 1)
+        band = 'High' if value > 7 else 'Low'
+        self.population[band] -= 1
+        for above in range(value + 1, 15 if band == 'High' else 8):
+            self.below[above] -= 1
+        self.table = None
+
+    """ Copies the reference card beats and copies in its band, served from the cached table """
+    def band_counts(self, reference):
+        if self.table is None:
+            self.table = {}
+            for value in self:
+                if value == 14:
+                    population = self.population['High'] + self[2]
+                    bigger_than = self.below[14]
+                elif value == 2:
+                    population = self.population['Low'] + self[14]
+                    bigger_than = self[14]
+                else:
+                    population = self.population['High' if value > 7 else 'Low']
+                    bigger_than = self.below[value]
+                self.table[value] = (bigger_than, population)
+        return self.table[reference]
+
+
+""" Chance that all of opponents cards, drawn without replacement from population, are among the beaten ones """
+@lru_cache(maxsize=None)
+def all_beaten(beaten, population, opponents):
+    # No more opponents than cards in the band can hold one
+    opponents = min(opponents, population)
+    if not opponents:
+        return 0
+    return comb(beaten, opponents) / comb(population, opponents)
+
+
+class CardTracker(CardCounter):
+    """
+    Exact posterior of a Deck's unseen cards, as unseen copies by value. The pile keeps a uniform random part
+    of the shoe, so given the cards seen so far every hidden card (in the pile or another player's hand) is
+    equally likely to be any unseen copy, and the chance that other players hold only cards the reference beats
+    is hypergeometric.
+    """
+    # Precomputed all_beaten for the deck (cache.probability_table), when the table cache has it
+    probabilities = None
+
+    """
+    Chance that the player's reference card beats the hidden cards of as many other players as opponents, each
+    within the card's band: High cards against High cards, Low against Low, and the 2 against the Ace. held are
+    the values of the player's other cards; those copies, like the reference card itself, are seen by the player
+    but still unseen by the table.
+    """
+    def win_probability(self, reference, held=(), opponents=1):
+        beaten, population = self.band_counts(reference)
+        population -= 1
+        for value in held:
+            beaten -= BEATS[reference][value]
+            population -= CONTESTS[reference][value]
+        if self.probabilities is not None:
+            return float(self.probabilities[beaten, population, opponents])
+        return all_beaten(beaten, population, opponents)
+
+
+class Player():
+    def __init__(self, ai):
+        # ai is False for a human seat, True for the default Heuristic or a strategy instance
+        self.ai = Heuristic() if ai is True else ai
+        self.hand = []
+        self.balance = 10
+        self.name = None
+        # The seat's own random stream for AI noise, set by the Game
+        self.rng = None
+        self.high = 0
+        self.low = 0
+        self.position = None
+        
+    def draw(self, deck):
+        while len(self.hand) != 2:
+            self.hand.append(deck.draw())
+
+    """ Place a card from the hand; the AI chooses it, a human's choice is passed in """
+    def place_card(self, game, card=None):
+        if card is None:
+            card = self.ai.place_card(self, game)
+        
+        self.hand.remove(card)
+        return card
+        
+    def bet(self, amount):
+        self.balance -= amount
+        return amount
+    
+    def __repr__(self):
+        return self.name
+
+
+class Gameboard():
+    def __init__(self, *players):
+        self.bets = {player: 0 for player in players}
+        self.cards = {player: None for player in players}
+        self.discard_pile = []
+    
+    def clear_board(self):
+        self.bets = {player: 0 for player in self.bets}
+        self.discard_pile.extend(self.cards.values())
+        self.cards = {player: None for player in self.cards}
+
+
+class BettingState():
+    """
+    Running state of a betting phase, updated in O(1) per action: the highest pot, the folded players,
+    and how many players are still in, can still bet, and are behind the highest pot
+    """
+    def __init__(self, pot, players):
+        self.pot = pot
+        self.max_bet = max(pot.values())
+        # Players of the current pass, and the index of the one acting
+        self.turn = list(players)
+        self.cursor = 0
+        self.folded = set()
+        self.live = len(players)
+        self.able = sum(1 for player in players if player.balance)
+        self.behind = sum(1 for player in players if self.is_behind(player))
+
+    """ Still in, able to bet and below the highest pot """
+    def is_behind(self, player):
+        return player.balance > 0 and self.pot[player] < self.max_bet and player not in self.folded
+
+    """ Move amount from the player's balance into their pot """
+    def bet(self, player, amount):
+        was_behind, had_balance = self.is_behind(player), player.balance > 0
+        self.pot[player] += player.bet(amount)
+        if had_balance and not player.balance:
+            self.able -= 1
+
+        if self.pot[player] > self.max_bet:
+            # Everyone else who can still bet is now behind
+            self.max_bet = self.pot[player]
+            self.behind = self.able - (1 if player.balance else 0)
+        elif was_behind and not self.is_behind(player):
+            self.behind -= 1
+        return amount
+
+    def fold(self, player):
+        if self.is_behind(player):
+            self.behind -= 1
+        if player.balance:
+            self.able -= 1
+        self.live -= 1
+        self.folded.add(player)
+
+
+""" The players holding the best card, in the order given; a 2 knocks out every Ace, then the highest card wins """
+def best_cards(cards, players):
+    values = [VALUES[cards[player]] for player in players]
+    if 14 in values and 2 in values:
+        best = max(value for value in values if value != 14)
+    else:
+        best = max(values)
+    return [player for (player, value) in zip(players, values) if value == best]
+
+
+"""
+Main pot and side pots, as (amount, players still in that contest it), from the lowest bet up.
+bets holds the bet of every player in players (folded ones included); live are the players still in.
+"""
+def side_pots(bets, players, live):
+    levels = set(bets[player] for player in live)
+    if len(levels) == 1:
+        # Nobody still in went all in for less: a single pot
+        return [(sum(bets[player] for player in players), live)]
+
+    pots = []
+    floor = 0
+    for level in sorted(levels):
+        amount = sum(min(bets[player], level) - min(bets[player], floor) for player in players)
+        pots.append((amount, [player for player in live if bets[player] >= level]))
+        floor = level
+
+    # Chips above the highest bet still in (a raise that was later folded) go to the last pot
+    amount, winners = pots[-1]
+    pots[-1] = (amount + sum(bets[player] - floor for player in players if bets[player] > floor), winners)
+    return pots
+
+
+class Utility():
+    """ Calculate martingale """
+    def kelly_criterion(success_probability, odds=1):
+        return success_probability - ((1 - success_probability) / odds)
+
+
+class Heuristic():
+    """ The default AI: Kelly sizing with a random confidence threshold """
+    def place_card(self, player, game):
+        if player.position == "Advantage" or player.position == "Disadvantage":
+            return min(player.hand, key=VALUES.__getitem__)
+        else:
+            return max(player.hand, key=VALUES.__getitem__)
+
+    def pick(self, player, game):
+        # Highest pot; Calculate success probability, of beating every other player still in the round
+        pot = game.Board.bets
+        highest = game.betting.max_bet
+        held = [VALUES[card] for card in player.hand]
+        success_probability = game.Pile.tracker.win_probability(VALUES[game.Board.cards[player]], held, game.betting.live - 1)
+
+        # https://math.stackexchange.com/questions/1917807/game-theory-optimal-solution-to-2-player-betting-game
+        random_factor = player.rng.randint(0, 77) / 100
+
+        # Odds, the Kelly bet and the branches on position and pots are compiled into tables (policy.py)
+        return compiled_pick(player.position, success_probability, random_factor, pot[player], highest, player.balance)
+
+
+class RandomPlay():
+    """ Baseline AI: a random card and a random legal pick """
+    def place_card(self, player, game):
+        return player.rng.choice(player.hand)
+
+    def pick(self, player, game):
+        return player.rng.choice(game.legal_picks(player))
+
+
+class RoundResult():
+    """ Outcome of a single round, keyed by player name """
+    def __init__(self, round, order, hands, cards, bets, actions, winner, balances):
+        self.round = round
+        self.order = order
+        self.hands = hands
+        self.cards = cards
+        self.bets = bets
+        self.actions = actions
+        self.winner = winner
+        self.balances = balances
+
+    def __repr__(self):
+        return f'Round {self.round}: {self.winner or "tie"} {self.balances}'
+
+
+class GameResult():
+    """ Outcome of a complete game; winner is None when the game ends in a tie """
+    def __init__(self, winner, rounds):
+        self.winner = winner
+        self.rounds = rounds
+
+    def __repr__(self):
+        return f'{self.winner or "Tie"} after {len(self.rounds)} rounds'
+
+
+class Game():
+    """ A table of 2 to 9 seats; each seat is False for a human, True for the Heuristic or a strategy instance """
+    def __init__(self, *seats, wager=1, headless=False, seed=None, history=None, pace=1):
+        if not MIN_PLAYERS <= len(seats) <= MAX_PLAYERS:
+            raise ValueError(f'A table seats {MIN_PLAYERS} to {MAX_PLAYERS} players, not {len(seats)}')
+        # The wager used to be the third positional argument; a number is not a seat
+        for (index, seat) in enumerate(seats):
+            strategy = not isinstance(seat, type) and hasattr(seat, 'place_card') and hasattr(seat, 'pick')
+            if not isinstance(seat, bool) and not strategy:
+                raise TypeError(f'Seat {index + 1} is {seat!r}: a seat is True, False or a strategy with place_card '
+                                f'and pick (pass the wager as wager=)')
+
+        # Define players; P1, P2, ... in seat order
+        self.players = [Player(ai=seat) for seat in seats]
+        for (index, player) in enumerate(self.players):
+            player.name = f'P{index + 1}'
+
+        # Set by the GUI once its widgets exist, and by the continue button
+        self.Flag = threading.Event()
+
+        # GUI; a headless game plays the same rounds without Tk, threads or pacing.
+        # Human seats of a headless game are answered by whoever drives Game.play (see server.py)
+        if headless:
+            self.GUI = None
+        else:
+            # Tk is only loaded by games that open a window
+            from .gui import GUI
+            self.updates = SimpleQueue()
+            self.GUI = GUI(self.players, self.Flag, self.updates)
+            self.thread1 = threading.Thread(target=self.GUI.run)
+            self.thread1.start()
+
+        # Private random stream for shuffling and seeding the seats, so seeded games can be reproduced
+        self.seed = Random().getrandbits(64) if seed is None else seed
+        self.rng = Random(self.seed)
+
+        # Optional HandHistoryWriter that receives every round
+        self.history = history
+
+        # Randomize player order
+        self.player_set = set(self.players)
+        self.player_order = self.players.copy()
+        self.rng.shuffle(self.player_order)
+
+        # Initialize board; Define wage; Initialize deck, with more subdecks for bigger tables (3 for 2 players)
+        self.Board = Gameboard(*self.players)
+        self.wager = wager
+        self.Pile = Deck(subdecks=max(3, 3 * len(self.players) // 2), rng=self.rng)
+
+        # Every seat draws its AI noise from its own stream, seeded after the deal: the same seed gives a seat the
+        # same cards and the same noise whatever strategy sits in it (common random numbers, see evaluate.py)
+        for player in self.players:
+            player.rng = Random(self.rng.getrandbits(64))
+        
+        # If the continue button should be pressed to go to the next round; seconds between GUI rounds
+        self.auto_continue = False
+        self.pace = pace
+
+        # Optional advisor.Advisor showing the human seats the estimated chips of each pick
+        self.advisor = None
+
+        # Global pick variable; the betting buttons post their choice (and the raise entry) to self.picks
+        self.pick = None
+        self.picks = Queue()
+        self.raise_entry = ''
+
+        # The card buttons post their name to self.card_choices; linked_cards is the card each one shows
+        self.card_choices = Queue()
+        self.linked_cards = {'Button_Card_Top': None, 'Button_Card_Bottom': None}
+
+        # Round number; seating order and hands (before a card is placed) of the current round; actions of its betting phase
+        self.round = 0
+        self.order = []
+        self.hands = {}
+        self.actions = []
+
+        # Round at whose start play() yields ('breakpoint', round) before dealing (see replay.py)
+        self.breakpoint = None
+
+        # Subscribed event callbacks, by event; BettingState and betting loop passes of the current round
+        self.hooks = {}
+        self.betting = None
+        self.betting_passes = 0
+
+        # Wait until all buttons have been created
+        if self.GUI:
+            self.Flag.wait()
+
+    """
+    The game thread never touches Tk: it posts updates that the GUI applies on its own thread (GUI.render).
+    A widget is a GUI attribute name, or (player, attribute) for the player rows.
+    """
+    def configure(self, widget, **options):
+        if self.GUI:
+            self.updates.put(('widget', widget, options))
+
+    """ Call callback(game, *arguments) whenever event happens; see EVENTS """
+    def subscribe(self, event, callback):
+        if event not in EVENTS:
+            raise ValueError(f'Unknown event: {event}')
+        self.hooks.setdefault(event, []).append(callback)
+
+    def unsubscribe(self, event, callback):
+        self.hooks[event].remove(callback)
+        if not self.hooks[event]:
+            del self.hooks[event]
+
+    """ Call the event's callbacks; callers check self.hooks first, so a game without subscribers pays nothing """
+    def emit(self, event, *arguments):
+        for callback in self.hooks.get(event, ()):
+            callback(self, *arguments)
+
+    """ Update a player's label on the GUI, if there is one """
+    def show(self, player, attribute, value):
+        if self.GUI:
+            self.updates.put(('widget', (player, attribute), {'text': value}))
+
+    """ Append a line to the GUI log, if there is one """
+    def log(self, text, colors=None):
+        if self.GUI:
+            self.updates.put(('log', text, colors))
+    
+    """ Button callbacks; these run on the Tk thread and only post to the game's queues """
+    def assign_betting_commands(self):
+        def on_click_choice(button):
+            if self.advisor:
+                self.advisor.cancel(self)
+            self.picks.put((self.GUI.widget(button)['text'], self.GUI.Entry_Raise.get()))
+
+        def on_click_card(button):
+            self.card_choices.put(button)
+
+        def on_click_continue():
+            self.GUI.Button_Continue['state'] = 'disabled'
+            self.Flag.set()
+
+        for button in ['Button_Check', 'Button_Raise', 'Button_Fold', 'Button_Call']:
+            self.configure(button, command=partial(on_click_choice, button))
+        for button in ['Button_Card_Top', 'Button_Card_Bottom']:
+            self.configure(button, command=partial(on_click_card, button))
+        self.configure('Button_Continue', command=on_click_continue)
+
+    """	Generate each player's high-low card count """
+    def card_ranking(self):
+        for player in self.player_set:
+            player.high = sum(HIGH[card] for card in player.hand)
+            player.low = len(player.hand) - player.high
+
+        # Positions are taken against the opponent with the most High cards
+        highs = sorted((player.high for player in self.player_set), reverse=True)
+        for player in self.player_set:
+            opponent_high = highs[1] if player.high == highs[0] else highs[0]
+            if player.high == 2 and opponent_high == 0:
+                player.position = "Advantage"
+            elif player.high == 0 and opponent_high >= 1:
+                player.position = "Disadvantage"
+            else:
+                player.position = "Neutral"
+                
+        for player in self.player_set:
+            self.show(player, 'high', player.high)
+            self.show(player, 'low', player.low)
+
+    """ Decide who goes first next round """
+    def next_round_order(self):
+        if self.Winner:
+            self.player_order.remove(self.Winner)
+            self.player_order.insert(0, self.Winner)
+
+    """ Draw until 2 cards in hand; the round's record of hands starts empty, so it only holds seats still in """
+    def draw_phase(self):
+        self.order = [player.name for player in self.player_order]
+        self.hands = {}
+        for player in self.player_order:
+            player.draw(self.Pile)
+
+    """ Place a card from the hand into the Board's cards object; yields ('card', player) for human seats """
+    def decision_phase(self):
+        for player in self.player_order:
+            # Update the card-choice buttons
+            if not player.ai and self.GUI:
+                # Card codes repeat across subdecks, so the kept button's card is matched by count, not identity
+                unlinked = list(player.hand)
+                for card in self.linked_cards.values():
+                    if card is not None:
+                        unlinked.remove(card)
+                for button in ['Button_Card_Bottom', 'Button_Card_Top']:
+                    if self.linked_cards[button] is None and unlinked:
+                        card = unlinked.pop()
+                        self.linked_cards[button] = card
+                        self.configure(button, text=CARDS[card])
+
+                self.configure('Button_Card_Top', state='normal')
+                self.configure('Button_Card_Bottom', state='normal')
+            
+            # Choose the card
+            self.hands[player.name] = tuple(player.hand)
+            if player.ai:
+                self.Board.cards[player] = player.place_card(self)
+            else:
+                self.Board.cards[player] = player.place_card(self, (yield ('card', player)))
+            # Update the board and buttons once the card has been placed down
+            self.show(player, 'card', 'Set Card')
+            self.configure('Button_Card_Top', state='disabled')
+            self.configure('Button_Card_Bottom', state='disabled')
+    
+    """ The picks a player may make against the current pots """
+    def legal_picks(self, player):
+        pot = self.Board.bets
+        highest = self.betting.max_bet
+        if player.balance == 0:
+            return ['Check']
+        elif player.balance <= highest - pot[player]:
+            return ['All in', 'Fold']
+        elif pot[player] == highest:
+            return ['Raise', 'Check', 'Fold']
+        elif pot[player] < highest:
+            return ['Raise', 'Call', 'Fold']
+        return ['Check']
+
+    """ Regular Poker betting rules; yields ('pick', player) for human seats """
+    def betting_phase(self):
+        # Manual human pick
+        def human_pick(player):
+            picks = self.legal_picks(player)
+            if 'All in' in picks:
+                self.configure('Button_Raise', text='All in')
+            if 'Raise' in picks:
+                self.configure('Entry_Raise', state='normal')
+            for (pick, button) in [('Raise', 'Button_Raise'), ('All in', 'Button_Raise'), ('Call', 'Button_Call'),
+                                   ('Check', 'Button_Check'), ('Fold', 'Button_Fold')]:
+                if pick in picks:
+                    self.configure(button, state='normal')
+
+            # Wait for the pick and the raise entry
+            self.pick, self.raise_entry = yield ('pick', player)
+
+            self.configure('Button_Raise', state='disabled', text='Raise')
+            self.configure('Entry_Raise', state='disabled')
+            for button in ['Button_Call', 'Button_Check', 'Button_Fold']:
+                self.configure(button, state='disabled')
+        
+        # Define / reset winner and the action record
+        self.Winner = None
+        self.actions = []
+
+        # Base wager
+        pot = self.Board.bets
+        for player in pot:
+            pot[player] += player.bet(self.wager)
+            self.show(player, 'balance', player.balance)
+            self.show(player, 'pot', pot[player])
+        
+        # Players in the current round, and the running state of their bets
+        self.round_players = self.player_order.copy()
+        betting = self.betting = BettingState(pot, self.round_players)
+        self.betting_passes = 0
+
+        # Start of the betting loop; every player acts once per pass, until nobody who can bet is behind
+        while betting.behind or not self.betting_passes:
+            self.betting_passes += 1
+            betting.turn = self.round_players.copy()
+            for (index, player) in enumerate(betting.turn):
+                # The last player left wins without acting
+                if betting.live == 1:
+                    break
+                betting.cursor = index
+                while self.pick is None:
+                    # Re/declare amount and pick, pick being a global variable
+                    amount = 0
+
+                    if player.ai:
+                        self.pick = player.ai.pick(player, self)
+                    else:
+                        yield from human_pick(player)
+
+                    self.pick = self.pick.lower()
+
+                    if self.pick == 'check':
+                        pass
+                    elif self.pick == 'fold':
+                        self.round_players.remove(player)
+                        betting.fold(player)
+                    elif self.pick == 'call':
+                        amount = betting.bet(player, betting.max_bet - pot[player])
+                    elif self.pick == 'raise':
+                        # Will only raise by the max bet + 1, can be changed to anything
+                        amount = betting.max_bet - pot[player] + 1 if player.ai \
+                                 else self.raise_entry
+                        if str(amount).isdigit() is False or betting.max_bet - pot[player] >= int(amount) or int(amount) > player.balance:
+                            self.pick = None
+                            continue
+                        else:
+                            amount = int(amount)
+                            if amount == player.balance:
+                                self.pick = 'all in'
+                            betting.bet(player, amount)
+
+                    elif self.pick == 'all in':
+                        amount = betting.bet(player, player.balance)
+
+                    self.actions.append((player.name, self.pick, amount))
+                    if self.hooks:
+                        self.emit('on_action', player.name, self.pick, amount)
+                    self.show(player, 'balance', player.balance)
+                    self.show(player, 'pot', pot[player])
+                    self.log(f'{player} {self.pick}s {amount if amount else str()}')
+
+                # Reset pick
+                self.pick = None
+        
+        # End of the betting loop
+
+        # If there's only 1 player left, they will be declared winner.
+        if len(self.round_players) == 1:
+            self.Winner = next(iter(self.round_players))
+            return
+            
+    # End of the betting phase
+
+    """ All players reveal their cards; Winner is decided, unless the best card is tied """
+    def showdown_phase(self):
+        # Reveal cards
+        for player in self.player_set:
+            self.show(player, 'card', CARDS[self.Board.cards[player]])
+
+        # Check if there already is a winner, else determine winner / tie.
+        if self.Winner:
+            self.next_round_order()
+            return
+
+        best = best_cards(self.Board.cards, self.round_players)
+        if len(best) == 1:
+            self.Winner = best[0]
+
+        if self.hooks:
+            self.emit('on_showdown', {player.name: self.Board.cards[player] for player in self.round_players},
+                      self.Winner.name if self.Winner else None)
+        self.next_round_order()
+
+    """ Reallocate the bets; every pot goes to the best cards among its players, and a tie splits it """
+    def payout_phase(self):
+        for (amount, players) in side_pots(self.Board.bets, self.Board.bets, self.round_players):
+            # A single pot was already decided by the fold or the showdown
+            if players is self.round_players and self.Winner:
+                self.Winner.balance += amount
+                continue
+            winners = best_cards(self.Board.cards, players)
+            share, odd = divmod(amount, len(winners))
+            for (index, player) in enumerate(winners):
+                player.balance += share + (index < odd)
+
+        if self.Winner is None:
+            tied = best_cards(self.Board.cards, self.round_players)
+            for player in tied:
+                self.configure((player, 'name'), bg='green yellow')
+
+            if len(tied) == len(self.player_set):
+                self.log('All players tie', {'bg': 'PaleGreen4', 'fg': 'black'})
+            else:
+                self.log(f'{", ".join(player.name for player in tied)} tie', {'bg': 'PaleGreen4', 'fg': 'black'})
+        else:
+            self.configure((self.Winner, 'name'), bg='green')
+            self.log(f'{self.Winner.name} wins', {'bg': 'PaleGreen4', 'fg': 'black'})
+        
+        for player in self.player_set:
+            self.show(player, 'balance', player.balance)
+            self.show(player, 'pot', 0)
+    
+    """ Eliminate any player with a balance of 0 """
+    def player_elimination(self):
+        for player in self.player_order.copy():
+            if player.balance == 0:
+                self.player_order.remove(player)
+                self.player_set.remove(player)
+                self.Board.cards.pop(player)
+                self.Board.bets.pop(player)
+                self.configure((player, 'name'), bg='red')
+    
+    """ The cards on the board have been seen by everyone; take them out of the Pile's unseen cards """
+    def adjust_cards_left(self):
+        for card in self.Board.cards.values():
+            self.Pile.tracker.remove(VALUES[card])
+    
+    """ Update GUI round label """
+    def update_round(self):
+        self.round += 1
+        self.configure('Label_Round', text=f'Round {self.round}')
+
+        self.log(f'Cards left: {len(self.Pile)}', {'bg': 'PaleGreen3', 'fg': 'black'})
+        self.log(f'Round {self.round}', {'bg': 'PaleGreen3', 'fg': 'black'})
+
+    """ Record the outcome of the round before players are eliminated and the board is cleared """
+    def round_result(self):
+        return RoundResult(
+            round=self.round,
+            order=self.order,
+            hands=dict(self.hands),
+            cards={player.name: card for (player, card) in self.Board.cards.items()},
+            bets={player.name: bet for (player, bet) in self.Board.bets.items()},
+            actions=self.actions,
+            winner=self.Winner.name if self.Winner else None,
+            balances={player.name: player.balance for player in self.players},
+        )
+
+    """ Wait for the continue button to be pressed (if auto_continue if False); Reset labels """
+    def go_to_next_round(self):
+        if self.auto_continue is False:
+            self.Flag.clear()
+            self.configure('Button_Continue', state='normal')
+        
+        self.Flag.wait() # wait until continue is pressed, if auto_continue is off
+        for button in ['Button_Card_Top', 'Button_Card_Bottom']:
+            # The played card's button is emptied; the kept card stays on its button
+            if self.linked_cards[button] is None:
+                self.configure(button, text='', **self.GUI.Button_Theme)
+            else:
+                self.configure(button, **self.GUI.Button_Theme)
+
+        for player in self.players:
+            self.configure((player, 'name'), **self.GUI.Indicator_Theme)
+            self.show(player, 'card', '')
+
+    """
+    The rounds as a generator. It yields a request whenever the engine needs outside input:
+    ('card', player) and ('pick', player) for human seats, to be answered with a card code and a
+    (pick, raise amount) pair, and ('round', RoundResult) after every round, answered with None.
+    With a breakpoint set, ('breakpoint', round) comes at the start of that round, answered with None.
+    Returns the GameResult.
+    """
+    def play(self):
+        self.round = 0
+        rounds = []
+        while len(self.player_order) > 1:
+            if self.GUI and self.pace:
+                time.sleep(self.pace)
+            self.update_round()
+            if self.round == self.breakpoint:
+                yield ('breakpoint', self.round)
+            if self.hooks:
+                self.emit('on_round_start', self.round)
+            self.draw_phase()
+            self.card_ranking()
+            yield from self.decision_phase()
+            yield from self.betting_phase()
+            self.showdown_phase()
+            self.payout_phase()
+            rounds.append(self.round_result())
+            if self.history:
+                self.history.write(self.seed, rounds[-1])
+            if self.hooks:
+                self.emit('on_round_end', rounds[-1])
+            yield ('round', rounds[-1])
+            self.adjust_cards_left()
+            self.player_elimination()
+            self.Board.clear_board()
+            if len(self.Pile) < len(self.player_order):
+                self.log('No cards to draw', {'bg': 'black', 'fg': 'yellow green'})
+                winner = self.player_order[0].name if len(self.player_order) == 1 else None
+                if winner is None:
+                    self.log('Game results in tie', {'bg': 'black', 'fg': 'yellow green'})
+                elif self.GUI:
+                    print(f'{winner} is the game winner.')
+                result = GameResult(winner, rounds)
+                break
+                
+            if self.GUI:
+                self.go_to_next_round()
+        else:
+            if self.GUI:
+                print(f'{self.player_order[0]} is the game winner.')
+            result = GameResult(self.player_order[0].name, rounds)
+
+        if self.hooks:
+            self.emit('on_game_end', result)
+        return result
+
+    """ Answer a request from play() with the GUI, blocking (without spinning) until a button is clicked """
+    def answer(self, request):
+        kind, subject = request
+        if kind in ('round', 'breakpoint'):
+            return None
+        if not self.GUI:
+            raise RuntimeError(f'{subject} is a human seat, but the game has no GUI to ask')
+        if kind == 'card':
+            button = self.card_choices.get()
+            card = self.linked_cards[button]
+            self.linked_cards[button] = None
+            self.configure(button, bg='OliveDrab4', disabledforeground='white')
+            return card
+        if self.advisor:
+            self.advisor.start(self, subject)
+        return self.picks.get()
+
+    """ Main loop; returns the GameResult """
+    def run(self):
+        if self.GUI:
+            self.assign_betting_commands()
+            self.Flag.wait()
+        steps = self.play()
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(self.answer(request))
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            if self.advisor:
+                self.advisor.close()
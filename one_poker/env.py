@@ -0,0 +1,232 @@
+""" Gym-style vectorized environment: N One Poker games stepped in lockstep, seat 0 played by the caller """
+import numpy as np
+
+from .batch import ALL_IN, CALL, CHECK, FOLD, NEUTRAL, RAISE, BatchGame, BatchUtility
+from .policy import BEHIND, BROKE, EVEN, SHORT
+
+
+# What the caller's seat is deciding, and the card actions: place the lower or the higher card of the hand
+CARD, BET = 0, 1
+LOWER, HIGHER = 0, 1
+AGENT, OPPONENT = 0, 1
+
+# Legal betting actions by how the seat's pot stands (policy.relation), as Game.legal_picks allows them
+LEGAL = np.zeros((4, 5), dtype=bool)
+LEGAL[BROKE, CHECK] = True
+LEGAL[SHORT, [ALL_IN, FOLD]] = True
+LEGAL[EVEN, [CHECK, RAISE, FOLD]] = True
+LEGAL[BEHIND, [CALL, RAISE, FOLD]] = True
+
+# An illegal action is played as the passive one: check, call, or go all in for less
+PASSIVE = np.array([CHECK, ALL_IN, CHECK, CALL])
+
+
+class VectorEnv(BatchGame):
+    """
+    reset(n) starts n games; step(actions) takes one action for every game and plays on to the caller's next
+    decision in each, so every step is one decision of seat 0 in every game. Seat 1 is the Heuristic, as BatchGame
+    plays it, or opponent(observation) -> actions, given observations from its own seat (for self-play).
+
+    A decision is CARD (place the LOWER or the HIGHER card) or BET (a batch action code; illegal ones are played as
+    the passive action). Observations are a dict of arrays with one row per game, from the deciding seat's view:
+
+        phase           CARD or BET
+        hand            values of the cards in hand (0 for an empty slot)
+        card            value of the placed card, 0 before it is placed
+        high, opponent_high, position
+                        High counts of both seats and the seat's position (batch codes)
+        pot, opponent_pot, balance, opponent_balance
+        relation        how the seat's pot stands against the highest (policy.relation)
+        legal           (n, 5) mask of the legal betting actions
+        first           whether the seat acts first in the round
+        passes          betting passes so far in the round, counting the one under way
+        unseen          (n, 15) copies of every value the seat has not seen, by value
+        success         CardTracker.win_probability of the placed card against the unseen copies
+
+    The reward is the chips seat 0 won in a round, given on the step that settles it. A finished game is reset in
+    place: done is set for its step, and the observation is the first decision of the new game. info holds
+    round_over (a round was settled on the step) and winner (the winning seat of each finished game, -1 for a tie).
+    """
+    def __init__(self, opponent=None, wager=1, balance=10, subdecks=3, split=2, seed=None):
+        self.opponent = opponent
+        self.options = {'wager': wager, 'balance': balance, 'subdecks': subdecks, 'split': split}
+        self.seeds = np.random.SeedSequence(seed)
+
+    def reset(self, n):
+        super().__init__(n, seed=self.seeds.spawn(1)[0], **self.options)
+        self.phase = np.zeros(n, dtype=np.int8)
+        self.turn = np.zeros(n, dtype=np.int8)
+        self.passes = np.zeros(n, dtype=np.int64)
+        self.start_balance = np.zeros(n, dtype=np.int64)
+        self.rewards = np.zeros(n)
+        self.dones = np.zeros(n, dtype=bool)
+        self.round_over = np.zeros(n, dtype=bool)
+        self.finished = np.full(n, -1)
+        self.start_round(self.games)
+        return self.observe(self.games, np.zeros(n, dtype=np.intp))
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        self.rewards[:] = 0
+        self.dones[:] = False
+        self.round_over[:] = False
+        self.finished[:] = -1
+
+        cards = self.games[self.phase == CARD]
+        bets = self.games[self.phase == BET]
+        self.place(cards, AGENT, actions[cards] == HIGHER)
+        self.open_betting(cards)
+        self.bet(bets, np.full(len(bets), AGENT), actions[bets])
+        self.advance(self.games)
+
+        observation = self.observe(self.games, np.zeros(self.n, dtype=np.intp))
+        info = {'round_over': self.round_over.copy(), 'winner': self.finished.copy()}
+        return observation, self.rewards.copy(), self.dones.copy(), info
+
+    """ The deciding seat's view of the games """
+    def observe(self, games, seats):
+        rows = np.arange(len(games))
+        others = 1 - seats
+        pot, opponent_pot = self.pots[games, seats], self.pots[games, others]
+        balance = self.balances[games, seats]
+        hand, card = self.hands[games, seats], self.cards[games, seats]
+
+        # The seat has seen its own cards; an empty slot or an unplaced card is value 0, which no count uses
+        unseen = self.unseen[games]
+        unseen[rows, card] -= 1
+        unseen[rows, hand[:, 0]] -= 1
+        unseen[rows, hand[:, 1]] -= 1
+        unseen[:, 0] = 0
+        relation = self.relation(pot, opponent_pot, balance)
+        return {
+            'phase': self.phase[games].copy(),
+            'hand': hand,
+            'card': card,
+            'high': self.high[games, seats],
+            'opponent_high': self.high[games, others],
+            'position': self.positions[games, seats],
+            'pot': pot,
+            'opponent_pot': opponent_pot,
+            'balance': balance,
+            'opponent_balance': self.balances[games, others],
+            'relation': relation,
+            'legal': LEGAL[relation],
+            'first': self.first[games] == seats,
+            'passes': self.passes[games].copy(),
+            'unseen': unseen,
+            'success': BatchUtility.success_calc(unseen, card.astype(np.intp)),
+        }
+
+    @staticmethod
+    def relation(pot, opponent_pot, balance):
+        return np.select([balance == 0, balance <= opponent_pot - pot, pot >= opponent_pot], [BROKE, SHORT, EVEN], BEHIND)
+
+    """ Deal, rank the hands and let seat 1 place its card; seat 0 is then asked for its own """
+    def start_round(self, games):
+        self.rounds[games] += 1
+        self.start_balance[games] = self.balances[games, AGENT]
+        self.cards[games] = 0
+        self.draw_phase(games)
+        self.card_ranking(games)
+        self.phase[games] = CARD
+        if self.opponent is None:
+            higher = self.positions[games, OPPONENT] == NEUTRAL
+        else:
+            higher = self.opponent(self.observe(games, np.ones(len(games), dtype=np.intp))) == HIGHER
+        self.place(games, OPPONENT, higher)
+
+    def place(self, games, seat, higher):
+        hands = self.hands[games, seat]
+        slot = np.where(higher, hands.argmax(axis=1), hands.argmin(axis=1))
+        self.cards[games, seat] = hands[np.arange(len(games)), slot]
+        self.hands[games, seat, slot] = 0
+
+    def open_betting(self, games):
+        self.pots[games] = self.wager
+        self.balances[games] -= self.wager
+        self.folded[games] = False
+        self.turn[games] = 0
+        self.passes[games] = 1
+        self.phase[games] = BET
+
+    """ Play one betting action per game, as BatchGame.betting_phase does """
+    def bet(self, games, seats, picks):
+        pot, opponent_pot = self.pots[games, seats], self.pots[games, 1 - seats]
+        balance = self.balances[games, seats]
+        relation = self.relation(pot, opponent_pot, balance)
+        picks = np.where(LEGAL[relation, picks], picks, PASSIVE[relation])
+
+        highest = np.maximum(pot, opponent_pot)
+        amount = np.select(
+            [picks == CALL, picks == RAISE, picks == ALL_IN],
+            [highest - pot, highest - pot + 1, balance],
+            0,
+        )
+        self.pots[games, seats] += amount
+        self.balances[games, seats] -= amount
+        self.folded[games, seats] = picks == FOLD
+        self.turn[games] += 1
+
+    """ Play seat 1 and the forced checks, and settle rounds, until seat 0 has a decision in every game """
+    def advance(self, games):
+        while len(games):
+            # A fold ends the round; so does a pass that leaves nobody who can still bet behind
+            folded = self.folded[games].any(axis=1)
+            ended = self.turn[games] == 2
+            pots, balances = self.pots[games], self.balances[games]
+            behind = ((pots != pots.max(axis=1, keepdims=True)) & (balances > 0)).any(axis=1)
+            again = ended & behind & ~folded
+            self.turn[games[again]] = 0
+            self.passes[games[again]] += 1
+            settled = folded | (ended & ~behind)
+            self.settle(games[settled])
+            games = games[~settled]
+
+            # Seat 1 acts; seat 0 only checks when it has nothing else to do
+            seats = self.first[games] ^ self.turn[games]
+            opponent = games[seats == OPPONENT]
+            if len(opponent):
+                if self.opponent is None:
+                    picks = self.ai_pick(opponent, np.ones(len(opponent), dtype=np.intp))
+                else:
+                    picks = self.opponent(self.observe(opponent, np.ones(len(opponent), dtype=np.intp)))
+                self.bet(opponent, np.ones(len(opponent), dtype=np.intp), picks)
+            forced = games[(seats == AGENT) & (self.balances[games, AGENT] == 0)]
+            self.bet(forced, np.zeros(len(forced), dtype=np.intp), np.full(len(forced), CHECK))
+            games = np.concatenate([opponent, forced])
+
+    """ Showdown and payout; finished games are reset, and every game deals its next round """
+    def settle(self, games):
+        if not len(games):
+            return
+        folded = self.folded[games]
+        self.round_winner[games] = np.where(folded[:, 0], 1, np.where(folded[:, 1], 0, -1))
+        self.showdown_phase(games)
+        self.payout_phase(games)
+        self.player_elimination(games)
+        self.rewards[games] += self.balances[games, AGENT] - self.start_balance[games]
+        self.round_over[games] = True
+
+        over = games[~self.active[games]]
+        self.dones[over] = True
+        self.finished[over] = self.winner[over]
+        self.restart(over)
+        self.start_round(games)
+
+    """ A new game in place of each finished one """
+    def restart(self, games):
+        n = len(games)
+        if not n:
+            return
+        values = np.repeat(np.arange(2, 15, dtype=np.int8), 4 * self.options['subdecks'])
+        self.deck[games] = self.rng.permuted(np.tile(values, (n, 1)), axis=1)[:, :self.size]
+        self.top[games] = 0
+        self.unseen[games] = 0
+        self.unseen[games, 2:] = 4 * self.options['subdecks']
+        self.hands[games] = 0
+        self.balances[games] = self.options['balance']
+        self.pots[games] = 0
+        self.first[games] = self.rng.integers(0, 2, n)
+        self.active[games] = True
+        self.winner[games] = -1
+        self.rounds[games] = 0
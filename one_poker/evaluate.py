@@ -0,0 +1,145 @@
+""" Duplicate (seat-swapped) comparison of two AI strategies, with common random numbers and a sequential test """
+from argparse import ArgumentParser
+from math import log, sqrt
+from multiprocessing import Pool, cpu_count
+
+from .engine import Game
+from .tournament import STRATEGIES, game_seed
+
+
+"""
+Play both seatings of one seed; runs inside the pool workers. The seed fixes the seating order, the deck and every
+seat's noise stream, so each strategy gets the other's cards and noise in the swapped game (common random numbers).
+Returns the first strategy's score in each game: 1 for a win, 0.5 for a tie.
+"""
+def play_pair(task):
+    first, second, seed = task
+    scores = []
+    for (seats, name) in [((first, second), 'P1'), ((second, first), 'P2')]:
+        winner = Game(*(STRATEGIES[seat]() for seat in seats), headless=True, seed=seed).run().winner
+        scores.append(0.5 if winner is None else float(winner == name))
+    return tuple(scores)
+
+
+class SequentialTest():
+    """
+    Sequential probability ratio test on the mean pair score m of the first strategy, between m = 0.5 - delta
+    (the second is better) and m = 0.5 + delta (the first is better), with a normal likelihood whose variance is
+    estimated from the pairs so far. The error rates are alpha and beta. The test also stops once the confidence
+    interval of m lies within 0.5 +- delta: neither strategy is better by delta.
+    """
+    def __init__(self, delta=0.05, alpha=0.05, beta=0.05, minimum=20):
+        self.low, self.high = 0.5 - delta, 0.5 + delta
+        self.lower = log(beta / (1 - alpha))
+        self.upper = log((1 - beta) / alpha)
+        self.minimum = minimum
+
+        # Running mean and squared deviations (Welford) of the pair scores and of the single games
+        self.pairs = 0
+        self.mean = 0.0
+        self.deviations = 0.0
+        self.games = 0
+        self.game_mean = 0.0
+        self.game_deviations = 0.0
+
+    def add(self, scores):
+        self.pairs += 1
+        score = sum(scores) / len(scores)
+        change = score - self.mean
+        self.mean += change / self.pairs
+        self.deviations += change * (score - self.mean)
+        for score in scores:
+            self.games += 1
+            change = score - self.game_mean
+            self.game_mean += change / self.games
+            self.game_deviations += change * (score - self.game_mean)
+
+    @property
+    def variance(self):
+        return self.deviations / (self.pairs - 1) if self.pairs > 1 else 0.0
+
+    """ Log-likelihood ratio of 'the first is better' to 'the second is better' """
+    @property
+    def llr(self):
+        # A floor keeps a run of identical pairs from deciding on a zero variance
+        variance = max(self.variance, 1 / (4 * self.pairs))
+        return (self.high - self.low) * self.pairs * (self.mean - (self.low + self.high) / 2) / variance
+
+    """ 'first', 'second', 'neither', or None while the test goes on """
+    @property
+    def decision(self):
+        if self.pairs < self.minimum:
+            return None
+        llr = self.llr
+        if llr >= self.upper:
+            return 'first'
+        elif llr <= self.lower:
+            return 'second'
+        low, high = self.interval()
+        if self.low < low and high < self.high:
+            return 'neither'
+        return None
+
+    """
+    Independent games needed for the standard error of one duplicate pair, per game played: the factor by which the
+    seat swap and the common random numbers cut the games needed
+    """
+    @property
+    def efficiency(self):
+        if self.pairs < 2:
+            return 1.0
+        elif not self.variance:
+            return float('inf')
+        game_variance = self.game_deviations / (self.games - 1)
+        return game_variance / (2 * self.variance)
+
+    def interval(self, z=1.96):
+        margin = z * sqrt(self.variance / self.pairs) if self.pairs else 0.5
+        return max(self.mean - margin, 0), min(self.mean + margin, 1)
+
+
+""" Play duplicate pairs until the test decides or max_pairs are played; report(test) is called after every batch """
+def evaluate(first, second, delta=0.05, alpha=0.05, beta=0.05, max_pairs=10000, seed=0, processes=None,
+             batch=64, report=None):
+    unknown = [name for name in (first, second) if name not in STRATEGIES]
+    if unknown:
+        raise ValueError(f'Unknown strategies: {", ".join(unknown)}')
+
+    test = SequentialTest(delta, alpha, beta)
+    tasks = ((first, second, game_seed(seed, first, second, index)) for index in range(max_pairs))
+    with Pool(processes or cpu_count()) as pool:
+        # Results come back in task order, so a run stops at the same pair whatever the number of processes
+        for scores in pool.imap(play_pair, tasks, chunksize=max(1, batch // 8)):
+            test.add(scores)
+            if test.pairs % batch == 0 and report:
+                report(test)
+            if test.decision:
+                break
+    return test
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Compare two AI strategies on duplicate, seat-swapped games')
+    parser.add_argument('first', choices=sorted(STRATEGIES))
+    parser.add_argument('second', choices=sorted(STRATEGIES))
+    parser.add_argument('--delta', type=float, default=0.05, help='smallest difference in mean score worth detecting')
+    parser.add_argument('--alpha', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    parser.add_argument('--max-pairs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    def progress(test):
+        print(f'{test.pairs:>7} pairs  score {test.mean:.3f}  LLR {test.llr:+7.2f} [{test.lower:.2f}, {test.upper:.2f}]')
+
+    test = evaluate(args.first, args.second, args.delta, args.alpha, args.beta, args.max_pairs, args.seed,
+                    args.processes, report=progress)
+    low, high = test.interval()
+    verdict = {
+        'first': f'{args.first} is better', 'second': f'{args.second} is better',
+        'neither': f'Neither is better by {args.delta}', None: 'Inconclusive',
+    }[test.decision]
+    print(f'{verdict} after {test.pairs} pairs ({2 * test.pairs} games)')
+    print(f'{args.first} scores {test.mean:.3f} [{low:.3f}, {high:.3f}] against {args.second}')
+    print(f'Duplicate pairs need {test.efficiency:.1f}x fewer games than independent ones for the same error')
@@ -0,0 +1,187 @@
+""" Exploitability of any betting policy: the exact best response to it over the solver's game tree """
+from argparse import ArgumentParser
+from collections import namedtuple
+from functools import lru_cache
+import importlib
+import time
+
+import numpy as np
+
+from . import policy
+from .engine import CardTracker
+from .solver import CALL, FOLD, RAISE, Solver, placement_prior
+
+
+# What the acting seat knows at an information set of the solver's tree; value is the placed card's
+View = namedtuple('View', 'seat first_pass balance pot opponent_pot high opponent_high value')
+
+# Solver action of each engine pick, and of each policy.py action code
+ACTIONS = {'Check': CALL, 'Call': CALL, 'All in': CALL, 'Raise': RAISE, 'Fold': FOLD}
+POLICY_ACTIONS = (CALL, CALL, RAISE, FOLD, CALL)
+
+# Engine.legal_picks by how the seat's pot stands (policy.relation)
+LEGAL = {
+    policy.BROKE: ('Check',),
+    policy.SHORT: ('All in', 'Fold'),
+    policy.EVEN: ('Raise', 'Check', 'Fold'),
+    policy.BEHIND: ('Raise', 'Call', 'Fold'),
+}
+
+# The tree does not track seen cards, so the Heuristic's success probability is taken from a fresh shoe
+FRESH = CardTracker({value: 4 * 3 for value in range(2, 15)})
+
+
+""" Game.card_ranking for two seats """
+def position(high, opponent_high):
+    if high == 2 and opponent_high == 0:
+        return 'Advantage'
+    elif high == 0 and opponent_high >= 1:
+        return 'Disadvantage'
+    return 'Neutral'
+
+
+""" A policy's answer (a pick, a policy.py action code or (fold, call, raise) weights) as solver action weights """
+def weights(answer):
+    if isinstance(answer, str):
+        return np.eye(3)[ACTIONS[answer]]
+    elif isinstance(answer, (int, np.integer)):
+        return np.eye(3)[POLICY_ACTIONS[answer]]
+    return np.asarray(answer, dtype=float)
+
+
+"""
+The Heuristic's pick, exactly: its random factor is uniform over 0, 0.01, ..., 0.77, so it is confident with the
+share of those below the success probability
+"""
+@lru_cache(maxsize=None)
+def heuristic_pick(stance, value, pot, highest, balance):
+    success_probability = FRESH.win_probability(value)
+    confident = sum(1 for factor in range(78) if success_probability > factor / 100) / 78
+    stands = policy.relation(pot, highest, balance)
+    kelly = success_probability >= policy.threshold(stands, pot, highest, balance)
+    unsure, sure = policy.POLICY[policy.POSITION_INDEX[stance]][stands][kelly]
+    return (1 - confident) * np.eye(3)[POLICY_ACTIONS[unsure]] + confident * np.eye(3)[POLICY_ACTIONS[sure]]
+
+
+def heuristic(view):
+    return heuristic_pick(position(view.high, view.opponent_high), view.value, view.pot,
+                          max(view.pot, view.opponent_pot), view.balance)
+
+
+""" RandomPlay: every legal pick alike """
+def random_play(view):
+    picks = LEGAL[policy.relation(view.pot, max(view.pot, view.opponent_pot), view.balance)]
+    return sum(weights(pick) for pick in picks) / len(picks)
+
+
+""" Card placement by position, as Heuristic.place_card """
+def heuristic_placement(high, opponent_high):
+    return 'max' if position(high, opponent_high) == 'Neutral' else 'min'
+
+
+def random_placement(high, opponent_high):
+    return 'random'
+
+
+""" Every information set of the tree as ((node, class pair, card index), View) """
+def views(solver):
+    tree = solver.tree
+    for (key, node) in tree.decisions.items():
+        first_balance, actor, first_pass, *pots = key
+        balances = (first_balance - pots[0], tree.total - first_balance - pots[1])
+        for pair in range(9):
+            highs = (pair // 3, pair % 3)
+            for card in range(13):
+                yield (node, pair, card), View(actor, first_pass, balances[actor], pots[actor], pots[1 - actor],
+                                               highs[actor], highs[1 - actor], card + 2)
+
+
+""" Weights as a strategy of the tree: actions it does not have are played as the call, as Solved plays them """
+def normalize(solver, strategy):
+    mask = solver.mask
+    strategy = strategy * mask + (strategy * ~mask).sum(axis=-1, keepdims=True) * np.eye(3)[CALL] * mask
+    totals = strategy.sum(axis=-1, keepdims=True)
+    if (totals <= 0).any():
+        raise ValueError('The policy gives no weight to any action at some information set')
+    return strategy / totals
+
+
+""" The strategy of a policy: a callable from a View to a pick, an action code or action weights """
+def strategy_array(solver, play):
+    strategy = np.zeros((solver.tree.size, 9, 13, 3))
+    for (index, view) in views(solver):
+        strategy[index] = weights(play(view))
+    return normalize(solver, strategy)
+
+
+""" The strategy of a Solver.table, where Solved falls back to the Heuristic for empty rows """
+def table_strategy(solver, table):
+    balance, actor, first_pass, first_pot, second_pot = solver.tree.node.T
+    rows = table[balance, :, :, actor, first_pass, first_pot, second_pot].astype(float)
+    rows = rows.reshape(solver.tree.size, 9, 13, 3)
+    return normalize(solver, np.where(rows.any(axis=-1, keepdims=True), rows, strategy_array(solver, heuristic)))
+
+
+""" Chances of each seat's placed card by class pair, for a placement giving 'min', 'max' or 'random' """
+def card_priors(placement):
+    priors = np.zeros((2, 9, 13))
+    for pair in range(9):
+        highs = (pair // 3, pair % 3)
+        for seat in (0, 1):
+            priors[seat, pair] = placement_prior(highs[seat], placement(highs[seat], highs[1 - seat]))
+    return priors
+
+
+"""
+Best-response values (chips per round) of each seat against a strategy that places cards by placement, and the
+exploitability: their mean. The best response also chooses its card, so a policy is charged for its placement.
+"""
+def exploitability(solver, strategy, placement=heuristic_placement):
+    priors = card_priors(placement)
+    values = [solver.best_response(strategy, seat, priors, choose_cards=True) for seat in (0, 1)]
+    return values, sum(values) / 2
+
+
+""" A policy named on the command line: heuristic, random, a Solver.table .npy file or module:function """
+def load(name, solver):
+    if name == 'heuristic':
+        return strategy_array(solver, heuristic), heuristic_placement
+    elif name == 'random':
+        return strategy_array(solver, random_play), random_placement
+    elif name.endswith('.npy'):
+        table = np.load(name)
+        if table.shape[0] != solver.tree.total + 1:
+            raise ValueError(f'{name} is a table for {table.shape[0] - 1} chips, not {solver.tree.total}')
+        return table_strategy(solver, table), heuristic_placement
+    module, _, function = name.partition(':')
+    return strategy_array(solver, getattr(importlib.import_module(module), function)), random_placement
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='How much a best response wins per round against a policy')
+    parser.add_argument('policy', help='heuristic, random, a strategy table (.npy from solver.py) or module:function '
+                                       'taking an exploit.View')
+    parser.add_argument('--placement', choices=('heuristic', 'random'), default=None,
+                        help="the policy's card placement (default: its own, random for a module:function)")
+    parser.add_argument('--balance', type=int, default=10)
+    parser.add_argument('--wager', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    solver = Solver(args.balance, args.wager)
+    try:
+        strategy, placement = load(args.policy, solver)
+    except (ValueError, ImportError, AttributeError) as error:
+        parser.error(str(error))
+    if args.placement:
+        placement = {'heuristic': heuristic_placement, 'random': random_placement}[args.placement]
+    (first, second), value = exploitability(solver, strategy, placement)
+    elapsed = time.perf_counter() - started
+
+    print(f'Best response as the first seat: {first:+.4f} chips per round')
+    print(f'Best response as the second seat: {second:+.4f} chips per round')
+    print(f'Exploitability of {args.policy}: {value:.4f} chips per round ({elapsed * 1e3:.0f} ms)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+""" Tk window of a Game; the engine imports it only for games that are not headless """
+from queue import Empty
+from tkinter import *
+
+from .engine import LOG_LIMIT
+
+
+class GUI():
+    def __init__(self, players, Flag, updates, fps=30):
+        self.players = players
+        self.Flag = Flag
+        self.updates = updates
+        self.frame_time = max(1, 1000 // fps)
+        self.label_width = 9
+        self.label_height = 3
+        self.Indicator_Theme = {
+            'width': self.label_width, 
+            'height': self.label_height, 
+            'relief': RAISED,
+            'bg': 'SpringGreen4',
+            'fg': 'white',
+        }
+        self.Score_Theme = {
+            'width': self.label_width, 
+            'height': self.label_height, 
+            'relief': GROOVE,
+            'bg': 'DarkSeaGreen1',
+            'fg': 'Black',
+        }
+        self.Button_Theme = {
+            'relief': RAISED, 
+            'state': 'disabled',
+            'bg': 'Tan4', 
+            'fg': 'white',
+            'activebackground': 'Tan4', 
+            'activeforeground': 'white',
+            'disabledforeground': 'grey50'
+        }
+        self.Entry_Theme = {
+            'width': self.label_width, 
+            'relief': SUNKEN, 
+            'state': 'disabled', 
+            'bg': 'PaleGreen1',
+            'disabledbackground': 'PaleGreen3',
+        }
+
+    """ Create and place a Tkinter object """
+    @staticmethod
+    def create(object, placement='pack', **placement_config):
+            if placement == 'pack':
+                object.pack(**placement_config)
+            elif placement == 'grid':
+                object.grid(**placement_config)
+            elif placement == 'place':
+                object.place(**placement_config)
+
+            return object
+
+    """ Create a row of labels for every player and fill in the initial values """
+    def classify(self, players):
+        self.attributes = {}
+        for player in players:
+            frame = self.create(Frame(self.Master), side='top', before=self.Frame_Betting)
+            self.attributes[player] = {
+                'name': self.create(Label(frame, text=f"{player.name} {'(AI)' if player.ai else ''}", **self.Indicator_Theme), side='left'),
+                'balance': self.create(Label(frame, text=player.balance, **self.Score_Theme), side='left'),
+                'high': self.create(Label(frame, text=0, **self.Score_Theme), side='left'),
+                'low': self.create(Label(frame, text=0, **self.Score_Theme), side='left'),
+                'pot': self.create(Label(frame, text=0, **self.Score_Theme), side='left'),
+                'card': self.create(Label(frame, text='', **self.Score_Theme), side='left'),
+            }
+
+    """ Widget named by an engine update """
+    def widget(self, key):
+        if isinstance(key, tuple):
+            player, attribute = key
+            return self.attributes[player][attribute]
+        return getattr(self, key)
+
+    """ Apply the engine's queued updates once per frame, merging repeated changes to the same widget """
+    def render(self):
+        changes = {}
+        lines = []
+        while True:
+            try:
+                update = self.updates.get_nowait()
+            except Empty:
+                break
+            if update[0] == 'widget':
+                changes.setdefault(update[1], {}).update(update[2])
+            else:
+                lines.append(update[1:])
+
+        for (key, options) in changes.items():
+            self.widget(key).config(**options)
+
+        # Lines that would scroll out of the log this frame are never inserted
+        for (text, colors) in lines[-LOG_LIMIT:]:
+            self.Listbox_Log.insert(END, text)
+            if colors:
+                self.Listbox_Log.itemconfig(END, colors)
+        if lines:
+            overflow = self.Listbox_Log.size() - LOG_LIMIT
+            if overflow > 0:
+                self.Listbox_Log.delete(0, overflow - 1)
+            self.Listbox_Log.yview(END)
+
+        self.Master.after(self.frame_time, self.render)
+
+    def run(self):
+        """ Root """
+        self.Master = Tk()
+        self.Master.resizable(False, False)
+        
+        """ Frames in respective order """
+        self.Frame_Indicators = self.create(Frame(self.Master), side='top')
+        self.Frame_Betting =    self.create(Frame(self.Master), side='top', fill='x')
+
+        """ Indicator Labels """
+        self.Label_Round =      self.create(Label(self.Frame_Indicators, text='Round 0', **self.Indicator_Theme), side='left')
+        self.Label_Balance =    self.create(Label(self.Frame_Indicators, text='Balance', **self.Indicator_Theme), side='left')
+        self.Label_High =       self.create(Label(self.Frame_Indicators, text='High', **self.Indicator_Theme), side='left')
+        self.Label_Low =        self.create(Label(self.Frame_Indicators, text='Low', **self.Indicator_Theme), side='left')
+        self.Label_Pot =        self.create(Label(self.Frame_Indicators, text='Pot', **self.Indicator_Theme), side='left')
+        self.Label_Card =       self.create(Label(self.Frame_Indicators, text='Card', **self.Indicator_Theme), side='left')
+
+        """ Betting Window """
+        self.Frame_Betting_Left =       self.create(Frame(self.Frame_Betting), side='left')
+        self.Frame_Betting_Right =      self.create(Frame(self.Frame_Betting), side='left', expand=YES)
+        self.Frame_Betting_Top =        self.create(Frame(self.Frame_Betting_Left), side='top')
+        self.Frame_Betting_Bottom =     self.create(Frame(self.Frame_Betting_Left), side='top')
+
+        for x in range(4):
+            Label(self.Frame_Betting_Top, width=self.label_width, relief=RAISED).grid(row=0, column=x)
+        for x in range(4):
+            Label(self.Frame_Betting_Bottom, width=self.label_width, relief=RAISED).grid(row=0, column=x)
+        
+
+        # Top
+        self.Button_Card_Top =  self.create(Button(self.Frame_Betting_Top, **self.Button_Theme), placement='grid', row=0, column=0, sticky='ew')
+        self.Button_Raise =     self.create(Button(self.Frame_Betting_Top, text='Raise', **self.Button_Theme), placement='grid', row=0, column=1, sticky='ew')
+        self.Button_Call =      self.create(Button(self.Frame_Betting_Top, text='Call', **self.Button_Theme), placement='grid', row=0, column=2, sticky='ew')
+        self.Button_Check =     self.create(Button(self.Frame_Betting_Top, text='Check', **self.Button_Theme), placement='grid', row=0, column=3, sticky='ew')
+
+        # Bottom
+        self.Button_Card_Bottom = self.create(Button(self.Frame_Betting_Bottom, **self.Button_Theme), placement='grid', row=0, column=0, sticky='ew')
+        self.Entry_Raise = self.create(Entry(self.Frame_Betting_Bottom, **self.Entry_Theme), placement='grid', row=0, column=1, sticky='ewns')
+        self.Button_Fold = self.create(Button(self.Frame_Betting_Bottom, text='Fold', **self.Button_Theme), placement='grid', row=0, column=2, sticky='ew')
+        self.Button_Continue = self.create(Button(self.Frame_Betting_Bottom, text='Continue', **self.Button_Theme), placement='grid', row=0, column=3, sticky='ew')        
+
+        """ Action Log """
+        self.Frame_Log = self.create(Frame(self.Frame_Betting_Right), fill='x')
+        Label(self.Frame_Log, width=self.label_width*2 + 1, relief=RAISED).grid(row=0, column=0, sticky='nsew')
+        
+        self.Listbox_Log = self.create(Listbox(self.Frame_Log, relief=SUNKEN, height=3, bg='PaleGreen1', selectbackground='Tan1', selectforeground='black'), placement='grid', row=0, column=0, sticky='nsew')
+
+        """ Hints of the advisor (advisor.py), under the log; empty unless a human seat is picking """
+        self.Label_Advice = self.create(Label(self.Frame_Log, width=self.label_width*2 + 1, height=4, justify=LEFT, anchor='nw', font='TkFixedFont', bg='PaleGreen1', fg='black'), placement='grid', row=1, column=0, sticky='nsew')
+
+        """ Player rows, between the indicators and the betting window """
+        self.classify(self.players)
+
+        self.Flag.set()
+        self.Master.after(self.frame_time, self.render)
+        self.Master.mainloop()
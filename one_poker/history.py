@@ -0,0 +1,186 @@
+""" Fixed-width binary hand history: one record per round, appended by a buffered writer, read through mmap """
+from collections import namedtuple
+import mmap
+import os
+import struct
+
+
+MAGIC = b'OPHH'
+VERSION = 1
+
+# Actions as stored; anything else is recorded as an unknown action
+ACTIONS = ('check', 'call', 'raise', 'fold', 'all in')
+NO_CARD = 255
+
+# File header: magic, version, seats, max actions per round, record size
+HEADER = struct.Struct('<4sHBBI')
+MAX_ACTIONS = 255
+
+HandRecord = namedtuple('HandRecord', 'seed round first winner hands cards bets balances actions')
+
+
+"""
+Most actions a round can take, as far as a record can hold them: every betting pass but the last raises the highest
+pot, which cannot pass the chips of the whole table, and every seat acts once per pass
+"""
+def action_limit(seats, balance=10):
+    return min(seats * (seats * balance + 1), MAX_ACTIONS)
+
+
+""" Record layout for a number of seats: the round, then per seat, then the actions """
+def record_struct(seats, max_actions):
+    # seed, round, first seat, winning seat (-1 for a tie), number of actions
+    layout = '<QHBbB'
+    # per seat: both hand cards, placed card, bet, balance after the round
+    layout += 'BBBHH' * seats
+    # per action: seat, action, amount
+    layout += 'BBH' * max_actions
+    return struct.Struct(layout)
+
+
+class HandHistoryWriter():
+    """
+    Buffers encoded rounds and appends them to path; seats are numbered in the order of the names. Without names,
+    the seats are P1 to Pn: as many as the existing file holds, or for a new file as the first game written has,
+    and the file is only created by that first round. Records hold max_actions actions: by default those of the
+    existing file, or of a new file every round the seats can play with their starting balance (action_limit).
+    """
+    def __init__(self, path, names=None, max_actions=None, balance=10, buffer_size=1 << 20):
+        if max_actions is not None and not 0 < max_actions <= MAX_ACTIONS:
+            raise ValueError(f'Records hold 1 to {MAX_ACTIONS} actions, not {max_actions}')
+        self.path = path
+        self.max_actions = max_actions
+        self.balance = balance
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        self.file = None
+
+        if names is None and os.path.exists(path) and os.path.getsize(path) > 0:
+            seats, _, _ = check_header(path)
+            names = [f'P{index + 1}' for index in range(seats)]
+        if names is not None:
+            self.open(names)
+
+    """ Open the file for the seats of names, checking or writing its header """
+    def open(self, names):
+        path, max_actions = self.path, self.max_actions
+        self.names = list(names)
+        self.seat = {name: index for (index, name) in enumerate(self.names)}
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists and max_actions is None:
+            _, max_actions, _ = check_header(path, len(self.names))
+        elif exists:
+            check_header(path, len(self.names), max_actions)
+        elif max_actions is None:
+            max_actions = action_limit(len(self.names), self.balance)
+        self.max_actions = max_actions
+        self.record = record_struct(len(self.names), max_actions)
+        self.file = open(path, 'ab')
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, VERSION, len(self.names), max_actions, self.record.size))
+
+    """ Encode one RoundResult of the game played with seed; a round with more actions than a record holds is refused """
+    def write(self, seed, result):
+        if self.file is None:
+            self.open([f'P{index + 1}' for index in range(len(result.balances))])
+        if len(result.actions) > self.max_actions:
+            raise ValueError(f'Round {result.round} has {len(result.actions)} actions; records hold {self.max_actions}')
+        fields = [
+            seed & 0xFFFFFFFFFFFFFFFF,
+            result.round,
+            self.seat[result.order[0]],
+            self.seat[result.winner] if result.winner else -1,
+            len(result.actions),
+        ]
+        for name in self.names:
+            hand = result.hands.get(name, ())
+            fields += [hand[0] if len(hand) > 0 else NO_CARD, hand[1] if len(hand) > 1 else NO_CARD]
+            fields += [result.cards.get(name, NO_CARD), result.bets.get(name, 0), result.balances.get(name, 0)]
+
+        for (name, pick, amount) in result.actions:
+            fields += [self.seat[name], ACTIONS.index(pick) if pick in ACTIONS else 255, int(amount)]
+        fields += [0, 0, 0] * (self.max_actions - len(result.actions))
+
+        self.buffer += self.record.pack(*fields)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.file is None:
+            return
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+""" Read and validate the header of a history file; returns (seats, max actions, record struct) """
+def check_header(path, seats=None, max_actions=None):
+    with open(path, 'rb') as file:
+        magic, version, file_seats, file_actions, size = HEADER.unpack(file.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} hand history')
+    if seats not in (None, file_seats) or max_actions not in (None, file_actions):
+        raise ValueError(f'{path} holds {file_seats} seats and {file_actions} actions per record')
+    record = record_struct(file_seats, file_actions)
+    if record.size != size:
+        raise ValueError(f'{path} has an unexpected record size')
+    return file_seats, file_actions, record
+
+
+class HandHistoryReader():
+    """ Memory-maps a history file and yields its records without loading it """
+    def __init__(self, path):
+        self.seats, self.max_actions, self.record = check_header(path)
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return (len(self.map) - HEADER.size) // self.record.size
+
+    """ Raw field tuples, in file order """
+    def raw(self, start=0):
+        for offset in range(HEADER.size + start * self.record.size, len(self.map) - self.record.size + 1, self.record.size):
+            yield self.record.unpack_from(self.map, offset)
+
+    def __iter__(self):
+        seats = self.seats
+        for fields in self.raw():
+            seed, round, first, winner, count = fields[:5]
+            per_seat = [fields[5 + 5 * seat:10 + 5 * seat] for seat in range(seats)]
+            moves = fields[5 + 5 * seats:]
+            yield HandRecord(
+                seed=seed,
+                round=round,
+                first=first,
+                winner=None if winner == -1 else winner,
+                hands=tuple(tuple(card for card in values[:2] if card != NO_CARD) for values in per_seat),
+                cards=tuple(None if values[2] == NO_CARD else values[2] for values in per_seat),
+                bets=tuple(values[3] for values in per_seat),
+                balances=tuple(values[4] for values in per_seat),
+                actions=tuple(
+                    (moves[index], ACTIONS[moves[index + 1]] if moves[index + 1] < len(ACTIONS) else None, moves[index + 2])
+                    for index in range(0, 3 * count, 3)
+                ),
+            )
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+""" Per-phase timing and allocation counts for Games, built on the Game event hooks """
+from argparse import ArgumentParser
+from collections import Counter
+from functools import wraps
+from random import Random
+import sys
+import time
+
+from .engine import Game, Heuristic
+
+
+# Phases called by Game.play every round, in order; the generator phases yield to human seats
+PHASES = (
+    'update_round', 'draw_phase', 'card_ranking', 'decision_phase', 'betting_phase',
+    'showdown_phase', 'payout_phase', 'round_result', 'adjust_cards_left', 'player_elimination',
+)
+GENERATOR_PHASES = ('decision_phase', 'betting_phase')
+
+
+class PhaseStats():
+    """ Calls, wall time and net allocated memory blocks of one phase """
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0
+        self.blocks = 0
+
+    def report(self):
+        return {
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'mean_us': self.seconds / self.calls * 1e6 if self.calls else 0,
+            'net_blocks': self.blocks,
+        }
+
+    def __repr__(self):
+        report = self.report()
+        return f'{self.name:<20} {self.calls:>9} {self.seconds:>10.4f} {report["mean_us"]:>10.2f} {self.blocks:>10}'
+
+
+class Instrumentation():
+    """
+    Attach to any number of games before they run. The game's phase methods are wrapped on the instance,
+    so games that are not attached run the unwrapped methods. Time a generator phase spends suspended
+    (waiting for a human seat) is not counted.
+    """
+    def __init__(self):
+        self.phases = {name: PhaseStats(name) for name in PHASES}
+        self.betting_passes = Counter()
+        self.actions = Counter()
+        self.showdowns = 0
+        self.games = 0
+        self.rounds = 0
+
+    def attach(self, game):
+        for name in PHASES:
+            method = getattr(game, name)
+            wrapper = self.wrap_generator if name in GENERATOR_PHASES else self.wrap
+            setattr(game, name, wrapper(method, self.phases[name]))
+        game.subscribe('on_action', self.on_action)
+        game.subscribe('on_showdown', self.on_showdown)
+        game.subscribe('on_round_end', self.on_round_end)
+        game.subscribe('on_game_end', self.on_game_end)
+        return game
+
+    def wrap(self, method, stats):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.seconds += time.perf_counter() - start
+                stats.blocks += sys.getallocatedblocks() - blocks
+                stats.calls += 1
+        return timed
+
+    def wrap_generator(self, method, stats):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            steps = method(*args, **kwargs)
+            answer = None
+            stats.calls += 1
+            while True:
+                blocks = sys.getallocatedblocks()
+                start = time.perf_counter()
+                try:
+                    request = steps.send(answer)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    stats.seconds += time.perf_counter() - start
+                    stats.blocks += sys.getallocatedblocks() - blocks
+                answer = yield request
+        return timed
+
+    def on_action(self, game, name, pick, amount):
+        self.actions[pick] += 1
+
+    def on_showdown(self, game, cards, winner):
+        self.showdowns += 1
+
+    def on_round_end(self, game, result):
+        self.rounds += 1
+        self.betting_passes[game.betting_passes] += 1
+
+    def on_game_end(self, game, result):
+        self.games += 1
+
+    def report(self):
+        return {
+            'games': self.games,
+            'rounds': self.rounds,
+            'showdowns': self.showdowns,
+            'actions': dict(self.actions),
+            'betting_passes': dict(sorted(self.betting_passes.items())),
+            'phases': {name: stats.report() for (name, stats) in self.phases.items()},
+        }
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Time the phases of headless AI-vs-AI games')
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    instrumentation = Instrumentation()
+    rng = Random(args.seed)
+    for _ in range(args.games):
+        instrumentation.attach(Game(Heuristic(), Heuristic(), headless=True, seed=rng.getrandbits(64))).run()
+
+    report = instrumentation.report()
+    print(f'{report["games"]} games, {report["rounds"]} rounds, {report["showdowns"]} showdowns')
+    print(f'Betting loop passes per round: {report["betting_passes"]}')
+    print(f'Actions: {report["actions"]}\n')
+    print(f'{"Phase":<20} {"Calls":>9} {"Seconds":>10} {"Mean us":>10} {"Blocks":>10}')
+    for stats in instrumentation.phases.values():
+        print(stats)
@@ -0,0 +1,188 @@
+""" Tabular Q-learning by self-play in the vectorized environment, and an AI seat that plays the learned table """
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+
+from .engine import VALUES, Heuristic
+from .env import CARD, HIGHER, VectorEnv
+from .policy import PICKS, POSITION_INDEX, relation
+
+
+# Card states: position, lower and higher value in hand. Bet states: position, relation, success probability
+# in tenths, own pot, what it takes to call and balance in pairs, each capped
+CARD_SHAPE = (3, 13, 13)
+BET_SHAPE = (3, 4, 10, 7, 4, 6)
+CARD_STATES = int(np.prod(CARD_SHAPE))
+STATES = CARD_STATES + int(np.prod(BET_SHAPE))
+
+# Card decisions only have the first two actions
+CARD_LEGAL = np.array([True, True, False, False, False])
+
+
+""" Row of the table for a card decision; works on arrays and on scalars alike """
+def card_state(position, low, high):
+    return np.ravel_multi_index((position, np.asarray(low) - 2, np.asarray(high) - 2), CARD_SHAPE, mode='clip')
+
+
+def bet_state(position, stands, success, pot, highest, balance):
+    bucket = np.minimum((np.asarray(success) * 10).astype(np.intp), 9)
+    pot, need, balance = np.asarray(pot), np.asarray(highest) - np.asarray(pot), np.asarray(balance)
+    index = (position, stands, bucket, np.clip(pot, 0, 6), np.clip(need, 0, 3), np.clip(balance // 2, 0, 5))
+    return CARD_STATES + np.ravel_multi_index(index, BET_SHAPE)
+
+
+class Learner():
+    """
+    Action values of every state, learned one step at a time: a round is an episode, its reward is the chips won in
+    it, and its value is not discounted. Illegal actions are never chosen, so their values stay at zero.
+    """
+    def __init__(self, table=None, seed=None):
+        self.table = np.zeros((STATES, 5)) if table is None else table
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        with np.load(path) as data:
+            return cls(data['table'], seed)
+
+    def save(self, path):
+        np.savez_compressed(path, table=self.table)
+
+    """ Table rows and legal actions of an observation of VectorEnv """
+    def encode(self, observation):
+        hand = observation['hand']
+        cards = card_state(observation['position'], hand.min(axis=1), hand.max(axis=1))
+        # Each decision reads one of the two; the other is computed on a half-empty hand or empty pots, and unused
+        bets = bet_state(observation['position'], observation['relation'], observation['success'],
+                         observation['pot'], np.maximum(observation['pot'], observation['opponent_pot']),
+                         observation['balance'])
+        card = observation['phase'] == CARD
+        states = np.where(card, cards, bets)
+        legal = np.where(card[:, None], CARD_LEGAL, observation['legal'])
+        return states, legal
+
+    """ Greedy actions over the legal ones, or a random legal action with probability epsilon """
+    def act(self, states, legal, epsilon=0.0):
+        values = np.where(legal, self.table[states], -np.inf)
+        actions = values.argmax(axis=1)
+        explore = self.rng.random(len(states)) < epsilon
+        if explore.any():
+            noise = np.where(legal[explore], self.rng.random((explore.sum(), 5)), -1)
+            actions[explore] = noise.argmax(axis=1)
+        return actions
+
+    """
+    One Q-learning step for the whole batch: a state and action met in many games moves once, by alpha times the
+    mean of their errors, so the step size does not grow with the batch
+    """
+    def update(self, states, actions, rewards, ended, next_states, next_legal, alpha):
+        following = np.where(next_legal, self.table[next_states], -np.inf).max(axis=1)
+        targets = rewards + np.where(ended, 0, following)
+        cells = states * 5 + actions
+        errors = np.bincount(cells, targets - self.table[states, actions], self.table.size)
+        counts = np.bincount(cells, minlength=self.table.size)
+        flat = self.table.reshape(-1)
+        flat += alpha * np.divide(errors, counts, out=np.zeros(self.table.size), where=counts > 0)
+
+    """ An opponent for VectorEnv that plays this table from its own seat """
+    def opponent(self, epsilon=0.0):
+        return lambda observation: self.act(*self.encode(observation), epsilon)
+
+
+""" Win rate (a tie counts half) and chips per round of the greedy table against an opponent, over n games """
+def evaluate(learner, n=10000, opponent=None, seed=None):
+    env = VectorEnv(opponent=opponent, seed=seed)
+    observation = env.reset(n)
+    outcome = np.full(n, -2)
+    chips = rounds = 0
+    while (outcome == -2).any():
+        observation, rewards, dones, info = env.step(learner.act(*learner.encode(observation)))
+        playing = outcome == -2
+        chips += rewards[playing].sum()
+        rounds += info['round_over'][playing].sum()
+        finished = playing & dones
+        outcome[finished] = info['winner'][finished]
+    score = ((outcome == 0).sum() + 0.5 * (outcome == -1).sum()) / n
+    return score, chips / rounds
+
+
+"""
+Train a table over n concurrent games for a number of steps (one decision of every game each). The opponent is the
+table itself, as it stands, or the Heuristic; report(step, transitions, elapsed) is called every so many steps.
+"""
+def train(steps, n=4096, opponent='self', epsilon=0.1, alpha=0.05, seed=None, learner=None, report=None, every=1000):
+    learner = learner or Learner(seed=seed)
+    env = VectorEnv(opponent=learner.opponent(epsilon) if opponent == 'self' else None, seed=seed)
+    observation = env.reset(n)
+    states, legal = learner.encode(observation)
+    started = time.perf_counter()
+    for index in range(1, steps + 1):
+        actions = learner.act(states, legal, epsilon)
+        observation, rewards, dones, info = env.step(actions)
+        next_states, next_legal = learner.encode(observation)
+        learner.update(states, actions, rewards, info['round_over'], next_states, next_legal, alpha)
+        states, legal = next_states, next_legal
+        if report and index % every == 0:
+            report(index, index * n, time.perf_counter() - started)
+    return learner
+
+
+class Learned(Heuristic):
+    """ AI that plays a learned table in place of the Heuristic's card placement and picks """
+    def __init__(self, learner):
+        self.learner = learner
+
+    @classmethod
+    def load(cls, path):
+        return cls(Learner.load(path))
+
+    def place_card(self, player, game):
+        low, high = sorted(player.hand, key=VALUES.__getitem__)
+        state = card_state(POSITION_INDEX[player.position], VALUES[low], VALUES[high])
+        values = np.where(CARD_LEGAL, self.learner.table[state], -np.inf)
+        return high if values.argmax() == HIGHER else low
+
+    def pick(self, player, game):
+        pot = game.Board.bets[player]
+        highest = game.betting.max_bet
+        held = [VALUES[card] for card in player.hand]
+        value = VALUES[game.Board.cards[player]]
+        success_probability = game.Pile.tracker.win_probability(value, held, game.betting.live - 1)
+
+        stands = relation(pot, highest, player.balance)
+        state = bet_state(POSITION_INDEX[player.position], stands, success_probability, pot, highest, player.balance)
+        picks = game.legal_picks(player)
+        legal = [code for (code, pick) in enumerate(PICKS) if pick in picks]
+        values = self.learner.table[state]
+        return PICKS[max(legal, key=values.__getitem__)]
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Learn a One Poker AI by self-play in the vectorized environment')
+    parser.add_argument('--steps', type=int, default=20000, help='decisions of every game to train on')
+    parser.add_argument('--games', type=int, default=4096, help='concurrent games')
+    parser.add_argument('--opponent', choices=('self', 'heuristic'), default='self')
+    parser.add_argument('--epsilon', type=float, default=0.1, help='share of random exploring actions')
+    parser.add_argument('--alpha', type=float, default=0.05, help='learning rate')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--load', default=None, help='table (.npz) to continue training')
+    parser.add_argument('--output', default='learned.npz')
+    parser.add_argument('--evaluate', type=int, default=10000, help='games against the Heuristic after training')
+    args = parser.parse_args(argv)
+
+    def report(step, transitions, elapsed):
+        print(f'{step:>8} steps  {transitions:>12,} transitions  {elapsed:8.1f}s  {transitions / elapsed:10,.0f}/s')
+
+    learner = Learner.load(args.load, args.seed) if args.load else Learner(seed=args.seed)
+    train(args.steps, args.games, args.opponent, args.epsilon, args.alpha, args.seed, learner, report,
+          every=max(args.steps // 20, 1))
+    learner.save(args.output)
+    print(f'Saved {args.output}')
+    if args.evaluate:
+        score, chips = evaluate(learner, args.evaluate, seed=args.seed)
+        print(f'Against the Heuristic: {score:.1%} of games, {chips:+.3f} chips per round')
+
+
+if __name__ == '__main__':
+    main()
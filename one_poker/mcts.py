@@ -0,0 +1,310 @@
+""" Information-set Monte Carlo tree search seat, with a time or iteration budget per decision and parallel rollouts """
+from argparse import ArgumentParser
+from math import log, sqrt
+from multiprocessing import Pool
+from random import Random
+import time
+
+from .engine import VALUES, Game, Heuristic
+from .state import CARD, OVER, from_game, step
+
+
+# Iterations per worker of the seat entered by name (tournament.STRATEGIES): about its default time budget on one
+# core, and the same search on any machine
+ITERATIONS = 200
+
+# A dealt card only matters by value; the code of value v in the first suit is v - 2
+HIGH_VALUES = range(8, 15)
+LOW_VALUES = range(2, 8)
+
+
+class Node():
+    """ Statistics of one of the seat's actions; available counts the iterations it was legal in """
+    __slots__ = ('visits', 'total', 'squares', 'available', 'children')
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.available = 0
+        self.children = {}
+
+    @property
+    def mean(self):
+        return self.total / self.visits if self.visits else 0.0
+
+    """ Standard error of the mean reward """
+    @property
+    def error(self):
+        if self.visits < 2:
+            return float('inf')
+        variance = (self.squares - self.total * self.total / self.visits) / (self.visits - 1)
+        return sqrt(max(variance, 0) / self.visits)
+
+
+"""
+A state the seat cannot tell apart from the true one: every opponent's hidden cards are dealt again from the unseen
+cards (engine.CardTracker counts), keeping the High and Low counts shown on the table, and the rest of the pile
+is drawn from what is left
+"""
+def determinize(state, seat, rng):
+    unseen = list(state.unseen)
+    for card in state.hands[seat] + ((state.board[seat],) if state.board[seat] is not None else ()):
+        unseen[VALUES[card]] -= 1
+    high = [value - 2 for value in HIGH_VALUES for _ in range(unseen[value])]
+    low = [value - 2 for value in LOW_VALUES for _ in range(unseen[value])]
+
+    def take(cards):
+        index = rng.randrange(len(cards))
+        cards[index], cards[-1] = cards[-1], cards[index]
+        return cards.pop()
+
+    hands, board = list(state.hands), list(state.board)
+    for other in state.order:
+        if other == seat:
+            continue
+        placed = board[other] is not None
+        count = len(hands[other]) + placed
+        highs = state.high(other)
+        dealt = [take(high) if index < highs else take(low) for index in range(count)]
+        rng.shuffle(dealt)
+        if placed:
+            board[other] = dealt.pop()
+        hands[other] = tuple(dealt)
+
+    rest = high + low
+    left = len(state.pile) - state.top
+    pile = bytes(rng.sample(rest, min(left, len(rest))))
+    return state._replace(pile=pile, top=0, hands=tuple(hands), board=tuple(board))
+
+
+"""
+Default policy of the rollouts and of the opponents: the Heuristic's card, then bets that grow with the strength
+of the placed card within its band
+"""
+def rollout_action(state, rng):
+    actions = state.legal_actions()
+    if len(actions) == 1:
+        return actions[0]
+    elif state.phase == CARD:
+        choose = max if state.position(state.actor) == 'Neutral' else min
+        return choose(actions, key=VALUES.__getitem__)
+
+    value = VALUES[state.board[state.actor]]
+    strength = 1.0 if value == 14 else (value - 8) / 6 if value > 7 else (value - 2) / 5
+    draw = rng.random()
+    if 'raise' in actions and draw < strength * strength:
+        return 'raise'
+    elif draw < strength + 0.3:
+        return next(action for action in ('check', 'call', 'all in') if action in actions)
+    return 'fold'
+
+
+class Search():
+    """
+    Single-observer information-set MCTS: one tree over the seat's information set, walked with a fresh
+    determinization every iteration. Opponents are chance nodes played by the default policy, as a searched opponent
+    would answer the seat's true cards. The reward is the seat's share of the chips once the current round (and
+    rounds - 1 more) is settled, so it stays within 0 and 1.
+    """
+    def __init__(self, state, seat, rng, exploration=0.5, rounds=2):
+        self.state = state
+        self.seat = seat
+        self.rng = rng
+        self.exploration = exploration
+        self.horizon = state.round + rounds
+        self.chips = sum(state.balances) + sum(state.bets)
+        self.root = Node()
+        self.rollouts = 0
+
+    def iterate(self):
+        rng = self.rng
+        state = determinize(self.state, self.seat, rng)
+        node = self.root
+        path = []
+
+        # Selection and expansion, within the tree; opponents move by the default policy
+        while state.phase != OVER and state.round < self.horizon:
+            actor = state.actor
+            if actor != self.seat:
+                action = rollout_action(state, rng)
+                # Keyed apart from the seat's own actions, which a later round may put in the same place
+                key = (actor, action)
+                node = node.children.get(key) or node.children.setdefault(key, Node())
+                state = step(state, action)
+                continue
+
+            actions = state.legal_actions()
+            untried = [action for action in actions if action not in node.children]
+            for action in actions:
+                child = node.children.get(action)
+                if child is not None:
+                    child.available += 1
+            if untried:
+                action = rng.choice(untried)
+                child = node.children[action] = Node()
+                child.available = 1
+                path.append(child)
+                state = step(state, action)
+                break
+            best, best_score = None, -1.0
+            for action in actions:
+                child = node.children[action]
+                score = child.total / child.visits + self.exploration * sqrt(log(child.available) / child.visits)
+                if score > best_score:
+                    best, best_score = action, score
+            node = node.children[best]
+            path.append(node)
+            state = step(state, best)
+
+        # Rollout with the default policy
+        while state.phase != OVER and state.round < self.horizon:
+            state = step(state, rollout_action(state, rng))
+
+        # Backpropagation
+        reward = state.balances[self.seat] / self.chips
+        for child in path:
+            child.visits += 1
+            child.total += reward
+            child.squares += reward * reward
+        self.rollouts += 1
+
+    """ Best action by mean reward is ahead of every other by z standard errors on both sides """
+    def settled(self, z, minimum):
+        children = self.root.children.values()
+        if len(self.root.children) < 2 or any(child.visits < minimum for child in children):
+            return False
+        best = max(children, key=lambda child: child.mean)
+        low = best.mean - z * best.error
+        return all(child.mean + z * child.error < low for child in children if child is not best)
+
+    """ Iterate until the deadline, or for iterations iterations when given, or until the best action is settled """
+    def run(self, deadline, z=2.0, minimum=30, check_every=16, iterations=None):
+        while time.perf_counter() < deadline if iterations is None else self.rollouts < iterations:
+            for _ in range(check_every if iterations is None else min(check_every, iterations - self.rollouts)):
+                self.iterate()
+            if self.settled(z, minimum):
+                return True
+        return False
+
+    """ (visits, total, squares) of every root action """
+    def statistics(self):
+        return {action: (child.visits, child.total, child.squares) for (action, child) in self.root.children.items()}
+
+
+""" One worker's search of the same decision; runs inside the pool workers """
+def search(task):
+    state, seat, seed, budget, exploration, rounds, z, minimum, iterations = task
+    started = time.perf_counter()
+    tree = Search(state, seat, Random(seed), exploration, rounds)
+    stopped = tree.run(started + budget, z, minimum, iterations=iterations)
+    return tree.statistics(), tree.rollouts, stopped
+
+
+class MCTS():
+    """
+    An AI seat searching every card and pick for budget seconds, over workers processes (the calling process is one
+    of them). A search stops early once the best action is settled; the action with the most visits over all workers
+    is played. Raises are by the minimum, as the other AIs raise. workers > 1 cannot be used inside daemonic pool
+    workers (tournament.py plays each game in one), so tournaments run 1 worker per seat.
+
+    A time budget searches as far as the machine gets, so the same game can be played differently. With iterations,
+    every worker searches that many iterations instead, whatever the time it takes, and a seeded game is played the
+    same way every time: replays and duplicate games need that.
+    """
+    def __init__(self, budget=0.01, workers=1, exploration=0.5, rounds=2, z=2.0, minimum=30, seed=None,
+                 iterations=None):
+        self.budget = budget
+        self.iterations = iterations
+        self.workers = workers
+        self.exploration = exploration
+        self.rounds = rounds
+        self.z = z
+        self.minimum = minimum
+        # Searches draw their seeds from the seat's own stream, which the Game seeds, unless given a seed of their own
+        self.rng = Random(seed) if seed is not None else None
+        self.pool = None
+
+        # Totals over every decision
+        self.decisions = 0
+        self.rollouts = 0
+        self.seconds = 0
+        self.early_stops = 0
+
+    def place_card(self, player, game):
+        return self.decide(player, game)
+
+    def pick(self, player, game):
+        return self.decide(player, game).capitalize()
+
+    def decide(self, player, game):
+        state = from_game(game)
+        actions = state.legal_actions()
+        if len(actions) == 1:
+            return actions[0]
+
+        started = time.perf_counter()
+        seat = game.players.index(player)
+        rng = self.rng or player.rng
+        tasks = [(state, seat, rng.getrandbits(64), self.budget, self.exploration, self.rounds, self.z, self.minimum,
+                  self.iterations) for _ in range(self.workers)]
+        if self.workers > 1:
+            if self.pool is None:
+                self.pool = Pool(self.workers - 1)
+            pending = self.pool.map_async(search, tasks[1:])
+            results = [search(tasks[0])] + pending.get()
+        else:
+            results = [search(tasks[0])]
+
+        visits = dict.fromkeys(actions, 0)
+        for (statistics, rollouts, stopped) in results:
+            for (action, (count, _, _)) in statistics.items():
+                visits[action] += count
+            self.rollouts += rollouts
+            self.early_stops += stopped
+        self.decisions += 1
+        self.seconds += time.perf_counter() - started
+        return max(actions, key=visits.__getitem__)
+
+    def report(self):
+        return {
+            'decisions': self.decisions,
+            'rollouts': self.rollouts,
+            'rollouts_per_second': self.rollouts / self.seconds if self.seconds else 0,
+            'mean_decision_ms': self.seconds / self.decisions * 1e3 if self.decisions else 0,
+            'early_stops': self.early_stops,
+        }
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Play the MCTS seat against the Heuristic')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=0.01, help='seconds of search per decision')
+    parser.add_argument('--iterations', type=int, default=None, help='iterations per worker, in place of the budget')
+    parser.add_argument('--workers', type=int, default=1, help='processes per decision, the caller included')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    seat = MCTS(args.budget, args.workers, seed=args.seed, iterations=args.iterations)
+    rng = Random(args.seed)
+    score = 0
+    try:
+        for index in range(args.games):
+            # Alternate the seats; a tie scores half a game
+            seats = (seat, Heuristic()) if index % 2 == 0 else (Heuristic(), seat)
+            winner = Game(*seats, headless=True, seed=rng.getrandbits(64)).run().winner
+            mcts_name = 'P1' if index % 2 == 0 else 'P2'
+            score += 0.5 if winner is None else winner == mcts_name
+    finally:
+        seat.close()
+
+    report = seat.report()
+    print(f'Score against the Heuristic: {score / args.games:.3f} over {args.games} games')
+    print(f'{report["decisions"]} decisions, {report["mean_decision_ms"]:.2f} ms each, '
+          f'{report["rollouts_per_second"]:,.0f} rollouts/s, {report["early_stops"]} early stops')
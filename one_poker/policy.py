@@ -0,0 +1,197 @@
+""" The Heuristic's betting policy compiled into lookup tables, with a validator against the original branch tree """
+from argparse import ArgumentParser
+from functools import lru_cache
+from math import inf, nextafter
+import time
+
+
+# Indexes of the tables; the batch engine's position and action codes are the same numbers
+POSITIONS = ('Advantage', 'Neutral', 'Disadvantage')
+PICKS = ('Check', 'Call', 'Raise', 'Fold', 'All in')
+POSITION_INDEX = {position: index for (index, position) in enumerate(POSITIONS)}
+
+# How the seat's pot stands against the highest pot: no balance left, unable to call without going all in,
+# level with the highest pot, or behind it
+BROKE, SHORT, EVEN, BEHIND = range(4)
+
+CHECK, CALL, RAISE, FOLD, ALL_IN = range(5)
+
+"""
+POLICY[position][relation][kelly][confident]: kelly is whether the Kelly bet covers the next raise (or the all in),
+confident whether the success probability beats the random factor
+"""
+POLICY = (
+    # Advantage
+    (
+        ((CHECK, CHECK), (CHECK, CHECK)),
+        ((FOLD, FOLD), (FOLD, ALL_IN)),
+        ((CHECK, CHECK), (CHECK, RAISE)),
+        ((CALL, CALL), (CALL, RAISE)),
+    ),
+    # Neutral
+    (
+        ((CHECK, CHECK), (CHECK, CHECK)),
+        ((FOLD, FOLD), (FOLD, ALL_IN)),
+        ((CHECK, CHECK), (CHECK, RAISE)),
+        ((FOLD, CALL), (FOLD, RAISE)),
+    ),
+    # Disadvantage
+    (
+        ((CHECK, CHECK), (CHECK, CHECK)),
+        ((FOLD, FOLD), (FOLD, FOLD)),
+        ((CHECK, CHECK), (CHECK, CHECK)),
+        ((FOLD, FOLD), (FOLD, FOLD)),
+    ),
+)
+
+
+def relation(pot, highest, balance):
+    if balance == 0:
+        return BROKE
+    elif balance <= highest - pot:
+        return SHORT
+    elif pot == highest:
+        return EVEN
+    return BEHIND
+
+
+""" The Heuristic's Kelly test: need <= kelly_criterion(success_probability, odds) * bank, as Utility computes it """
+def kelly_covers(success_probability, need, bank, odds=1):
+    return need <= (success_probability - ((1 - success_probability) / odds)) * bank
+
+
+"""
+Smallest success probability (a float) that passes the Kelly test with even odds, found by bisection over the
+floats so that it agrees with the test's own rounding; inf if no probability does
+"""
+@lru_cache(maxsize=None)
+def raise_threshold(need, bank):
+    if not kelly_covers(1.0, need, bank):
+        return inf
+    low, high = 0.0, 1.0
+    while nextafter(low, 1) < high:
+        middle = (low + high) / 2
+        if middle in (low, high):
+            middle = nextafter(low, 1)
+        if kelly_covers(middle, need, bank):
+            high = middle
+        else:
+            low = middle
+    return high
+
+
+"""
+Success probability the Kelly test asks for in a relation. Only a bank of 1 or more covers an all in, so a seat that
+is short goes all in on a success probability of 1 alone; level or behind, the bank exceeds the highest pot and the
+odds are even.
+"""
+def threshold(relation, pot, highest, balance):
+    if relation == SHORT:
+        return 1.0
+    elif relation == EVEN:
+        return raise_threshold(pot + 1, balance + pot)
+    elif relation == BEHIND:
+        return raise_threshold(highest + 1, balance + pot)
+    return inf
+
+
+""" raise_threshold for every need and bank up to chips, as rows by need: the batch engine's lookup table """
+def threshold_table(chips):
+    return [[raise_threshold(need, bank) for bank in range(chips + 1)] for need in range(chips + 2)]
+
+
+""" The Heuristic's pick: two comparisons and a table lookup """
+def compiled_pick(position, success_probability, random_factor, pot, highest, balance):
+    stands = relation(pot, highest, balance)
+    kelly = success_probability >= threshold(stands, pot, highest, balance)
+    return PICKS[POLICY[POSITION_INDEX[position]][stands][kelly][success_probability > random_factor]]
+
+
+""" The Heuristic's original branch tree, kept as the reference the tables are checked against """
+def reference_pick(position, success_probability, random_factor, pot, highest, balance):
+    # Odds (preliminary) are defined as:
+    if highest > balance + pot:
+        odds = highest / (balance + pot)
+    else:
+        odds = 1
+
+    # Max amount willing to bet
+    max_bet = (success_probability - ((1 - success_probability) / odds)) * (balance + pot)
+
+    if balance == 0:
+        return 'Check'
+    elif balance <= highest - pot:
+        if position == 'Advantage' or position == 'Neutral':
+            if pot + balance <= max_bet and success_probability > random_factor:
+                return 'All in'
+            return 'Fold'
+        return 'Fold'
+    elif pot == highest:
+        if position == 'Advantage' or position == 'Neutral':
+            if pot + 1 <= max_bet and success_probability > random_factor:
+                return 'Raise'
+            return 'Check'
+        return 'Check'
+    elif pot < highest:
+        if position == 'Advantage':
+            if highest + 1 <= max_bet and success_probability > random_factor:
+                return 'Raise'
+            return 'Call'
+        elif position == 'Disadvantage':
+            return 'Fold'
+        if highest + 1 <= max_bet and success_probability > random_factor:
+            return 'Raise'
+        elif success_probability > random_factor:
+            return 'Call'
+        return 'Fold'
+    return 'Check'
+
+
+"""
+Compare compiled_pick with reference_pick on every stake with at most chips in a pot or balance, every position,
+and every success probability where a pick can change: either side of the stake's Kelly threshold and of every random
+factor, with the random factors either side of each probability. Returns (cases checked, mismatching cases).
+"""
+def validate(chips=20):
+    factors = [value / 100 for value in range(78)]
+    common = {0.0, 0.5, 1.0, nextafter(1.0, 0)}
+    for factor in factors:
+        common.update((nextafter(factor, 0), factor, nextafter(factor, 1)))
+
+    checked, mismatches = 0, []
+    for highest in range(chips + 1):
+        for pot in range(highest + 1):
+            for balance in range(chips + 1):
+                if balance + pot == 0:
+                    # A seat with nothing left is out of the game
+                    continue
+                stands = relation(pot, highest, balance)
+                limit = threshold(stands, pot, highest, balance)
+                probabilities = set(common)
+                if limit <= 1:
+                    probabilities.update((nextafter(limit, 0), limit, nextafter(limit, 1)))
+                for probability in probabilities:
+                    if not 0 <= probability <= 1:
+                        continue
+                    below = [factor for factor in factors if factor < probability]
+                    randoms = {0.0, 0.77, below[-1] if below else 0.0, next((f for f in factors if f >= probability), 0.77)}
+                    for random_factor in randoms:
+                        for position in POSITIONS:
+                            arguments = (position, probability, random_factor, pot, highest, balance)
+                            checked += 1
+                            if compiled_pick(*arguments) != reference_pick(*arguments):
+                                mismatches.append(arguments)
+    return checked, mismatches
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Check the compiled Heuristic policy against its branch tree')
+    parser.add_argument('--chips', type=int, default=20, help='largest pot or balance to check')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    checked, mismatches = validate(args.chips)
+    print(f'{checked:,} cases checked in {time.perf_counter() - started:.1f} s, {len(mismatches)} mismatches')
+    for arguments in mismatches[:20]:
+        print('  ', arguments, compiled_pick(*arguments), reference_pick(*arguments))
+    raise SystemExit(1 if mismatches else 0)
@@ -0,0 +1,164 @@
+""" Seeded replay of a recorded game: the human seats' answers come from the record, and play stops at any round """
+from argparse import ArgumentParser
+import time
+
+from .engine import CARDS, Game
+from .history import HandHistoryReader
+from .tournament import STRATEGIES
+
+
+""" Cards by name of the seats that placed one """
+def placed(cards):
+    return {name: card for (name, card) in cards.items() if card is not None}
+
+
+class Script():
+    """
+    What a game recorded, by round: the card every seat placed, the betting actions in order and the balances after
+    the round. Replays answer the human seats from it and check the rounds they re-run against it.
+    """
+    def __init__(self, rounds):
+        # round: (cards by name, [(name, pick, amount)], balances by name)
+        self.rounds = {}
+        for (number, cards, actions, balances) in rounds:
+            self.rounds[number] = (cards, list(actions), balances)
+        self.cursors = {}
+
+    """ From the RoundResults of a GameResult """
+    @classmethod
+    def from_results(cls, results):
+        return cls((result.round, placed(result.cards), result.actions, result.balances) for result in results)
+
+    """ From the records of one seed in a hand history (history.py); seat i is named P{i + 1} """
+    @classmethod
+    def from_history(cls, records, seed):
+        def name(seat):
+            return f'P{seat + 1}'
+
+        rounds = []
+        for record in records:
+            if record.seed != seed:
+                continue
+            rounds.append((
+                record.round,
+                {name(seat): card for (seat, card) in enumerate(record.cards) if card is not None},
+                [(name(seat), pick, amount) for (seat, pick, amount) in record.actions],
+                {name(seat): balance for (seat, balance) in enumerate(record.balances)},
+            ))
+        if not rounds:
+            raise ValueError(f'No rounds of seed {seed} in the hand history')
+        return cls(rounds)
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def recorded(self, round):
+        if round not in self.rounds:
+            raise RuntimeError(f'The record ends before round {round}')
+        return self.rounds[round]
+
+    def card(self, round, name):
+        return self.recorded(round)[0][name]
+
+    """ The seat's next recorded action of the round, as (pick, amount) """
+    def action(self, round, name):
+        actions = self.recorded(round)[1]
+        index = self.cursors.get((round, name), 0)
+        while index < len(actions) and actions[index][0] != name:
+            index += 1
+        if index == len(actions):
+            raise RuntimeError(f'{name} has no more recorded actions in round {round}')
+        self.cursors[(round, name)] = index + 1
+        return actions[index][1:]
+
+
+class Replay():
+    """
+    A headless Game run from its seed, with every human seat (False) answered from a Script. AI seats decide again, so
+    they must be the strategies of the recorded game; a search (mcts.MCTS) only repeats itself on an iteration budget.
+    Every re-run round is checked against the record, and play can stop at the start of any round.
+    """
+    def __init__(self, seats, seed, script, **options):
+        self.game = Game(*seats, headless=True, seed=seed, pace=0, **options)
+        self.script = script
+        self.steps = self.game.play()
+        self.request = None
+        self.started = False
+        self.result = None
+
+    """ The human seat's recorded card, or its recorded pick with the raise amount the GUI would have sent """
+    def answer(self, request):
+        kind, subject = request
+        game = self.game
+        if kind == 'round':
+            self.check(subject)
+            return None
+        elif kind == 'breakpoint':
+            return None
+        elif kind == 'card':
+            return self.script.card(game.round, subject.name)
+
+        pick, amount = self.script.action(game.round, subject.name)
+        legal = game.legal_picks(subject)
+        if pick == 'all in' and 'All in' not in legal:
+            # A raise of the whole balance, recorded as going all in
+            pick = 'raise'
+        return pick.capitalize(), str(amount) if pick == 'raise' else ''
+
+    def check(self, result):
+        cards, _, balances = self.script.recorded(result.round)
+        if placed(result.cards) != cards or result.balances != balances:
+            raise RuntimeError(f'The replay left the record in round {result.round}')
+
+    """ Play on to the start of a later round (before its deal), or to the end; returns the Game """
+    def run_to(self, round=None):
+        if self.result is not None:
+            return self.game
+        self.game.breakpoint = round
+        try:
+            if not self.started:
+                self.started = True
+                self.request = next(self.steps)
+            else:
+                self.request = self.steps.send(self.answer(self.request))
+            while self.request[0] != 'breakpoint':
+                self.request = self.steps.send(self.answer(self.request))
+        except StopIteration as stop:
+            self.result = stop.value
+        return self.game
+
+
+""" Balances, seating and the cards held at the game's current point """
+def describe(game):
+    lines = [f'Round {game.round}, {len(game.Pile)} cards left in the pile']
+    for player in game.players:
+        state = 'out' if player not in game.player_order else f'seat {game.player_order.index(player) + 1}'
+        hand = ' '.join(str(CARDS[card]) for card in player.hand)
+        lines.append(f'{player.name}: balance {player.balance:>3}, {state}, holding {hand or "nothing"}')
+    return '\n'.join(lines)
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Replay a game from a hand history, up to the start of a round')
+    parser.add_argument('history', help='hand history file (history.py)')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the game (default: the first in the file)')
+    parser.add_argument('--round', type=int, default=None, help='stop at the start of this round (default: the end)')
+    parser.add_argument('--seats', nargs='+', default=['human', 'heuristic'],
+                        help='human (answered from the record) or the strategy of every seat')
+    args = parser.parse_args(argv)
+
+    with HandHistoryReader(args.history) as reader:
+        seed = args.seed if args.seed is not None else next(iter(reader)).seed
+        script = Script.from_history(reader, seed)
+    seats = [False if name == 'human' else STRATEGIES[name]() for name in args.seats]
+
+    started = time.perf_counter()
+    replay = Replay(seats, seed, script)
+    game = replay.run_to(args.round)
+    elapsed = time.perf_counter() - started
+    print(describe(game))
+    print(f'{replay.result or "Stopped"}; replayed in {elapsed * 1e3:.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
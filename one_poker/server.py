@@ -0,0 +1,275 @@
+""" asyncio table server: many Game tables in one process, played over line-delimited JSON """
+from argparse import ArgumentParser
+import asyncio
+from itertools import count
+import json
+import signal
+import sys
+import time
+
+from .engine import CARDS, Game, Heuristic, VALUES
+from .history import HandHistoryWriter
+from .stats import SessionStats, SnapshotWriter
+from .tournament import STRATEGIES
+
+
+class Latency():
+    """ Running count, mean and maximum of a duration, in milliseconds """
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds * 1000
+        self.max = max(self.max, seconds * 1000)
+
+    def report(self):
+        return {'count': self.count, 'mean_ms': self.total / self.count if self.count else 0, 'max_ms': self.max}
+
+
+class Connection():
+    """ One client socket; messages are JSON objects, one per line """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    async def send(self, message):
+        if self.closed:
+            return
+        self.writer.write(json.dumps(message).encode() + b'\n')
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            self.closed = True
+
+    async def receive(self):
+        line = await self.reader.readline()
+        if not line:
+            self.closed = True
+            raise ConnectionError('client disconnected')
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            message = None
+        if not isinstance(message, dict):
+            await self.send({'type': 'error', 'error': 'expected one JSON object per line'})
+            return {}
+        return message
+
+    def close(self):
+        self.closed = True
+        self.writer.close()
+
+
+class Table():
+    """ One Game run as a coroutine; human seats are answered by their connection, AI seats run inline """
+    def __init__(self, number, seats, seed=None, history=None):
+        self.number = number
+        self.connections = {f'P{index + 1}': seat for (index, seat) in enumerate(seats) if isinstance(seat, Connection)}
+        self.game = Game(*[seat if not isinstance(seat, Connection) else False for seat in seats], headless=True, seed=seed,
+                         history=history)
+        self.engine = Latency()
+        self.clients = Latency()
+        self.result = None
+
+    """ The table's public state, as seen from one seat """
+    def state(self, player):
+        game = self.game
+        return {
+            'table': self.number,
+            'seat': player.name,
+            'round': game.round,
+            'hand': [str(CARDS[card]) for card in player.hand],
+            'cards': list(player.hand),
+            'position': player.position,
+            'balances': {other.name: other.balance for other in game.players},
+            'pots': {other.name: pot for (other, pot) in game.Board.bets.items()},
+            'high': {other.name: other.high for other in game.player_set},
+        }
+
+    """ Get a card or a pick from a human seat, asking again until it is valid """
+    async def ask(self, kind, player):
+        connection = self.connections[player.name]
+        while not connection.closed:
+            if kind == 'card':
+                await connection.send({'type': 'card', **self.state(player)})
+            else:
+                await connection.send({'type': 'pick', 'legal': self.game.legal_picks(player), **self.state(player)})
+
+            started = time.perf_counter()
+            try:
+                message = await connection.receive()
+            except ConnectionError:
+                break
+            self.clients.add(time.perf_counter() - started)
+
+            # 5.0 and true compare equal to card codes, but cannot index the card tables
+            if kind == 'card' and type(message.get('card')) is int and message['card'] in player.hand:
+                return message['card']
+            elif kind == 'pick':
+                picks = {pick.lower(): pick for pick in self.game.legal_picks(player)}
+                if str(message.get('pick', '')).lower() in picks:
+                    return picks[str(message['pick']).lower()], str(message.get('amount', ''))
+            await connection.send({'type': 'error', 'error': f'invalid {kind}'})
+
+        # The client left: the Heuristic takes over the seat
+        player.ai = Heuristic()
+        if kind == 'card':
+            return player.ai.place_card(player, self.game)
+        return player.ai.pick(player, self.game), ''
+
+    async def broadcast(self, message):
+        for connection in self.connections.values():
+            await connection.send(message)
+
+    async def run(self):
+        steps = self.game.play()
+        answer = None
+        try:
+            while True:
+                started = time.perf_counter()
+                kind, subject = steps.send(answer)
+                self.engine.add(time.perf_counter() - started)
+
+                if kind == 'round':
+                    answer = None
+                    await self.broadcast({
+                        'type': 'round', 'table': self.number, 'round': subject.round, 'winner': subject.winner,
+                        'cards': {name: VALUES[card] for (name, card) in subject.cards.items()},
+                        'actions': subject.actions, 'balances': subject.balances,
+                    })
+                    # Let the other tables run between rounds, even when every seat is an AI
+                    await asyncio.sleep(0)
+                else:
+                    answer = await self.ask(kind, subject)
+        except StopIteration as stop:
+            self.result = stop.value
+        await self.broadcast({'type': 'end', 'table': self.number, 'winner': self.result.winner})
+
+
+class Server():
+    """
+    Clients send {"cmd": "play", "opponent": "<strategy>" | "human"} to sit at a table, and
+    {"cmd": "stats"} for per-table latency. A human opponent is whoever asks for one next.
+    """
+    def __init__(self, history=None, stats=None):
+        # Optional HandHistoryWriter shared by every table; a game is found again by its seed (see replay.py)
+        self.history = history
+        # Optional SessionStats fed by every table
+        self.stats = stats
+        self.tables = {}
+        self.numbers = count(1)
+        self.waiting = None
+        self.connections = 0
+
+    async def handle(self, reader, writer):
+        connection = Connection(reader, writer)
+        self.connections += 1
+        try:
+            while not connection.closed:
+                try:
+                    message = await connection.receive()
+                except ConnectionError:
+                    break
+                if message.get('cmd') == 'stats':
+                    await connection.send({'type': 'stats', **self.report()})
+                elif message.get('cmd') == 'play':
+                    table = await self.seat(connection, message.get('opponent', 'heuristic'), message.get('seed'))
+                    if table is None:
+                        continue
+                    # The table coroutine reads from this connection until the game ends
+                    await table.finished
+                else:
+                    await connection.send({'type': 'error', 'error': 'unknown command'})
+        finally:
+            self.connections -= 1
+            if self.waiting is connection:
+                self.waiting = None
+            connection.close()
+
+    """ Start a table for the connection, or park it until a human opponent arrives """
+    async def seat(self, connection, opponent, seed):
+        # A hand history records 64-bit seeds; any other seed could not be replayed
+        if seed is not None and (type(seed) is not int or not 0 <= seed < 2 ** 64):
+            await connection.send({'type': 'error', 'error': 'seed must be an integer from 0 to 2**64 - 1'})
+            return None
+        if opponent == 'human':
+            if self.waiting is None or self.waiting.closed:
+                self.waiting = connection
+                self.waiting.table = asyncio.get_running_loop().create_future()
+                await connection.send({'type': 'waiting'})
+                table = await self.waiting.table
+                return table
+            seats, other = [self.waiting, connection], self.waiting
+            self.waiting = None
+        elif opponent in STRATEGIES:
+            seats, other = [connection, STRATEGIES[opponent]()], None
+        else:
+            await connection.send({'type': 'error', 'error': f'unknown opponent {opponent}'})
+            return None
+
+        table = Table(next(self.numbers), seats, seed, self.history)
+        if self.stats:
+            self.stats.attach(table.game)
+        table.finished = asyncio.ensure_future(self.play(table))
+        if other is not None:
+            other.table.set_result(table)
+        return table
+
+    async def play(self, table):
+        self.tables[table.number] = table
+        try:
+            await table.run()
+        finally:
+            del self.tables[table.number]
+            # A finished game is on disk as a whole, ready to be replayed
+            if self.history:
+                self.history.flush()
+
+    def report(self):
+        return {
+            'connections': self.connections,
+            # NaN (nothing seen yet) is not JSON
+            'session': {name: value for (name, value) in self.stats.columns().items() if value == value} if self.stats else None,
+            'tables': {
+                number: {'round': table.game.round, 'engine': table.engine.report(), 'clients': table.clients.report()}
+                for (number, table) in self.tables.items()
+            },
+        }
+
+
+async def serve(host, port, unix=None, history=None, stats=None):
+    server = Server(history, stats)
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, path=unix)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, limit=1 << 16)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Host One Poker tables over TCP or a Unix socket')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--history', default=None, help='append every round of every table to this hand history')
+    parser.add_argument('--stats', default=None, help='append columnar session statistics to this directory')
+    parser.add_argument('--stats-interval', type=float, default=60, help='seconds between statistics snapshots')
+    args = parser.parse_args()
+
+    # Stopping the server with SIGTERM still flushes the history and the statistics
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    stats = SessionStats(SnapshotWriter(args.stats), interval=args.stats_interval) if args.stats else None
+    try:
+        if args.history:
+            with HandHistoryWriter(args.history) as history:
+                asyncio.run(serve(args.host, args.port, args.unix, history, stats))
+        else:
+            asyncio.run(serve(args.host, args.port, args.unix, stats=stats))
+    finally:
+        if stats:
+            stats.flush()
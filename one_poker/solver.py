@@ -0,0 +1,381 @@
+""" CFR+ solver for the One Poker betting game """
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+
+from .cache import lookup
+from .engine import Heuristic, VALUES
+
+
+# Solver actions; 'call' also covers checking and going all in for less
+FOLD, CALL, RAISE = 0, 1, 2
+
+# Chance of each card (index = value - 2) for a hand with 0, 1 or 2 High cards
+CLASS_PRIOR = np.zeros((3, 13))
+CLASS_PRIOR[0, :6] = 1 / 6
+CLASS_PRIOR[2, 6:] = 1 / 7
+CLASS_PRIOR[1] = (CLASS_PRIOR[0] + CLASS_PRIOR[2]) / 2
+
+# Showdown result for the first player: higher card wins, except that a 2 beats an Ace
+_values = np.arange(2, 15)
+SHOWDOWN = np.sign(_values[:, None] - _values[None, :])
+SHOWDOWN[12, 0], SHOWDOWN[0, 12] = -1, 1
+
+
+""" Chances of the placed card's value (index = value - 2) for a hand with high High cards, placing its 'min', 'max' or a 'random' card """
+def placement_prior(high, choice):
+    if choice == 'random':
+        return CLASS_PRIOR[high]
+    elif high == 1:
+        # The Low card is always the smaller
+        return CLASS_PRIOR[0 if choice == 'min' else 2]
+
+    # Both cards in one band, drawn uniformly: the chance that the smaller (or bigger) of the two is each value
+    band = slice(0, 6) if high == 0 else slice(6, 13)
+    size = band.stop - band.start
+    ranks = np.arange(size)
+    prior = np.zeros(13)
+    if choice == 'min':
+        prior[band] = ((size - ranks) ** 2 - (size - ranks - 1) ** 2) / size ** 2
+    else:
+        prior[band] = ((ranks + 1) ** 2 - ranks ** 2) / size ** 2
+    return prior
+
+
+""" Expected value of the better card of a hand with high High cards, given the value of each card (last axis) """
+def best_placement(values, high):
+    bands = [slice(0, 6)] * (2 - high) + [slice(6, 13)] * high
+    return np.maximum(values[..., bands[0], None], values[..., None, bands[1]]).mean(axis=(-2, -1)).mean()
+
+
+class GameTree():
+    """
+    Betting tree of one round for every starting balance of the first player.
+
+    A decision node is (balance, actor, first pass, pot of the first player, pot of the second player),
+    following the passes of Game.betting_phase: everyone acts once per pass, and passes repeat while
+    a player who can still bet is below the highest pot. Terminal nodes hold the first player's payoff.
+    """
+    def __init__(self, balance=10, wager=1):
+        self.balance = balance
+        self.wager = wager
+        self.total = 2 * balance
+        self.decisions = {}
+        self.terminals = {}
+        self.edges = []
+
+        for first_balance in range(wager, self.total - wager + 1):
+            self.expand((first_balance, 0, True, wager, wager))
+
+        # Decisions come first in the flat index space, then terminals, then one all-zero slot for illegal actions
+        self.size = len(self.decisions)
+        self.children = np.full((self.size, 3), self.size + len(self.terminals))
+        for (node, action, child) in self.edges:
+            self.children[node, action] = self.index_of(child)
+        self.legal = self.children < self.size + len(self.terminals)
+        self.node = np.array(list(self.decisions), dtype=np.int64)
+        self.layers = self.layer()
+
+    """ The legal actions of a player, and the pot they leave them with """
+    @staticmethod
+    def actions(pot, opponent_pot, balance):
+        if balance == 0:
+            return [(CALL, pot)]
+        elif balance <= opponent_pot - pot:
+            return [(FOLD, pot), (CALL, pot + balance)]
+        elif pot == opponent_pot:
+            return [(CALL, pot), (RAISE, pot + 1)]
+        elif pot < opponent_pot:
+            return [(FOLD, pot), (CALL, opponent_pot), (RAISE, opponent_pot + 1)]
+        return [(CALL, pot)]
+
+    """ Add a node and everything below it """
+    def expand(self, key):
+        if key in self.decisions:
+            return
+        self.decisions[key] = len(self.decisions)
+        first_balance, actor, first_pass, *pots = key
+        balances = [first_balance - pots[0], self.total - first_balance - pots[1]]
+
+        for (action, pot) in self.actions(pots[actor], pots[1 - actor], balances[actor]):
+            if action == FOLD:
+                # The folding player loses their pot
+                child = ('fold', -pots[0] if actor == 0 else pots[1])
+            else:
+                after = list(pots)
+                after[actor] = pot
+                left = [first_balance - after[0], self.total - first_balance - after[1]]
+                behind = any(after[seat] != max(after) and left[seat] > 0 for seat in (0, 1))
+                if actor == 0:
+                    child = (first_balance, 1, first_pass, *after)
+                elif behind:
+                    child = (first_balance, 0, False, *after)
+                else:
+                    child = ('showdown', *after)
+
+            if child[0] in ('fold', 'showdown'):
+                self.terminals.setdefault(child, len(self.terminals))
+            else:
+                self.expand(child)
+            self.edges.append((self.decisions[key], action, child))
+
+    """ Flat index of a node or terminal """
+    def index_of(self, key):
+        if key[0] in ('fold', 'showdown'):
+            return self.size + self.terminals[key]
+        return self.decisions[key]
+
+    """ Group decisions by (longest path from a root, actor), so every group only depends on later ones """
+    def layer(self):
+        below = [[child for child in self.children[node] if child < self.size] for node in range(self.size)]
+        parents = np.zeros(self.size, dtype=np.int64)
+        for children in below:
+            for child in children:
+                parents[child] += 1
+
+        # Kahn's topological order, keeping the longest distance from a root
+        depth = np.zeros(self.size, dtype=np.int64)
+        ready = list(np.flatnonzero(parents == 0))
+        while ready:
+            node = ready.pop()
+            for child in below[node]:
+                depth[child] = max(depth[child], depth[node] + 1)
+                parents[child] -= 1
+                if parents[child] == 0:
+                    ready.append(child)
+
+        return [
+            (actor, np.flatnonzero((depth == level) & (self.node[:, 1] == actor)))
+            for level in range(depth.max() + 1)
+            for actor in (0, 1)
+            if ((depth == level) & (self.node[:, 1] == actor)).any()
+        ]
+
+    """ Payoff to the first player at every terminal, for each pair of cards """
+    def terminal_utilities(self):
+        utilities = np.zeros((len(self.terminals) + 1, 13, 13))
+        for (key, index) in self.terminals.items():
+            if key[0] == 'fold':
+                utilities[index] = key[1]
+            else:
+                # Only the smaller pot is contested; the rest of the bigger pot goes back (a side pot)
+                _, first_pot, second_pot = key
+                utilities[index] = SHOWDOWN * min(first_pot, second_pot)
+        return utilities
+
+
+class Solver():
+    """
+    Vectorized CFR+ over the GameTree.
+
+    Every decision node holds one information set per (High count of both players, own card),
+    i.e. arrays of shape (9, 13, 3). Values are kept as expected payoffs for each pair of cards,
+    which do not depend on how a node was reached, so merged betting lines stay exact.
+    """
+    def __init__(self, balance=10, wager=1):
+        self.tree = GameTree(balance, wager)
+        size, count = self.tree.size, len(self.tree.terminals) + 1
+
+        # Utilities for every node and terminal: (nodes, class pair, first player's card, second player's card)
+        self.utilities = np.zeros((size + count, 9, 13, 13))
+        self.utilities[size:] = self.tree.terminal_utilities()[:, None]
+
+        self.regrets = np.zeros((size, 9, 13, 3))
+        self.average = np.zeros((size, 9, 13, 3))
+        self.reach = np.zeros((2, size + count, 9, 13))
+        self.mask = self.tree.legal[:, None, None, :]
+
+        # Card chances of both players for every class pair (High count of the first player * 3 + of the second)
+        self.priors = np.stack([np.repeat(CLASS_PRIOR, 3, axis=0), np.tile(CLASS_PRIOR, (3, 1))])
+        self.roots = np.array([
+            index for (key, index) in self.tree.decisions.items()
+            if key[1:] == (0, True, self.tree.wager, self.tree.wager)
+        ])
+        self.iterations = 0
+        self.history = []
+
+    """ Regret matching: play actions in proportion to their positive regret, uniformly if there is none """
+    def strategy(self):
+        positive = self.regrets * self.mask
+        totals = positive.sum(axis=-1, keepdims=True)
+        uniform = self.mask / self.mask.sum(axis=-1, keepdims=True)
+        return np.where(totals > 0, positive / np.where(totals > 0, totals, 1), uniform)
+
+    """ Reach of each player's cards at every node under strategy, summed over the lines that lead there """
+    def forward(self, strategy, reach):
+        reach[:] = 0
+        reach[:, self.roots] = 1
+        for (actor, nodes) in self.tree.layers:
+            for action in (FOLD, CALL, RAISE):
+                legal = nodes[self.tree.legal[nodes, action]]
+                target = self.tree.children[legal, action]
+                np.add.at(reach[actor], target, reach[actor, legal] * strategy[legal, ..., action])
+                np.add.at(reach[1 - actor], target, reach[1 - actor, legal])
+
+    def iterate(self):
+        self.iterations += 1
+        strategy = self.strategy()
+        children, layers = self.tree.children, self.tree.layers
+        self.forward(strategy, self.reach)
+
+        # Backward: utilities from the leaves up, updating the regrets of each node's actor on the way
+        for (actor, nodes) in reversed(layers):
+            below = self.utilities[children[nodes]]                      # (nodes, action, class, card, card)
+            opponent = self.priors[1 - actor] * self.reach[1 - actor, nodes]
+            if actor == 0:
+                self.utilities[nodes] = np.einsum('nhia,nahij->nhij', strategy[nodes], below)
+                values = np.einsum('nahij,nhj->nhia', below, opponent)
+            else:
+                self.utilities[nodes] = np.einsum('nhja,nahij->nhij', strategy[nodes], below)
+                values = -np.einsum('nahij,nhi->nhja', below, opponent)
+
+            expected = (values * strategy[nodes]).sum(axis=-1, keepdims=True)
+            self.regrets[nodes] = np.maximum(self.regrets[nodes] + (values - expected) * self.mask[nodes], 0)
+            self.average[nodes] += self.iterations * self.reach[actor, nodes][..., None] * strategy[nodes]
+
+    """ The average strategy, which is what converges to equilibrium """
+    def average_strategy(self):
+        totals = self.average.sum(axis=-1, keepdims=True)
+        uniform = self.mask / self.mask.sum(axis=-1, keepdims=True)
+        return np.where(totals > 0, self.average / np.where(totals > 0, totals, 1), uniform)
+
+    """
+    Value of the best response of player to strategy, per round, averaged over balances and High counts. priors
+    (2, 9, 13) are the chances of each seat's placed card for every class pair, by default a random card of the hand;
+    with choose_cards, the best response also places the better card of its hand.
+    """
+    def best_response(self, strategy, player, priors=None, choose_cards=False):
+        priors = self.priors if priors is None else priors
+        reach = np.zeros_like(self.reach)
+        self.forward(strategy, reach)
+        utilities = self.utilities.copy()
+        for (actor, nodes) in reversed(self.tree.layers):
+            below = utilities[self.tree.children[nodes]]
+            played = strategy[nodes]
+            if actor == player:
+                # Pick the action with the best counterfactual value for every own card
+                opponent = priors[1 - actor] * reach[1 - actor, nodes]
+                if actor == 0:
+                    values = np.einsum('nahij,nhj->nhia', below, opponent)
+                else:
+                    values = -np.einsum('nahij,nhi->nhja', below, opponent)
+                played = np.eye(3)[np.where(self.mask[nodes], values, -np.inf).argmax(axis=-1)]
+            pattern = 'nhia,nahij->nhij' if actor == 0 else 'nhja,nahij->nhij'
+            utilities[nodes] = np.einsum(pattern, played, below)
+
+        if choose_cards:
+            # Value of every own card at every root, then the better card of each hand
+            if player == 0:
+                cards = np.einsum('rhij,hj->rhi', utilities[self.roots], priors[1])
+            else:
+                cards = -np.einsum('rhij,hi->rhj', utilities[self.roots], priors[0])
+            highs = [pair // 3 if player == 0 else pair % 3 for pair in range(9)]
+            return np.mean([best_placement(cards[:, pair], high) for (pair, high) in enumerate(highs)])
+
+        value = np.einsum('rhij,hi,hj->', utilities[self.roots], priors[0], priors[1]) / (9 * len(self.roots))
+        return value if player == 0 else -value
+
+    """ How much a best-responding opponent wins per round, on average over both seats """
+    def exploitability(self, strategy=None, priors=None, choose_cards=False):
+        strategy = self.average_strategy() if strategy is None else strategy
+        return (self.best_response(strategy, 0, priors, choose_cards) +
+                self.best_response(strategy, 1, priors, choose_cards)) / 2
+
+    """ Working memory of the solver in bytes """
+    @property
+    def memory(self):
+        return sum(array.nbytes for array in (self.utilities, self.regrets, self.average, self.reach))
+
+    """ Run until the exploitability (in chips per round) drops below tolerance, or iterations run out """
+    def solve(self, iterations=1000, tolerance=1e-2, check_every=50, report=None):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.iterate()
+            if self.iterations % check_every == 0:
+                elapsed = time.perf_counter() - start
+                exploitability = self.exploitability()
+                self.history.append((self.iterations, elapsed, exploitability))
+                if report:
+                    report(self.iterations, elapsed, exploitability, self.memory)
+                if exploitability < tolerance:
+                    break
+        return self.table()
+
+    """
+    Dense strategy table indexed by
+    [first player's balance, first player's High count, second player's High count,
+     actor, first pass, first player's pot, second player's pot, card value - 2] -> (fold, call, raise)
+    """
+    def table(self):
+        total = self.tree.total
+        table = np.zeros((total + 1, 3, 3, 2, 2, total + 1, total + 1, 13, 3), dtype=np.float16)
+        average = self.average_strategy().reshape(self.tree.size, 3, 3, 13, 3)
+        balance, actor, first_pass, first_pot, second_pot = self.tree.node.T
+        table[balance, :, :, actor, first_pass, first_pot, second_pot] = average
+        return table
+
+
+class Solved(Heuristic):
+    """
+    AI that plays a strategy table from Solver.table; cards are still placed by the Heuristic. Without a table it
+    plays the Heuristic, until the table cache (cache.py) has the table of its balance and wager.
+    """
+    def __init__(self, table=None, balance=10, wager=1):
+        self.table = table
+        self.key = {'balance': balance, 'wager': wager}
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path))
+
+    """ Play the cached table, built in the background if it is missing """
+    @classmethod
+    def cached(cls, balance=10, wager=1):
+        return cls(lookup('strategy', balance=balance, wager=wager), balance, wager)
+
+    def pick(self, player, game):
+        if self.table is None:
+            self.table = lookup('strategy', **self.key)
+            if self.table is None:
+                return super().pick(player, game)
+        total = self.table.shape[0] - 1
+        order = game.player_order
+        pot = game.Board.bets
+        first_balance = order[0].balance + pot[order[0]]
+        if len(order) != 2 or first_balance > total or max(pot.values()) > total:
+            return super().pick(player, game)
+
+        probabilities = self.table[
+            first_balance, order[0].high, order[1].high, order.index(player), int(game.betting_passes == 1),
+            pot[order[0]], pot[order[1]], VALUES[game.Board.cards[player]] - 2,
+        ].astype(float)
+        if not probabilities.any():
+            return super().pick(player, game)
+
+        action = player.rng.choices((FOLD, CALL, RAISE), weights=probabilities)[0]
+        picks = game.legal_picks(player)
+        if action == FOLD and 'Fold' in picks:
+            return 'Fold'
+        elif action == RAISE and 'Raise' in picks:
+            return 'Raise'
+        return next(pick for pick in ('Check', 'Call', 'All in') if pick in picks)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Solve the One Poker betting game with CFR+')
+    parser.add_argument('--balance', type=int, default=10)
+    parser.add_argument('--wager', type=int, default=1)
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--tolerance', type=float, default=1e-2, help='target exploitability in chips per round')
+    parser.add_argument('--output', default='strategy.npy')
+    args = parser.parse_args()
+
+    solver = Solver(args.balance, args.wager)
+    print(f'{solver.tree.size} decision nodes, {len(solver.tree.terminals)} terminals, {solver.memory / 2 ** 20:.1f} MiB working memory')
+
+    def report(iterations, elapsed, exploitability, memory):
+        print(f'{iterations:>6} iterations  {elapsed:8.2f}s  {elapsed / iterations * 1000:7.2f} ms/iteration  exploitability {exploitability:.5f}')
+
+    np.save(args.output, solver.solve(args.iterations, args.tolerance, report=report))
+    print(f'Saved {args.output}')
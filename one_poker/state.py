@@ -0,0 +1,259 @@
+""" Immutable game states and a pure step function, for AIs that search ahead """
+from collections import namedtuple
+from random import Random
+
+from .engine import HIGH, MAX_PLAYERS, MIN_PLAYERS, VALUES, Deck, best_cards, side_pots
+
+
+CARD, BET, OVER = 'card', 'bet', 'over'
+
+
+class GameState(namedtuple('GameState', 'pile top unseen round order hands board bets balances live turn cursor passes winner phase wager')):
+    """
+    Seats are numbered 0..n-1 (P1..Pn); per-seat fields are tuples indexed by seat, and eliminated seats keep
+    their last balance. Every field is immutable, so a state is shared rather than copied, and step() only
+    builds the fields an action changes.
+
+        pile, top   the kept cards (bytes, shared by every state of a game) and the index of the next draw
+        unseen      unseen copies by card value 0-14, as the table sees them (engine.CardTracker)
+        round       round number, from 1
+        order       seats still in the game, in playing order
+        hands       card codes in each seat's hand
+        board       card placed by each seat this round, or None
+        bets        each seat's pot this round
+        balances    each seat's balance
+        live        seats that have not folded this round, in playing order
+        turn        seats of the current betting pass
+        cursor      index of the acting seat: in order when placing cards, in turn when betting
+        passes      betting passes so far this round
+        winner      winner of the last finished round (None for a tie), or of the game once it is over
+        phase       CARD, BET or OVER
+        wager       base wager of every round
+    """
+    __slots__ = ()
+
+    """ States never change, so a clone is the state itself """
+    def clone(self):
+        return self
+
+    """ Seat that acts next, None once the game is over """
+    @property
+    def actor(self):
+        if self.phase == CARD:
+            return self.order[self.cursor]
+        elif self.phase == BET:
+            return self.turn[self.cursor]
+        return None
+
+    @property
+    def max_bet(self):
+        return max(self.bets)
+
+    """ Number of High cards a seat holds this round, placed card included """
+    def high(self, seat):
+        return sum(HIGH[card] for card in self.hands[seat]) + (HIGH[self.board[seat]] if self.board[seat] is not None else 0)
+
+    """ Advantage, Neutral or Disadvantage, as in Game.card_ranking """
+    def position(self, seat):
+        own = self.high(seat)
+        opponent = max(self.high(other) for other in self.order if other != seat)
+        if own == 2 and opponent == 0:
+            return 'Advantage'
+        elif own == 0 and opponent >= 1:
+            return 'Disadvantage'
+        return 'Neutral'
+
+    """ Card codes the actor may place, or the picks it may make (as Game.legal_picks, in lower case) """
+    def legal_actions(self):
+        if self.phase == CARD:
+            return tuple(dict.fromkeys(self.hands[self.actor]))
+        elif self.phase == OVER:
+            return ()
+
+        seat = self.actor
+        highest, pot, balance = self.max_bet, self.bets[seat], self.balances[seat]
+        if balance == 0:
+            return ('check',)
+        elif balance <= highest - pot:
+            return ('all in', 'fold')
+        elif pot == highest:
+            return ('raise', 'check', 'fold')
+        return ('raise', 'call', 'fold')
+
+
+def replace(values, index, value):
+    return values[:index] + (value,) + values[index + 1:]
+
+
+""" Draw every seat in order up to 2 cards and open the card placing of the next round """
+def deal(state, order, hands, balances, unseen, winner):
+    hands = list(hands)
+    top = state.top
+    for seat in order:
+        while len(hands[seat]) < 2:
+            hands[seat] += (state.pile[top],)
+            top += 1
+    seats = len(hands)
+    return state._replace(
+        top=top, unseen=unseen, round=state.round + 1, order=tuple(order), hands=tuple(hands),
+        board=(None,) * seats, bets=(0,) * seats, balances=tuple(balances), live=(), turn=(),
+        cursor=0, passes=0, winner=winner, phase=CARD,
+    )
+
+
+"""
+A new game, dealt up to the first card placement. It deals the same cards and seating
+as Game(*seats, seed=seed) with seats players.
+"""
+def new_state(players=2, seed=None, balance=10, wager=1):
+    if not MIN_PLAYERS <= players <= MAX_PLAYERS:
+        raise ValueError(f'A table seats {MIN_PLAYERS} to {MAX_PLAYERS} players, not {players}')
+    rng = Random(Random().getrandbits(64) if seed is None else seed)
+    order = list(range(players))
+    rng.shuffle(order)
+    pile = Deck(subdecks=max(3, 3 * players // 2), rng=rng)
+    unseen = tuple(pile.tracker.get(value, 0) for value in range(15))
+
+    empty = GameState(
+        pile=bytes(pile.cards), top=0, unseen=unseen, round=0, order=(), hands=((),) * players,
+        board=(None,) * players, bets=(0,) * players, balances=(balance,) * players, live=(), turn=(),
+        cursor=0, passes=0, winner=None, phase=CARD, wager=wager,
+    )
+    return deal(empty, order, empty.hands, empty.balances, unseen, None)
+
+
+""" Snapshot of a running Game, taken while it waits for a card or a pick """
+def from_game(game):
+    seat = {player: index for (index, player) in enumerate(game.players)}
+    order = tuple(seat[player] for player in game.player_order)
+    board = tuple(game.Board.cards.get(player) for player in game.players)
+    placing = [index for (index, player) in enumerate(order) if board[player] is None]
+
+    state = GameState(
+        pile=bytes(game.Pile.cards), top=game.Pile.top,
+        unseen=tuple(game.Pile.tracker.get(value, 0) for value in range(15)),
+        round=game.round, order=order,
+        hands=tuple(tuple(player.hand) for player in game.players), board=board,
+        bets=tuple(game.Board.bets.get(player, 0) for player in game.players),
+        balances=tuple(player.balance for player in game.players),
+        live=(), turn=(), cursor=0, passes=0, winner=None, phase=CARD, wager=game.wager,
+    )
+    if placing:
+        return state._replace(cursor=placing[0])
+    return state._replace(
+        live=tuple(seat[player] for player in game.round_players),
+        turn=tuple(seat[player] for player in game.betting.turn),
+        cursor=game.betting.cursor, passes=game.betting_passes, phase=BET,
+    )
+
+
+""" Showdown, payout, elimination and the deal of the next round, as in Game.play """
+def finish_round(state):
+    bets, board, live = state.bets, state.board, state.live
+    balances = list(state.balances)
+
+    if len(live) == 1:
+        winner = live[0]
+    else:
+        best = best_cards(board, live)
+        winner = best[0] if len(best) == 1 else None
+
+    for (amount, players) in side_pots(bets, state.order, live):
+        if players is live and winner is not None:
+            balances[winner] += amount
+            continue
+        winners = best_cards(board, players)
+        share, odd = divmod(amount, len(winners))
+        for (index, seat) in enumerate(winners):
+            balances[seat] += share + (index < odd)
+
+    # The winner goes first next round; every board card has now been seen
+    order = list(state.order)
+    if winner is not None:
+        order.remove(winner)
+        order.insert(0, winner)
+    unseen = list(state.unseen)
+    for seat in state.order:
+        unseen[VALUES[board[seat]]] -= 1
+    unseen = tuple(unseen)
+
+    order = [seat for seat in order if balances[seat]]
+    if len(order) == 1 or len(state.pile) - state.top < len(order):
+        return state._replace(
+            unseen=unseen, order=tuple(order), board=(None,) * len(board), bets=(0,) * len(bets),
+            balances=tuple(balances), live=(), turn=(), cursor=0,
+            winner=order[0] if len(order) == 1 else None, phase=OVER,
+        )
+    return deal(state, order, state.hands, balances, unseen, winner)
+
+
+"""
+The state after the actor's action: a card code while placing cards, otherwise a pick ('check', 'call',
+'raise', 'fold', 'all in', in any case) or a (pick, amount) pair, where amount is what a raise adds to the
+actor's pot (by default the minimum, as the AIs raise). Going all in while a raise is open raises the
+balance. A finished round is settled and the next one dealt, so the new state always waits for a decision
+or is over. Illegal actions raise ValueError.
+"""
+def step(state, action):
+    if state.phase == OVER:
+        raise ValueError('The game is over')
+
+    seat = state.actor
+    if state.phase == CARD:
+        if action not in state.hands[seat]:
+            raise ValueError(f'Seat {seat} does not hold card {action}')
+        hand = list(state.hands[seat])
+        hand.remove(action)
+        state = state._replace(hands=replace(state.hands, seat, tuple(hand)), board=replace(state.board, seat, action))
+        if state.cursor + 1 < len(state.order):
+            return state._replace(cursor=state.cursor + 1)
+
+        # Every card is down: the base wager opens the betting
+        bets, balances = list(state.bets), list(state.balances)
+        for player in state.order:
+            bets[player] += state.wager
+            balances[player] -= state.wager
+        return state._replace(
+            bets=tuple(bets), balances=tuple(balances), live=state.order, turn=state.order,
+            cursor=0, passes=1, phase=BET,
+        )
+
+    pick, amount = (action, None) if isinstance(action, str) else action
+    pick = pick.lower()
+    legal = state.legal_actions()
+    if pick == 'all in' and 'raise' in legal:
+        # A raise of the whole balance, recorded by Game as going all in
+        pick, amount = 'raise', state.balances[seat]
+    if pick not in legal:
+        raise ValueError(f'Seat {seat} cannot {pick}')
+
+    highest, pot, balance = state.max_bet, state.bets[seat], state.balances[seat]
+    live = state.live
+    if pick == 'fold':
+        live = tuple(player for player in live if player != seat)
+        amount = 0
+    elif pick == 'call':
+        amount = highest - pot
+    elif pick == 'raise':
+        amount = highest - pot + 1 if amount is None else int(amount)
+        if not highest - pot < amount <= balance:
+            raise ValueError(f'Seat {seat} cannot raise by {amount}')
+    elif pick == 'all in':
+        amount = balance
+    else:
+        amount = 0
+
+    state = state._replace(
+        bets=replace(state.bets, seat, pot + amount), balances=replace(state.balances, seat, balance - amount),
+        live=live, cursor=state.cursor + 1,
+    )
+    if len(live) == 1:
+        return finish_round(state)
+    if state.cursor < len(state.turn):
+        return state
+
+    # End of a pass: another one while anybody who can still bet is behind
+    highest = state.max_bet
+    if any(state.balances[player] and state.bets[player] < highest for player in live):
+        return state._replace(turn=live, cursor=0, passes=state.passes + 1)
+    return finish_round(state)
@@ -0,0 +1,393 @@
+""" Streaming session statistics in constant memory, fed by Game events, with periodic columnar snapshots on disk """
+from argparse import ArgumentParser
+from array import array
+from collections import Counter
+import json
+from math import inf, nan, sqrt
+from multiprocessing import Pool, cpu_count
+import os
+from random import Random
+import sys
+import time
+
+from .engine import Game, VALUES
+from .policy import POSITIONS
+from .tournament import STRATEGIES, game_seed
+
+
+# Picks whose frequencies are kept per position
+PICKS = ('check', 'call', 'raise', 'fold', 'all in')
+
+
+class Running():
+    """ Count, mean, variance (Welford) and range of a stream of numbers; merge combines two streams (Chan) """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.deviations = 0.0
+        self.min = inf
+        self.max = -inf
+
+    def add(self, value):
+        self.count += 1
+        change = value - self.mean
+        self.mean += change / self.count
+        self.deviations += change * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        count = self.count + other.count
+        if not count:
+            return self
+        change = other.mean - self.mean
+        self.deviations += other.deviations + change * change * self.count * other.count / count
+        self.mean += change * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.deviations / (self.count - 1) if self.count > 1 else 0.0
+
+    def report(self):
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else nan,
+            'stdev': sqrt(self.variance),
+            'min': self.min if self.count else nan,
+            'max': self.max if self.count else nan,
+        }
+
+
+class Reservoir():
+    """ A uniform sample of at most size items of a stream (Algorithm R) """
+    def __init__(self, size=1000, seed=None):
+        self.size = size
+        self.rng = Random(seed)
+        self.seen = 0
+        self.sample = []
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.sample) < self.size:
+            self.sample.append(item)
+        else:
+            index = self.rng.randrange(self.seen)
+            if index < self.size:
+                self.sample[index] = item
+
+    """
+    Draw the combined sample from both: every item comes from either side in proportion to the part of its stream
+    not drawn yet, as a uniform sample of both streams would (a hypergeometric split)
+    """
+    def merge(self, other):
+        mine, theirs = self.sample[:], other.sample[:]
+        self.rng.shuffle(mine)
+        self.rng.shuffle(theirs)
+        left, other_left = self.seen, other.seen
+        sample = []
+        while len(sample) < self.size and (mine or theirs):
+            if mine and (not theirs or self.rng.random() * (left + other_left) < left):
+                sample.append(mine.pop())
+                left -= 1
+            else:
+                sample.append(theirs.pop())
+                other_left -= 1
+        self.sample = sample
+        self.seen += other.seen
+        return self
+
+
+class Digest():
+    """
+    Quantiles in constant memory, after the merging t-digest: values are buffered, then merged into centroids whose
+    weight may grow to 4 n q (1 - q) / compression, so the tails stay exact while the middle is summarised
+    """
+    def __init__(self, compression=100):
+        self.compression = compression
+        # (mean, weight), sorted by mean
+        self.centroids = []
+        self.buffer = []
+        self.count = 0
+        self.min = inf
+        self.max = -inf
+
+    def add(self, value, weight=1):
+        self.buffer.append((value, weight))
+        self.count += weight
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.buffer) >= 5 * self.compression:
+            self.compress()
+
+    def compress(self):
+        if not self.buffer:
+            return
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+        centroids = []
+        before = 0
+        mean, weight = points[0]
+        for (value, added) in points[1:]:
+            q = (before + weight + added / 2) / self.count
+            if value == mean or weight + added <= 4 * self.count * q * (1 - q) / self.compression:
+                weight += added
+                mean += (value - mean) * added / weight
+            else:
+                centroids.append((mean, weight))
+                before += weight
+                mean, weight = value, added
+        centroids.append((mean, weight))
+        self.centroids = centroids
+
+    def merge(self, other):
+        other.compress()
+        self.buffer += other.centroids
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.compress()
+        return self
+
+    """ Estimated value below which a fraction q of the stream lies, interpolating between centroid centres """
+    def quantile(self, q):
+        self.compress()
+        if not self.centroids:
+            return nan
+        target = q * self.count
+        previous, centre = self.min, 0.0
+        before = 0
+        for (mean, weight) in self.centroids:
+            middle = before + weight / 2
+            if target < middle:
+                return previous + (mean - previous) * (target - centre) / (middle - centre)
+            previous, centre = mean, middle
+            before += weight
+        if self.count == centre:
+            return self.max
+        return previous + (self.max - previous) * (target - centre) / (self.count - centre)
+
+
+class SnapshotWriter():
+    """
+    Appends snapshots to a directory as columns: one little-endian float64 file per statistic, one value per
+    snapshot. A column that first appears later is padded with NaN, so every column has a row per snapshot.
+    The latest full report is kept next to them as latest.json.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.columns = {name[:-4] for name in os.listdir(directory) if name.endswith('.f64')}
+        self.rows = max((self.length(name) for name in self.columns), default=0)
+
+    def path(self, name):
+        return os.path.join(self.directory, f'{name}.f64')
+
+    def length(self, name):
+        return os.path.getsize(self.path(name)) // 8
+
+    def write(self, columns, report=None):
+        for name in sorted(self.columns | set(columns)):
+            values = array('d', [nan] * (self.rows - self.length(name) if name in self.columns else self.rows))
+            values.append(columns.get(name, nan))
+            if sys.byteorder == 'big':
+                values.byteswap()
+            with open(self.path(name), 'ab') as file:
+                values.tofile(file)
+            self.columns.add(name)
+        self.rows += 1
+
+        if report is not None:
+            # Written aside and moved into place, so a reader never sees half a report
+            temporary = os.path.join(self.directory, 'latest.json.tmp')
+            with open(temporary, 'w') as file:
+                json.dump(report, file, indent=2)
+            os.replace(temporary, os.path.join(self.directory, 'latest.json'))
+
+
+""" The columns of a snapshot directory, as arrays of float64 by statistic name """
+def read_snapshots(directory):
+    columns = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.f64'):
+            values = array('d')
+            with open(os.path.join(directory, name), 'rb') as file:
+                values.frombytes(file.read())
+            if sys.byteorder == 'big':
+                values.byteswap()
+            columns[name[:-4]] = values
+    return columns
+
+
+class SessionStats():
+    """
+    Attach to any number of games, simulated or live, before they run. Keeps per seat win rates (a tie scores 0.5),
+    the chips won per round by the value of the card placed, pick frequencies per position, the distribution of
+    pot sizes and the lengths of games, all in constant memory. With a SnapshotWriter, a snapshot is written every
+    `every` rounds and every `interval` seconds, and by flush().
+    """
+    def __init__(self, writer=None, every=100000, interval=None, reservoir=1000, compression=100, seed=None):
+        self.writer = writer
+        self.every = every
+        self.interval = interval
+        self.flushed = time.monotonic()
+
+        self.games = 0
+        self.rounds = 0
+        self.wins = {}
+        self.card_ev = {value: Running() for value in range(2, 15)}
+        self.picks = {position: Counter() for position in POSITIONS}
+        self.pots = Running()
+        self.pot_quantiles = Digest(compression)
+        self.pot_sample = Reservoir(reservoir, seed)
+        self.lengths = Counter()
+        self.length = Running()
+
+        # Per running game: its players by name, and their balances at the start of the round
+        self.seats = {}
+        self.before = {}
+
+    def attach(self, game):
+        self.seats[game] = {player.name: player for player in game.players}
+        game.subscribe('on_round_start', self.on_round_start)
+        game.subscribe('on_action', self.on_action)
+        game.subscribe('on_round_end', self.on_round_end)
+        game.subscribe('on_game_end', self.on_game_end)
+        return game
+
+    def on_round_start(self, game, round):
+        self.before[game] = {player.name: player.balance for player in game.players}
+
+    def on_action(self, game, name, pick, amount):
+        self.picks[self.seats[game][name].position][pick] += 1
+
+    def on_round_end(self, game, result):
+        self.rounds += 1
+        pot = sum(result.bets.values())
+        self.pots.add(pot)
+        self.pot_quantiles.add(pot)
+        self.pot_sample.add(pot)
+
+        before = self.before[game]
+        for (name, card) in result.cards.items():
+            if card is not None:
+                self.card_ev[VALUES[card]].add(result.balances[name] - before[name])
+
+        if self.writer and (self.rounds % self.every == 0 or
+                            self.interval is not None and time.monotonic() - self.flushed >= self.interval):
+            self.flush()
+
+    def on_game_end(self, game, result):
+        self.games += 1
+        self.lengths[len(result.rounds)] += 1
+        self.length.add(len(result.rounds))
+        for name in self.seats.pop(game):
+            self.wins.setdefault(name, Running()).add(0.5 if result.winner is None else float(result.winner == name))
+        self.before.pop(game, None)
+
+    """ Fold in the statistics of another session, e.g. one gathered in a worker process """
+    def merge(self, other):
+        self.games += other.games
+        self.rounds += other.rounds
+        for (name, wins) in other.wins.items():
+            self.wins.setdefault(name, Running()).merge(wins)
+        for (value, ev) in other.card_ev.items():
+            self.card_ev[value].merge(ev)
+        for (position, picks) in other.picks.items():
+            self.picks[position].update(picks)
+        self.pots.merge(other.pots)
+        self.pot_quantiles.merge(other.pot_quantiles)
+        self.pot_sample.merge(other.pot_sample)
+        self.lengths.update(other.lengths)
+        self.length.merge(other.length)
+        return self
+
+    """ One row of the statistics as flat columns, for snapshots """
+    def columns(self):
+        columns = {'time': time.time(), 'games': self.games, 'rounds': self.rounds}
+        for (name, wins) in self.wins.items():
+            columns[f'win_rate.{name}'] = wins.mean
+        for (value, ev) in self.card_ev.items():
+            columns[f'card_ev.{value}'] = ev.mean if ev.count else nan
+        for (position, picks) in self.picks.items():
+            total = sum(picks.values())
+            for pick in ('fold', 'raise'):
+                columns[f'{pick}_rate.{position}'] = picks[pick] / total if total else nan
+        columns['pot.mean'] = self.pots.mean if self.pots.count else nan
+        for q in (0.5, 0.9, 0.99):
+            columns[f'pot.p{round(q * 100)}'] = self.pot_quantiles.quantile(q)
+        columns['length.mean'] = self.length.mean if self.length.count else nan
+        return columns
+
+    def report(self):
+        return {
+            'games': self.games,
+            'rounds': self.rounds,
+            'win_rate': {name: wins.report() for (name, wins) in sorted(self.wins.items())},
+            'card_ev': {value: ev.report() for (value, ev) in self.card_ev.items()},
+            'picks': {position: {pick: picks[pick] for pick in PICKS} for (position, picks) in self.picks.items()},
+            'pot': {**self.pots.report(), 'quantiles': {q: self.pot_quantiles.quantile(q) for q in (0.1, 0.5, 0.9, 0.99)}},
+            'pot_sample': self.pot_sample.sample,
+            'length': {**self.length.report(), 'histogram': dict(sorted(self.lengths.items()))},
+        }
+
+    def flush(self):
+        self.flushed = time.monotonic()
+        if self.writer:
+            self.writer.write(self.columns(), self.report())
+
+
+""" Play a chunk of headless games and return their statistics; runs inside the pool workers """
+def play_chunk(task):
+    seats, seed, start, count = task
+    stats = SessionStats(seed=game_seed(seed, 'stats', start, count))
+    for index in range(start, start + count):
+        game = Game(*(STRATEGIES[name]() for name in seats), headless=True, seed=game_seed(seed, '/'.join(seats), 'stats', index))
+        stats.attach(game).run()
+    return stats
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Gather streaming statistics over headless AI games')
+    parser.add_argument('seats', nargs='*', default=['heuristic', 'heuristic'], help='a strategy for every seat')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--chunk', type=int, default=500, help='games per worker task; a snapshot follows every chunk')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--snapshots', default=None, help='append columnar snapshots to this directory')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.seats if name not in STRATEGIES]
+    if unknown:
+        parser.error(f'unknown strategies: {", ".join(unknown)}')
+
+    stats = SessionStats(SnapshotWriter(args.snapshots) if args.snapshots else None, seed=args.seed)
+    tasks = ((args.seats, args.seed, start, min(args.chunk, args.games - start)) for start in range(0, args.games, args.chunk))
+    started = time.perf_counter()
+    with Pool(args.processes or cpu_count()) as pool:
+        for chunk in pool.imap(play_chunk, tasks):
+            stats.merge(chunk)
+            stats.flush()
+    elapsed = time.perf_counter() - started
+
+    report = stats.report()
+    print(f'{report["games"]:,} games, {report["rounds"]:,} rounds in {elapsed:.1f} s')
+    print('Win rate: ' + ', '.join(f'{name} {wins["mean"]:.3f}' for (name, wins) in report['win_rate'].items()))
+    print('Chips per round by card: ' + ' '.join(f'{value}:{ev["mean"]:+.2f}' for (value, ev) in report['card_ev'].items()))
+    for (position, picks) in report['picks'].items():
+        total = sum(picks.values()) or 1
+        print(f'{position:<12} fold {picks["fold"] / total:.3f}  raise {picks["raise"] / total:.3f}  of {total:,} picks')
+    pot = report['pot']
+    print(f'Pot: mean {pot["mean"]:.2f}, ' + ', '.join(f'p{round(q * 100)} {value:.1f}' for (q, value) in pot['quantiles'].items()))
+    length = report['length']
+    print(f'Game length: mean {length["mean"]:.1f} rounds, {length["min"]} to {length["max"]}')
+
+
+if __name__ == '__main__':
+    main()
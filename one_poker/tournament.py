@@ -0,0 +1,144 @@
+""" Multi-process tournament runner for AI strategies """
+from argparse import ArgumentParser
+from functools import partial
+from hashlib import blake2b
+from itertools import combinations
+from math import sqrt
+from multiprocessing import Pool, cpu_count
+
+from .engine import Game, Heuristic, RandomPlay
+from .mcts import ITERATIONS, MCTS
+
+
+# Strategies that can be entered by name; each plays a seeded game the same way every time
+STRATEGIES = {
+    'heuristic': Heuristic,
+    'random': RandomPlay,
+    'mcts': partial(MCTS, iterations=ITERATIONS),
+}
+
+
+""" Derive an independent, reproducible seed for one game, from the tournament seed and what tells the game apart """
+def game_seed(seed, *parts):
+    key = '/'.join(str(part) for part in (seed, *parts)).encode()
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), 'big')
+
+
+""" Play a single headless game; runs inside the pool workers """
+def play_game(task):
+    first, second, seed = task
+    result = Game(STRATEGIES[first](), STRATEGIES[second](), headless=True, seed=seed).run()
+    winner = {'P1': first, 'P2': second, None: None}[result.winner]
+    return first, second, seed, winner
+
+
+class Standing():
+    """ Running score of one strategy; a win scores 1 and a tie 0.5 """
+    def __init__(self, name):
+        self.name = name
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.opponents = set()
+
+    @property
+    def games(self):
+        return self.wins + self.losses + self.ties
+
+    @property
+    def score(self):
+        return self.wins + self.ties / 2
+
+    """ Mean score per game with a normal-approximation confidence interval """
+    def win_rate(self, z=1.96):
+        if not self.games:
+            return 0, 0, 0
+        mean = self.score / self.games
+        variance = (self.wins + self.ties / 4) / self.games - mean ** 2
+        margin = z * sqrt(max(variance, 0) / self.games)
+        return mean, max(mean - margin, 0), min(mean + margin, 1)
+
+    def __repr__(self):
+        mean, low, high = self.win_rate()
+        return f'{self.name:<12} {self.wins:>7} {self.losses:>7} {self.ties:>7} {mean:8.3f} [{low:.3f}, {high:.3f}]'
+
+
+class Tournament():
+    def __init__(self, names, games=100, seed=0, processes=None):
+        unknown = [name for name in names if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f'Unknown strategies: {", ".join(unknown)}')
+        self.names = list(dict.fromkeys(names))
+        self.games = games
+        self.seed = seed
+        self.processes = processes or cpu_count()
+        self.standings = {name: Standing(name) for name in self.names}
+
+    """ Every strategy meets every other strategy once """
+    def round_robin(self):
+        return list(combinations(self.names, 2))
+
+    """ Pair neighbours in the current standings, avoiding rematches where possible """
+    def swiss_pairings(self):
+        waiting = sorted(self.names, key=lambda name: -self.standings[name].score)
+        pairings = []
+        while len(waiting) > 1:
+            first = waiting.pop(0)
+            second = next((name for name in waiting if name not in self.standings[first].opponents), waiting[0])
+            waiting.remove(second)
+            pairings.append((first, second))
+        return pairings
+
+    """
+    Play every pairing games times, alternating seats, and record the results; each Swiss round deals new games.
+    A round-robin has no round in the key of its games, so it deals what it always has.
+    """
+    def play(self, pool, pairings, round=None):
+        tasks = []
+        for (first, second) in pairings:
+            for index in range(self.games):
+                seats = (first, second) if index % 2 == 0 else (second, first)
+                key = (first, second, index) if round is None else (first, second, round, index)
+                tasks.append((*seats, game_seed(self.seed, *key)))
+
+        for (first, second, seed, winner) in pool.imap_unordered(play_game, tasks, chunksize=64):
+            for (name, opponent) in [(first, second), (second, first)]:
+                standing = self.standings[name]
+                standing.opponents.add(opponent)
+                if winner is None:
+                    standing.ties += 1
+                elif winner == name:
+                    standing.wins += 1
+                else:
+                    standing.losses += 1
+
+    def run(self, fmt='round-robin', rounds=3):
+        with Pool(self.processes) as pool:
+            if fmt == 'round-robin':
+                self.play(pool, self.round_robin())
+            elif fmt == 'swiss':
+                for round in range(rounds):
+                    self.play(pool, self.swiss_pairings(), round)
+            else:
+                raise ValueError(f'Unknown tournament format: {fmt}')
+        return sorted(self.standings.values(), key=lambda standing: -standing.win_rate()[0])
+
+
+def main(argv=None, prog=None):
+    parser = ArgumentParser(prog=prog, description='Play AI strategies against each other')
+    parser.add_argument('strategies', nargs='+', choices=sorted(STRATEGIES))
+    parser.add_argument('--format', default='round-robin', choices=['round-robin', 'swiss'])
+    parser.add_argument('--rounds', type=int, default=3, help='Swiss rounds')
+    parser.add_argument('--games', type=int, default=100, help='games per pairing')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    standings = Tournament(args.strategies, args.games, args.seed, args.processes).run(args.format, args.rounds)
+    print(f'{"Strategy":<12} {"Wins":>7} {"Losses":>7} {"Ties":>7} {"Score":>8} 95% CI')
+    for standing in standings:
+        print(standing)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+""" The NumPy batch simulator against the Game engine it vectorizes """
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from one_poker.batch import BatchGame, BatchUtility
+from one_poker.engine import CardTracker, Game, Heuristic
+
+
+class Recorded():
+    """ Numbers drawn by a BatchGame, kept by game and seat: the Heuristic's confidence threshold of each pick """
+    def __init__(self, rng):
+        self.rng = rng
+        self.seats = None
+        self.draws = defaultdict(list)
+
+    def integers(self, low, high, size):
+        draws = self.rng.integers(low, high, size)
+        for (game, seat, draw) in zip(*self.seats, draws):
+            self.draws[game, seat].append(int(draw))
+        return draws
+
+
+class RecordingBatch(BatchGame):
+    def ai_pick(self, games, seats):
+        self.rng.seats = (games, seats)
+        return super().ai_pick(games, seats)
+
+
+class Replayed():
+    """ A seat's noise stream that gives back the numbers the batch drew for it """
+    def __init__(self, draws):
+        self.draws = iter(draws)
+
+    def randint(self, low, high):
+        return next(self.draws)
+
+
+def engine_game(batch, game, draws):
+    played = Game(Heuristic(), Heuristic(), headless=True, seed=0)
+    # The batch's deck, by value, and its first seat; each seat draws the thresholds the batch drew for it
+    played.Pile.cards = bytearray(value - 2 for value in batch.deck[game])
+    played.Pile.top = 0
+    first = int(batch.first[game])
+    played.player_order = [played.players[first], played.players[1 - first]]
+    for (seat, player) in enumerate(played.players):
+        player.rng = Replayed(draws[game, seat])
+    return played.run()
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_batch_plays_the_games_the_engine_plays(seed):
+    batch = RecordingBatch(200, seed=seed)
+    first = batch.first.copy()
+    batch.rng = Recorded(batch.rng)
+    winners = batch.run()
+    batch.first = first
+
+    for game in range(batch.n):
+        result = engine_game(batch, game, batch.rng.draws)
+        assert {-1: None, 0: 'P1', 1: 'P2'}[winners[game]] == result.winner
+        assert batch.rounds[game] == len(result.rounds)
+        assert tuple(batch.balances[game]) == (result.rounds[-1].balances['P1'], result.rounds[-1].balances['P2'])
+
+
+def test_success_calc_is_win_probability_against_one_opponent():
+    rng = np.random.default_rng(0)
+    counts = np.zeros((500, 15), dtype=np.int64)
+    counts[:, 2:] = rng.integers(0, 13, (500, 13))
+    reference = rng.integers(2, 15, 500)
+    batch = BatchUtility.success_calc(counts, reference)
+    for (row, value, probability) in zip(counts, reference, batch):
+        # The tracker still counts the reference card among the unseen ones
+        tracker = CardTracker({other: int(row[other]) + (other == value) for other in range(2, 15)})
+        assert probability == pytest.approx(tracker.win_probability(int(value)))
@@ -0,0 +1,99 @@
+""" TableCache: tables written once, mapped read-only, and build locks that outlive no builder """
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pytest
+
+from one_poker import cache
+from one_poker.policy import threshold_table
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A process that starts a build which never finishes, then waits to be killed or exits on its own
+BUILDER = '''
+import sys, time
+from one_poker import cache
+
+def slow(balance):
+    time.sleep(60)
+
+cache.BUILDERS['thresholds'] = (slow, ('balance',))
+cache.TableCache(sys.argv[1]).build_in_background('thresholds', balance=2)
+time.sleep(60 if sys.argv[2] == 'wait' else 0.5)
+'''
+
+
+def start_builder(directory, mode):
+    process = subprocess.Popen([sys.executable, '-c', BUILDER, str(directory), mode], cwd=ROOT,
+                               env={**os.environ, 'PYTHONPATH': ROOT})
+    lock = cache.TableCache(str(directory)).path('thresholds', balance=2) + '.lock'
+    deadline = time.time() + 10
+    while not os.path.exists(lock):
+        assert time.time() < deadline, 'the builder never took its lock'
+        time.sleep(0.01)
+    return process, lock
+
+
+def test_build_and_open(tmp_path):
+    tables = cache.TableCache(str(tmp_path))
+    assert tables.open('thresholds', balance=3) is None
+    table = tables.build('thresholds', balance=3)
+    assert isinstance(table, np.memmap) and not table.flags.writeable
+    assert np.array_equal(table, np.array(threshold_table(6)))
+    assert os.listdir(tmp_path) == ['thresholds-v1-balance3.npy']
+
+
+def test_lock_held_by_live_builder(tmp_path):
+    process, lock = start_builder(tmp_path, 'wait')
+    try:
+        assert cache.TableCache(str(tmp_path)).build('thresholds', balance=2) is None
+        assert os.path.exists(lock)
+    finally:
+        process.kill()
+        process.wait()
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='builders are only checked for by process id on POSIX')
+def test_killed_build_is_taken_over(tmp_path):
+    process, lock = start_builder(tmp_path, 'wait')
+    process.send_signal(signal.SIGKILL)
+    process.wait()
+    assert os.path.exists(lock)
+
+    table = cache.TableCache(str(tmp_path)).build('thresholds', balance=2)
+    assert np.array_equal(table, np.array(threshold_table(4)))
+    assert not os.path.exists(lock)
+
+
+def test_exit_during_build_releases_lock(tmp_path):
+    process, lock = start_builder(tmp_path, 'exit')
+    assert process.wait(timeout=30) == 0
+    assert not os.path.exists(lock)
+
+
+def test_failed_background_build_is_retried(tmp_path, monkeypatch):
+    def broken(balance):
+        raise RuntimeError('no table')
+
+    failures = []
+    monkeypatch.setattr('threading.excepthook', failures.append)
+    monkeypatch.setitem(cache.BUILDERS, 'thresholds', (broken, ('balance',)))
+    tables = cache.TableCache(str(tmp_path))
+    assert tables.get('thresholds', balance=3) is None
+    deadline = time.time() + 10
+    while tables.building:
+        assert time.time() < deadline, 'the failed build was never forgotten'
+        time.sleep(0.01)
+    assert [str(failure.exc_value) for failure in failures] == ['no table']
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setitem(cache.BUILDERS, 'thresholds', (cache.threshold_table, ('balance',)))
+    tables.get('thresholds', balance=3)
+    while tables.open('thresholds', balance=3) is None:
+        assert time.time() < deadline + 10, 'the table was never built again'
+        time.sleep(0.01)
@@ -0,0 +1,75 @@
+""" The Game engine: chips and records over random tables, and the pure step() that AIs search with """
+from random import Random
+
+import pytest
+
+from one_poker.engine import MAX_PLAYERS, MIN_PLAYERS, Game, Heuristic, RandomPlay
+from one_poker.state import OVER, from_game, new_state, step
+
+
+class Recording():
+    """ Plays another strategy and records every decision with the state the game was in """
+    def __init__(self, strategy, log):
+        self.strategy = strategy
+        self.log = log
+
+    def place_card(self, player, game):
+        card = self.strategy.place_card(player, game)
+        self.log.append((from_game(game), card))
+        return card
+
+    def pick(self, player, game):
+        pick = self.strategy.pick(player, game)
+        self.log.append((from_game(game), pick.lower()))
+        return pick
+
+
+def tables(count, seed=0):
+    rng = Random(seed)
+    for index in range(count):
+        players = rng.randint(MIN_PLAYERS, MAX_PLAYERS)
+        yield index, [rng.choice((Heuristic, RandomPlay))() for _ in range(players)]
+
+
+@pytest.mark.parametrize('index, seats', list(tables(60)))
+def test_chips_are_conserved(index, seats):
+    result = Game(*seats, headless=True, seed=index).run()
+    chips = 10 * len(seats)
+    for round in result.rounds:
+        assert sum(round.balances.values()) == chips
+        assert min(round.balances.values()) >= 0
+        # Only the seats dealt into the round are recorded
+        assert set(round.hands) == set(round.order)
+        assert sum(round.bets.values()) <= chips
+    assert result.winner is None or result.winner in round.balances
+
+
+@pytest.mark.parametrize('index, seats', list(tables(30, seed=1)))
+def test_step_follows_the_game(index, seats):
+    log = []
+    game = Game(*[Recording(seat, log) for seat in seats], headless=True, seed=index)
+    result = game.run()
+
+    assert log[0][0] == new_state(len(seats), seed=index)
+    for ((state, action), (following, _)) in zip(log, log[1:]):
+        assert action in state.legal_actions()
+        # A snapshot cannot know the last round's winner: the Game forgets it once betting opens
+        assert step(state, action)._replace(winner=None) == following
+
+    state, action = log[-1]
+    over = step(state, action)
+    assert over.phase == OVER
+    assert over.winner == (None if result.winner is None else int(result.winner[1:]) - 1)
+    assert over.balances == tuple(player.balance for player in game.players)
+
+
+@pytest.mark.parametrize('seats', [(True, True, 2), (True, 'Heuristic'), (True, Heuristic)])
+def test_seats_must_be_bools_or_strategies(seats):
+    with pytest.raises(TypeError, match='Seat'):
+        Game(*seats, headless=True)
+
+
+@pytest.mark.parametrize('count', [0, 1, MAX_PLAYERS + 1])
+def test_tables_seat_two_to_nine(count):
+    with pytest.raises(ValueError):
+        Game(*[True] * count, headless=True)
@@ -0,0 +1,56 @@
+""" The vectorized environment: illegal actions played as the passive one, and chips that add up """
+import numpy as np
+import pytest
+
+from one_poker.env import BET, PASSIVE, VectorEnv
+
+
+def legal(observation, actions):
+    betting = observation['phase'] == BET
+    allowed = observation['legal'][np.arange(len(actions)), actions]
+    return np.where(betting & ~allowed, PASSIVE[observation['relation']], actions)
+
+
+@pytest.mark.parametrize('opponent', [None, 'self'])
+def test_illegal_actions_play_as_the_passive_one(opponent):
+    def play(rng):
+        return lambda observation: legal(observation, rng.integers(0, 5, len(observation['phase'])))
+
+    rng = np.random.default_rng(0)
+    envs = [VectorEnv(play(np.random.default_rng(1)) if opponent else None, seed=2) for _ in range(2)]
+    observations = [env.reset(128) for env in envs]
+    illegal = 0
+    for _ in range(300):
+        actions = rng.integers(0, 5, 128)
+        # One environment is given every action, the other the action it is played as
+        played = legal(observations[1], actions)
+        illegal += (played != actions).sum()
+        (observation, rewards, dones, info), other = envs[0].step(actions), envs[1].step(played)
+        for (name, values) in observation.items():
+            assert (values == other[0][name]).all(), name
+        assert (rewards == other[1]).all() and (dones == other[2]).all()
+        observations = [observation, other[0]]
+
+        env = envs[0]
+        assert (env.balances >= 0).all() and (env.pots >= 0).all()
+        assert ((env.balances + env.pots).sum(axis=1) == 20).all()
+    assert illegal > 1000
+
+
+def test_rewards_add_up_to_the_chips_won():
+    env = VectorEnv(seed=3)
+    observation = env.reset(64)
+    rng = np.random.default_rng(3)
+    total = np.zeros(64)
+    decided = 0
+    finished = np.zeros(64, dtype=bool)
+    while not finished.all():
+        observation, rewards, dones, info = env.step(legal(observation, rng.integers(0, 5, 64)))
+        total += np.where(finished, 0, rewards)
+        just = dones & ~finished
+        # A game won ends with all 20 chips on one side; one that runs out of cards can end anywhere
+        assert (total[just & (info['winner'] == 0)] == 10).all()
+        assert (total[just & (info['winner'] == 1)] == -10).all()
+        decided += (just & (info['winner'] >= 0)).sum()
+        finished |= dones
+    assert decided > 32
@@ -0,0 +1,27 @@
+""" Duplicate games and the sequential test that compares strategies on them """
+import pytest
+
+from one_poker.evaluate import SequentialTest, evaluate, play_pair
+from one_poker.tournament import game_seed
+
+
+@pytest.mark.parametrize('index', range(10))
+def test_a_strategy_against_itself_scores_half_of_every_pair(index):
+    # The swapped game deals the same cards and noise to the same seats, so it ends the same way
+    scores = play_pair(('heuristic', 'heuristic', game_seed(0, 'self', index)))
+    assert sum(scores) == 1
+
+
+def test_sequential_test_decides_both_ways():
+    for (scores, decision) in [((1.0, 1.0), 'first'), ((0.0, 0.5), 'second'), ((1.0, 0.0), 'neither')]:
+        test = SequentialTest()
+        while test.decision is None:
+            test.add(scores)
+        assert test.decision == decision and test.pairs == test.minimum
+
+
+def test_clearly_stronger_seat_is_found():
+    test = evaluate('heuristic', 'random', max_pairs=400, processes=1, batch=8)
+    assert test.decision == 'first'
+    assert test.pairs < 400 and test.mean > 0.55
+    assert evaluate('random', 'heuristic', max_pairs=400, processes=1, batch=8).decision == 'second'
@@ -0,0 +1,44 @@
+""" Exact best responses: policies as strategies of the solver's tree, and what a best response wins against them """
+import numpy as np
+import pytest
+
+from one_poker import policy
+from one_poker.exploit import (ACTIONS, FRESH, exploitability, heuristic, heuristic_placement, position,
+                               random_placement, random_play, strategy_array, table_strategy, views)
+from one_poker.solver import Solver
+
+
+@pytest.fixture(scope='module')
+def solver():
+    solver = Solver(balance=4)
+    for _ in range(200):
+        solver.iterate()
+    return solver
+
+
+def test_heuristic_weights_are_its_picks_over_every_random_factor(solver):
+    for (_, view) in list(views(solver))[::97]:
+        weights = heuristic(view)
+        # Heuristic.pick draws its random factor from 0, 0.01, ..., 0.77
+        stance, success = position(view.high, view.opponent_high), FRESH.win_probability(view.value)
+        picks = [policy.compiled_pick(stance, success, factor / 100, view.pot, max(view.pot, view.opponent_pot),
+                                      view.balance) for factor in range(78)]
+        assert weights == pytest.approx(np.bincount([ACTIONS[pick] for pick in picks], minlength=3) / 78)
+
+
+def test_strategies_are_distributions_over_legal_actions(solver):
+    for play in (heuristic, random_play):
+        strategy = strategy_array(solver, play)
+        assert np.allclose(strategy.sum(axis=-1), 1)
+        assert not (strategy * ~solver.mask).any()
+
+
+def test_table_strategy_is_the_solved_strategy(solver):
+    assert np.allclose(table_strategy(solver, solver.table()), solver.average_strategy(), atol=1e-3)
+
+
+def test_solved_strategy_is_least_exploitable(solver):
+    solved = exploitability(solver, solver.average_strategy(), random_placement)[1]
+    heuristic_value = exploitability(solver, strategy_array(solver, heuristic), heuristic_placement)[1]
+    random_value = exploitability(solver, strategy_array(solver, random_play), random_placement)[1]
+    assert 0 <= solved < heuristic_value < random_value
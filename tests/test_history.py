@@ -0,0 +1,87 @@
+""" Hand history records: written, read back through mmap, never cut short, and enough to replay a game """
+from random import Random
+
+import pytest
+
+from one_poker.engine import Game, Heuristic, RandomPlay, RoundResult
+from one_poker.history import HandHistoryReader, HandHistoryWriter, action_limit
+from one_poker.replay import Replay, Script, describe
+
+
+def raise_war(actions):
+    picks = [('P1' if index % 2 == 0 else 'P2', 'raise', index + 1) for index in range(actions)]
+    return RoundResult(round=3, order=['P1', 'P2'], hands={'P1': (12,), 'P2': (40,)}, cards={'P1': 7, 'P2': 20},
+                       bets={'P1': 9, 'P2': 9}, actions=picks, winner='P2', balances={'P1': 1, 'P2': 19})
+
+
+def test_round_at_the_limit(tmp_path):
+    path = tmp_path / 'history.bin'
+    with HandHistoryWriter(path, max_actions=6) as writer:
+        writer.write(1234, raise_war(6))
+    with HandHistoryReader(path) as reader:
+        (record,) = list(reader)
+    assert record.seed == 1234 and record.round == 3 and record.winner == 1
+    assert record.actions == tuple((index % 2, 'raise', index + 1) for index in range(6))
+    assert record.hands == ((12,), (40,)) and record.cards == (7, 20) and record.balances == (1, 19)
+
+
+def test_round_over_the_limit(tmp_path):
+    with HandHistoryWriter(tmp_path / 'history.bin', max_actions=6) as writer:
+        with pytest.raises(ValueError):
+            writer.write(1234, raise_war(7))
+
+
+def test_record_size_follows_the_table(tmp_path):
+    path = tmp_path / 'history.bin'
+    with HandHistoryWriter(path, names=('P1', 'P2', 'P3')) as writer:
+        assert writer.max_actions == action_limit(3)
+    # An existing file keeps its own size
+    with HandHistoryWriter(path, names=('P1', 'P2', 'P3'), balance=50) as writer:
+        assert writer.max_actions == action_limit(3)
+
+
+@pytest.mark.parametrize('players', [2, 3, 9])
+def test_default_names_follow_the_game(tmp_path, players):
+    path = tmp_path / 'history.bin'
+    with HandHistoryWriter(path) as writer:
+        result = Game(*[Heuristic() for _ in range(players)], headless=True, seed=players, history=writer).run()
+    with HandHistoryReader(path) as reader:
+        assert reader.seats == players and len(reader) == len(result.rounds)
+    # An existing file names as many seats as it holds
+    with HandHistoryWriter(path) as writer:
+        assert writer.names == [f'P{index + 1}' for index in range(players)]
+
+
+def test_unused_writer_creates_no_file(tmp_path):
+    with HandHistoryWriter(tmp_path / 'history.bin'):
+        pass
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_replay_from_history(tmp_path, seed):
+    rng = Random(seed)
+    kinds = [rng.choice((Heuristic, RandomPlay)) for _ in range(rng.choice((2, 3, 5)))]
+    names = [f'P{index + 1}' for index in range(len(kinds))]
+    path = tmp_path / 'history.bin'
+    with HandHistoryWriter(path, names=names) as writer:
+        result = Game(*[kind() for kind in kinds], headless=True, seed=seed, history=writer).run()
+    with HandHistoryReader(path) as reader:
+        assert len(reader) == len(result.rounds)
+        script = Script.from_history(reader, seed)
+
+    # One seat is answered from the record instead of deciding; Replay checks every round against it
+    human = rng.randrange(len(kinds))
+    seats = [False if index == human else kind() for (index, kind) in enumerate(kinds)]
+    target = rng.randint(1, len(result.rounds))
+    original = Game(*[kind() for kind in kinds], headless=True, seed=seed)
+    original.breakpoint = target
+    steps = original.play()
+    while next(steps)[0] != 'breakpoint':
+        pass
+
+    replay = Replay(seats, seed, script)
+    assert describe(replay.run_to(target)) == describe(original)
+    replay.run_to()
+    assert replay.result.winner == result.winner
+    assert len(replay.result.rounds) == len(result.rounds)
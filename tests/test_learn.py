@@ -0,0 +1,28 @@
+""" The tabular learner and the AI seat that plays its table """
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from one_poker.engine import VALUES
+from one_poker.learn import CARD_LEGAL, STATES, Learned, Learner, card_state, train
+from one_poker.policy import POSITIONS
+
+
+def learners():
+    yield train(20, n=256, seed=0)
+    # Every value below zero: the card columns it never uses stay at zero and must still never be chosen
+    yield Learner(-np.random.default_rng(1).random((STATES, 5)))
+
+
+@pytest.mark.parametrize('learner', list(learners()))
+def test_learned_places_the_card_the_learner_would(learner):
+    seat = Learned(learner)
+    for (position, name) in enumerate(POSITIONS):
+        for low in range(2, 15):
+            for high in range(low, 15):
+                # Codes of the two values in different suits
+                hand = [high - 2 + 13, low - 2]
+                action = learner.act(np.array([card_state(position, low, high)]), CARD_LEGAL[None])[0]
+                card = seat.place_card(SimpleNamespace(hand=hand, position=name), None)
+                assert VALUES[card] == (high if action else low)
@@ -0,0 +1,37 @@
+""" The MCTS seat: determinizations that keep what the seat knows, and searches that repeat on an iteration budget """
+from random import Random
+
+from one_poker.engine import Game, Heuristic
+from one_poker.mcts import MCTS, Search, determinize
+from one_poker.state import BET, new_state, step
+
+
+def test_determinize_keeps_the_seat_view():
+    rng = Random(0)
+    state = new_state(3, seed=5)
+    while state.phase != BET or state.actor != 0:
+        state = step(state, state.legal_actions()[0])
+    for _ in range(50):
+        world = determinize(state, 0, rng)
+        assert world.hands[0] == state.hands[0] and world.board[0] == state.board[0]
+        for other in (1, 2):
+            # The other seats' High counts are shown on the table
+            assert world.high(other) == state.high(other)
+            assert len(world.hands[other]) == len(state.hands[other])
+
+
+def test_iteration_budget_is_exact():
+    tree = Search(new_state(2, seed=1), 0, Random(1))
+    # A deadline already past does not cut an iteration budget short
+    tree.run(0, minimum=10 ** 6, iterations=100)
+    assert tree.rollouts == 100
+
+
+def test_seeded_games_repeat_on_an_iteration_budget():
+    def play():
+        seat = MCTS(iterations=40)
+        result = Game(seat, Heuristic(), headless=True, seed=11).run()
+        return [(round.actions, round.cards, round.balances) for round in result.rounds], seat.rollouts
+
+    first, second = play(), play()
+    assert first == second and first[1] > 0
@@ -0,0 +1,21 @@
+""" The compiled Heuristic policy against its original branch tree """
+from math import nextafter
+
+from one_poker.policy import raise_threshold, reference_pick, validate
+
+
+def test_compiled_policy_matches_the_branch_tree():
+    checked, mismatches = validate(chips=8)
+    assert checked > 100000
+    assert mismatches == []
+
+
+def test_raise_threshold_is_the_smallest_passing_probability():
+    for need in range(1, 12):
+        for bank in range(need, 21):
+            limit = raise_threshold(need, bank)
+            if limit <= 1:
+                assert reference_pick('Advantage', limit, 0.0, need - 1, need - 1, bank - need + 1) == 'Raise'
+                below = nextafter(limit, 0)
+                assert reference_pick('Advantage', below, 0.0, need - 1, need - 1, bank - need + 1) == 'Check'
+
@@ -0,0 +1,94 @@
+""" Table server: clients that send invalid messages get an error and keep their connection """
+import asyncio
+import json
+
+import pytest
+
+from one_poker.server import Server
+
+
+""" Send lines to a fresh server and collect its answers up to one of type last """
+async def exchange(lines, last):
+    server = Server()
+    listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for line in lines:
+            writer.write(line.encode() + b'\n')
+        await writer.drain()
+        answers = []
+        while not answers or answers[-1]['type'] != last:
+            answers.append(json.loads(await asyncio.wait_for(reader.readline(), 5)))
+        return answers
+    finally:
+        writer.close()
+        await writer.wait_closed()
+        listener.close()
+        await listener.wait_closed()
+
+
+def test_non_objects_are_answered_with_errors():
+    answers = asyncio.run(exchange(['[]', '1', '"x"', 'null', 'not json', '{"cmd": "stats"}'], 'stats'))
+    errors = [answer['error'] for answer in answers if answer['type'] == 'error']
+    assert errors.count('expected one JSON object per line') == 5
+    assert answers[-1]['connections'] == 1
+
+
+"""
+Play a game against the Heuristic, answering the first message of each kind in bad with bad[kind](message);
+the kinds of messages the table sent
+"""
+def table(bad, seed=1):
+    async def play():
+        server = Server()
+        listener = await asyncio.start_server(server.handle, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(json.dumps({'cmd': 'play', 'opponent': 'heuristic', 'seed': seed}).encode() + b'\n')
+        await writer.drain()
+        kinds = []
+        try:
+            while True:
+                message = json.loads(await asyncio.wait_for(reader.readline(), 5))
+                kinds.append(message['type'])
+                if message['type'] == 'end':
+                    return kinds
+                if message['type'] in bad:
+                    writer.write(bad.pop(message['type'])(message).encode() + b'\n')
+                elif message['type'] == 'card':
+                    writer.write(json.dumps({'card': message['cards'][0]}).encode() + b'\n')
+                elif message['type'] == 'pick':
+                    writer.write(json.dumps({'pick': message['legal'][-1]}).encode() + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+
+    return asyncio.run(play())
+
+
+def test_non_objects_at_a_table():
+    # A line that is not an object is answered twice: it is not an object, and then not a valid card or pick
+    kinds = table({'card': lambda message: '[]', 'pick': lambda message: '2'})
+    assert kinds[-1] == 'end' and kinds.count('error') == 4
+
+
+def test_float_cards_are_refused():
+    # 5.0 == 5, but a float cannot index the card tables
+    kinds = table({'card': lambda message: json.dumps({'card': float(message['cards'][0])})})
+    assert kinds[-1] == 'end' and kinds.count('error') == 1
+
+
+def test_bool_cards_are_refused():
+    # The first hand of seed 6 holds card code 1, which true compares equal to
+    kinds = table({'card': lambda message: '{"card": true}'}, seed=6)
+    assert kinds[-1] == 'end' and kinds.count('error') == 1
+
+
+@pytest.mark.parametrize('seed', ['"abc"', '1.5', 'true', '-1', str(2 ** 64)])
+def test_invalid_seeds_are_refused(seed):
+    answers = asyncio.run(exchange([f'{{"cmd": "play", "seed": {seed}}}', '{"cmd": "stats"}'], 'stats'))
+    assert answers[0] == {'type': 'error', 'error': 'seed must be an integer from 0 to 2**64 - 1'}
+    assert answers[-1]['tables'] == {}
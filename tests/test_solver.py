@@ -0,0 +1,40 @@
+""" CFR+ solver: strategies over the legal actions, and an exploitability that falls towards zero """
+import numpy as np
+import pytest
+
+from one_poker.solver import Solver
+
+
+@pytest.fixture(scope='module')
+def solver():
+    return Solver(balance=4)
+
+
+def exploitability_after(solver, iterations):
+    for _ in range(iterations - solver.iterations):
+        solver.iterate()
+    return solver.exploitability()
+
+
+def test_strategies_are_distributions_over_legal_actions(solver):
+    for _ in range(5):
+        solver.iterate()
+    for strategy in (solver.strategy(), solver.average_strategy()):
+        assert np.allclose(strategy.sum(axis=-1), 1)
+        assert (strategy >= 0).all()
+        assert not (strategy * ~solver.mask).any()
+
+
+def test_exploitability_falls_with_iterations(solver):
+    early = exploitability_after(solver, 10)
+    late = exploitability_after(solver, 200)
+    assert early >= -1e-9 and late >= -1e-9
+    assert late < early / 2
+
+
+def test_table_rows_are_distributions(solver):
+    table = solver.table().astype(float)
+    totals = table.sum(axis=-1)
+    filled = totals > 0
+    assert filled.any()
+    assert np.allclose(totals[filled], 1, atol=1e-2)
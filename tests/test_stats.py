@@ -0,0 +1,88 @@
+""" Streaming estimators: merging two of them gives what one estimator over all the data gives """
+from math import isnan
+from random import Random
+from statistics import quantiles, variance
+
+import pytest
+
+from one_poker.stats import Digest, Reservoir, Running, SessionStats, SnapshotWriter, play_chunk, read_snapshots
+
+
+def stream(count, seed=0):
+    rng = Random(seed)
+    return [rng.lognormvariate(0, 1) for _ in range(count)]
+
+
+def fed(estimator, values):
+    for value in values:
+        estimator.add(value)
+    return estimator
+
+
+@pytest.mark.parametrize('split', [0, 1, 700, 4999])
+def test_merged_running_is_one_running(split):
+    values = stream(5000)
+    whole = fed(Running(), values)
+    merged = fed(Running(), values[:split]).merge(fed(Running(), values[split:]))
+    assert merged.count == whole.count == 5000
+    assert merged.mean == pytest.approx(whole.mean) and merged.variance == pytest.approx(whole.variance)
+    assert merged.variance == pytest.approx(variance(values))
+    assert (merged.min, merged.max) == (min(values), max(values))
+
+
+def test_merging_empty_runnings():
+    assert Running().merge(Running()).count == 0
+    assert fed(Running(), [1, 2]).merge(Running()).mean == 1.5
+
+
+def test_merged_digest_matches_one_digest():
+    values = stream(20000, seed=1)
+    whole = fed(Digest(), values)
+    merged = fed(Digest(), values[:15000]).merge(fed(Digest(), values[15000:]))
+    exact = quantiles(values, n=100)
+    assert merged.count == whole.count and (merged.min, merged.max) == (whole.min, whole.max)
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert merged.quantile(q) == pytest.approx(exact[round(q * 100) - 1], rel=0.02)
+        assert merged.quantile(q) == pytest.approx(whole.quantile(q), rel=0.02)
+    assert (merged.quantile(0), merged.quantile(1)) == (min(values), max(values))
+
+
+def test_merged_reservoir_samples_both_streams_evenly():
+    # 9000 items marked 0 and 1000 marked 1: a uniform sample of all 10000 holds a tenth of 1s
+    shares = []
+    for seed in range(100):
+        first = fed(Reservoir(100, seed), [0] * 9000)
+        merged = first.merge(fed(Reservoir(100, seed + 1000), [1] * 1000))
+        assert merged.seen == 10000 and len(merged.sample) == 100
+        shares.append(sum(merged.sample) / 100)
+    assert sum(shares) / len(shares) == pytest.approx(0.1, abs=0.01)
+
+
+def test_small_reservoirs_merge_whole():
+    merged = fed(Reservoir(10), [1, 2, 3]).merge(fed(Reservoir(10), [4, 5]))
+    assert sorted(merged.sample) == [1, 2, 3, 4, 5] and merged.seen == 5
+
+
+def test_merged_sessions_count_every_game():
+    seats = ['heuristic', 'random']
+    whole = play_chunk((seats, 3, 0, 40))
+    merged = play_chunk((seats, 3, 0, 25)).merge(play_chunk((seats, 3, 25, 15)))
+    assert (merged.games, merged.rounds) == (whole.games, whole.rounds) == (40, sum(whole.lengths.elements()))
+    assert merged.lengths == whole.lengths and merged.picks == whole.picks
+    for name in ('P1', 'P2'):
+        assert merged.wins[name].mean == pytest.approx(whole.wins[name].mean)
+    for value in range(2, 15):
+        assert merged.card_ev[value].count == whole.card_ev[value].count
+        assert merged.card_ev[value].mean == pytest.approx(whole.card_ev[value].mean)
+
+
+def test_snapshot_columns_are_padded(tmp_path):
+    writer = SnapshotWriter(str(tmp_path))
+    writer.write({'games': 1})
+    writer.write({'games': 2, 'rounds': 7}, report={'games': 2})
+    # A writer opened on the directory again carries on where it stopped
+    SnapshotWriter(str(tmp_path)).write({'rounds': 9})
+    columns = read_snapshots(str(tmp_path))
+    assert list(columns['games'][:2]) == [1, 2] and isnan(columns['games'][2])
+    assert isnan(columns['rounds'][0]) and list(columns['rounds'][1:]) == [7, 9]
+    assert (tmp_path / 'latest.json').exists()
@@ -0,0 +1,35 @@
+""" Tournament seeds: a round-robin deals the games it always has, and every Swiss round deals new ones """
+from hashlib import blake2b
+
+from one_poker.tournament import Tournament, play_game
+
+
+class Inline():
+    """ A pool that plays its tasks in this process, and keeps their seeds """
+    def __init__(self):
+        self.seeds = []
+
+    def imap_unordered(self, function, tasks, chunksize=1):
+        for task in tasks:
+            self.seeds.append(task[2])
+            yield function(task)
+
+
+def test_round_robin_seeds_are_unchanged():
+    pool = Inline()
+    tournament = Tournament(['heuristic', 'random'], games=4, seed=7)
+    tournament.play(pool, tournament.round_robin())
+    # The key of a round-robin game has always been seed/first/second/index
+    expected = [int.from_bytes(blake2b(f'7/heuristic/random/{index}'.encode(), digest_size=8).digest(), 'big')
+                for index in range(4)]
+    assert pool.seeds == expected
+    assert sum(standing.games for standing in tournament.standings.values()) == 8
+
+
+def test_swiss_rounds_deal_new_games():
+    pool = Inline()
+    tournament = Tournament(['heuristic', 'random'], games=4, seed=7)
+    for round in range(3):
+        tournament.play(pool, tournament.swiss_pairings(), round)
+    assert len(set(pool.seeds)) == 12
+    assert play_game(('heuristic', 'random', pool.seeds[0])) == play_game(('heuristic', 'random', pool.seeds[0]))